@@ -0,0 +1,69 @@
+"""Benchmark spinning up N agents: direct construction versus a prewarmed AgentPool.
+
+Each variant is measured with and without building the agents' autogen
+AssistantAgent, which is what an agent needs before its first LLM call.
+The pool's prewarm happens before the timer starts, as it would before an
+incident.
+
+Usage:
+    python benchmarks/bench_agent_pool.py [--agents 50]
+"""
+import argparse
+import time
+
+from sar_project.agents.agent_pool import AgentPool
+from sar_project.agents.medical_agent import MedicalTeamLeader
+from sar_project.agents.weather_agent import WeatherAgent
+
+
+def construct(cls, n, warm_assistant):
+    start = time.perf_counter()
+    agents = [cls() for _ in range(n)]
+    if warm_assistant:
+        for agent in agents:
+            agent.assistant
+    return time.perf_counter() - start
+
+
+def from_pool(cls, n, warm_assistant):
+    pool = AgentPool(cls, prewarm=n, warm_assistant=warm_assistant)
+    start = time.perf_counter()
+    agents = [pool.acquire() for _ in range(n)]
+    elapsed = time.perf_counter() - start
+    for agent in agents:
+        pool.release(agent)
+    pool.close()
+    return elapsed
+
+
+def recycle(cls, n, warm_assistant):
+    pool = AgentPool(cls, prewarm=n, warm_assistant=warm_assistant)
+    start = time.perf_counter()
+    agents = [pool.acquire() for _ in range(n)]
+    for agent in agents:
+        pool.release(agent)
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agents", type=int, default=50)
+    args = parser.parse_args()
+
+    # import autogen before timing so every variant measures construction only
+    WeatherAgent().assistant
+
+    for cls in (MedicalTeamLeader, WeatherAgent):
+        for warm_assistant in (False, True):
+            label = f"{cls.__name__}{' + assistant' if warm_assistant else ''}"
+            print(f"{label} x {args.agents}")
+            for name, run in (("construct", construct), ("prewarmed pool", from_pool),
+                              ("acquire + release", recycle)):
+                elapsed = run(cls, args.agents, warm_assistant)
+                print(f"  {name:<18} {elapsed * 1000:9.2f} ms  ({elapsed * 1e6 / args.agents:8.1f} us/agent)")
+
+
+if __name__ == "__main__":
+    main()
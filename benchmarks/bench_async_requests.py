@@ -0,0 +1,81 @@
+"""Benchmark concurrent mixed request throughput through the asyncio request loop.
+
+Runs the same mix of medical and weather requests sequentially through
+process_request and concurrently through each agent's request loop.
+
+Usage:
+    python benchmarks/bench_async_requests.py [--requests 20000] [--concurrency 1 4 16]
+"""
+import argparse
+import asyncio
+import time
+
+from sar_project.agents.medical_agent import MedicalTeamLeader
+from sar_project.agents.weather_agent import WeatherAgent
+
+
+def make_requests(n):
+    medical, weather = [], []
+    for i in range(n):
+        kind = i % 5
+        if kind == 0:
+            medical.append({"add_patient_request": True, "patient_data": {"id": f"patient{i}", "severity": "medium"}})
+        elif kind == 1:
+            medical.append({"supply_request": True, "item": "bandages", "quantity": 1})
+        elif kind == 2:
+            medical.append({"list_patients_request": True, "status": "in transit"})
+        elif kind == 3:
+            medical.append({"update_patient_request": True, "patient_id": f"patient{i - 3}", "update_data": {"severity": "high"}})
+        else:
+            weather.append({"assess_risk": True, "location": f"cell{i}"})
+    return medical, weather
+
+
+def run_sequential(medical, weather):
+    medical_agent, weather_agent = MedicalTeamLeader(), WeatherAgent()
+    start = time.perf_counter()
+    for message in medical:
+        medical_agent.process_request(message)
+    for message in weather:
+        weather_agent.process_request(message)
+    return time.perf_counter() - start
+
+
+async def run_concurrent(medical, weather, concurrency):
+    medical_agent, weather_agent = MedicalTeamLeader(), WeatherAgent()
+    latencies = []
+
+    async def timed(loop, message):
+        start = time.perf_counter()
+        await loop.request(message)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    async with medical_agent.request_loop(max_concurrency=concurrency) as medical_loop, \
+            weather_agent.request_loop(max_concurrency=concurrency) as weather_loop:
+        await asyncio.gather(
+            *(timed(medical_loop, message) for message in medical),
+            *(timed(weather_loop, message) for message in weather)
+        )
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    medical, weather = make_requests(args.requests)
+    elapsed = run_sequential(medical, weather)
+    print(f"sequential process_request: {args.requests / elapsed:10.0f} req/s")
+    for concurrency in args.concurrency:
+        elapsed, p50, p99 = asyncio.run(run_concurrent(medical, weather, concurrency))
+        print(f"request loop, concurrency {concurrency:>3}: {args.requests / elapsed:10.0f} req/s  "
+              f"p50 {p50 * 1000:.2f} ms  p99 {p99 * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
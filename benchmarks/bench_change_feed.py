@@ -0,0 +1,88 @@
+"""Benchmark reacting to field condition changes through the change feed.
+
+A stream of weather updates for many locations is written to the
+KnowledgeBase while a MedicalTeamLeader follows a set of watched locations,
+either by polling them after every batch of updates and re-adapting (the
+previous approach) or through watch_field_conditions, which only re-adapts
+when a location's weather label changes. Also reports the cost the feed adds
+to update_weather with and without subscribers.
+
+Usage:
+    python benchmarks/bench_change_feed.py [--updates 100000] [--locations 1000] [--watched 100]
+"""
+import argparse
+import random
+import time
+
+from sar_project.agents.medical_agent import MedicalTeamLeader
+from sar_project.knowledge.knowledge_base import KnowledgeBase
+
+LABELS = ("clear", "clear", "clear", "rain", "stormy")
+
+
+def updates(n, locations, seed=0):
+    rng = random.Random(seed)
+    labels = {}
+    stream = []
+    for _ in range(n):
+        location = f"sector {rng.randrange(locations)}"
+        # labels change rarely: most updates only carry new readings
+        if location not in labels or rng.random() < 0.02:
+            labels[location] = rng.choice(LABELS)
+        stream.append((location, {"weather": labels[location], "wind_speed": rng.uniform(0, 60)}))
+    return stream
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=100_000)
+    parser.add_argument("--locations", type=int, default=1_000)
+    parser.add_argument("--watched", type=int, default=100)
+    parser.add_argument("--poll-every", type=int, default=100, help="updates between two polls")
+    args = parser.parse_args()
+
+    stream = updates(args.updates, args.locations)
+    watched = [f"sector {i}" for i in range(args.watched)]
+
+    kb = KnowledgeBase()
+    start = time.perf_counter()
+    for location, conditions in stream:
+        kb.update_weather(location, conditions)
+    baseline = time.perf_counter() - start
+
+    # polling: re-read every watched location and re-adapt after each batch of updates
+    kb, agent = KnowledgeBase(), MedicalTeamLeader()
+    adaptations = 0
+    start = time.perf_counter()
+    for i, (location, conditions) in enumerate(stream, 1):
+        kb.update_weather(location, conditions)
+        if i % args.poll_every == 0:
+            for watched_location in watched:
+                conditions = kb.query_weather(watched_location)
+                if conditions:
+                    agent.adapt_to_field_conditions({"weather": conditions["weather"]})
+                    adaptations += 1
+    polling = time.perf_counter() - start
+    print(f"polling      {polling:7.3f} s  {adaptations:8,} adaptations")
+
+    kb, agent = KnowledgeBase(), MedicalTeamLeader()
+    agent.watch_field_conditions(kb, locations=watched)
+    adapt = agent.adapt_to_field_conditions
+    calls = []
+    agent.adapt_to_field_conditions = lambda conditions: calls.append(None) or adapt(conditions)
+    start = time.perf_counter()
+    for location, conditions in stream:
+        kb.update_weather(location, conditions)
+    kb.change_feed.flush(timeout=60)
+    feed = time.perf_counter() - start
+    print(f"change feed  {feed:7.3f} s  {len(calls):8,} adaptations  "
+          f"({agent.field_subscription.dropped} dropped)")
+    agent.close()
+    kb.change_feed.close()
+
+    print(f"update_weather without subscribers {baseline / len(stream) * 1e6:6.2f} us, "
+          f"with a watching agent {feed / len(stream) * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark repeated LLM conversations with and without the response cache.
+
+Runs a set of distinct conversations through an agent backed by the local
+fake LLM endpoint (with an artificial model latency), once without a cache,
+then with a disk cache: a cold pass that fills it, a warm pass answered from
+the in-memory front, and a pass of a fresh agent and cache over the same
+directory, answered from disk.
+
+Usage:
+    python benchmarks/bench_llm_cache.py [--conversations 50] [--latency 0.2]
+"""
+import argparse
+import tempfile
+import time
+
+from sar_project.agents.base_agent import SARBaseAgent
+from sar_project.agents.llm_cache import LLMResponseCache
+from sar_project.agents.llm_stub_server import StubLLMServer
+from sar_project.config.logging_config import set_log_level
+
+
+def make_agent(server, cache=None):
+    class StubAgent(SARBaseAgent):
+        def get_config_list(self):
+            return [{"model": "gpt-4", "api_key": "bench", "api_base": server.api_base}]
+    agent = StubAgent(name="bench_agent", role="Benchmark", system_message="You answer tersely.")
+    agent.llm_config = {**agent.llm_config, "use_cache": False}
+    agent.enable_response_cache(cache)
+    return agent
+
+
+def per_conversation(agent, conversations):
+    start = time.perf_counter()
+    for content in conversations:
+        agent.generate_reply(messages=[{"role": "user", "content": content}])
+    return (time.perf_counter() - start) / len(conversations)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the fake model takes per reply")
+    args = parser.parse_args()
+
+    set_log_level("WARNING")
+    conversations = [f"Status report for sector {i}?" for i in range(args.conversations)]
+    with StubLLMServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as directory:
+        uncached = per_conversation(make_agent(server), conversations)
+        agent = make_agent(server, LLMResponseCache(directory))
+        cold = per_conversation(agent, conversations)
+        warm = per_conversation(agent, conversations)
+        disk = per_conversation(make_agent(server, LLMResponseCache(directory, memory_entries=0)), conversations)
+        requests = server.requests
+
+    print(f"{args.conversations} conversations, model latency {args.latency * 1000:.0f} ms")
+    print(f"no cache:            {uncached * 1000:9.3f} ms per conversation")
+    print(f"cold cache:          {cold * 1000:9.3f} ms per conversation")
+    print(f"warm (memory front): {warm * 1000:9.3f} ms per conversation  ({uncached / warm:,.0f}x)")
+    print(f"warm (disk only):    {disk * 1000:9.3f} ms per conversation  ({uncached / disk:,.0f}x)")
+    print(f"model requests:      {requests} (expected {2 * args.conversations})")
+
+
+if __name__ == "__main__":
+    main()
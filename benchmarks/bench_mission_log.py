@@ -0,0 +1,65 @@
+"""Benchmark the segmented mission log: ingest, memory held, and filtered streaming.
+
+Logs N events spread over several days, then streams and counts events of one
+type within a time window, compared with filtering a plain in-memory list.
+
+Usage:
+    python benchmarks/bench_mission_log.py [--events 1000000] [--segment-size 10000]
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+from sar_project.knowledge.knowledge_base import KnowledgeBase
+
+TYPES = ("search", "rescue", "supply", "transport", "weather", "status")
+
+
+def make_event(i):
+    return {"timestamp": i * 0.5, "type": TYPES[i % len(TYPES)], "team": f"team{i % 40}", "outcome": "ok"}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--segment-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        kb = KnowledgeBase(mission_log_dir=directory, mission_segment_size=args.segment_size)
+        start = time.perf_counter()
+        for i in range(args.events):
+            kb.log_mission_event(make_event(i))
+        elapsed = time.perf_counter() - start
+        print(f"log {args.events:,} events: {elapsed:.2f} s ({args.events / elapsed:,.0f} events/s), "
+              f"{len(kb.mission_log._active):,} events held in memory")
+
+        # one hour of rescue events from the middle of the operation
+        window_start = args.events * 0.25
+        window_end = window_start + 3600
+        start = time.perf_counter()
+        streamed = sum(1 for _ in kb.iter_mission_events(window_start, window_end, "rescue"))
+        stream_time = time.perf_counter() - start
+        start = time.perf_counter()
+        counted = kb.count_mission_events(event_types="rescue")
+        count_time = time.perf_counter() - start
+
+        tracemalloc.start()
+        history = [make_event(i) for i in range(args.events)]
+        print(f"plain list: {tracemalloc.get_traced_memory()[0] / 2**20:.1f} MiB held in memory")
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        scanned = sum(1 for e in history if e["type"] == "rescue" and window_start <= e["timestamp"] <= window_end)
+        scan_time = time.perf_counter() - start
+        assert streamed == scanned
+        print(f"stream 1 h of rescue events ({streamed:,}): {stream_time * 1000:.2f} ms, "
+              f"list scan {scan_time * 1000:.2f} ms")
+
+        print(f"count all rescue events ({counted:,}): {count_time * 1000:.2f} ms")
+        kb.mission_log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measure memory per patient record: plain dict records against compact PatientRecord objects.
+
+Records have the shape the agent builds for a triaged patient that was then
+transported (severity, status, transport details and four ISO timestamps).
+Also times the record operations every agent response pays for: copying a
+record out, writing a fresh timestamp and reading a field.
+
+Usage:
+    python benchmarks/bench_patient_records.py [--count 100000]
+"""
+import argparse
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sar_project.agents.patient_record import PatientRecord, timestamp_now
+
+
+def make_record_data(i, start):
+    def timestamp(offset):
+        return (start + timedelta(seconds=i, microseconds=offset)).isoformat()
+
+    return {
+        "id": f"patient{i}",
+        "severity": ["high", "medium", "low"][i % 3],
+        "arrival_time": i,
+        "triage_time": timestamp(1),
+        "status": "in transit",
+        "registration_time": timestamp(2),
+        "last_updated": timestamp(4),
+        "transport_type": "ambulance",
+        "destination": "Hospital A",
+        "transport_time": timestamp(3),
+    }
+
+
+def measure(count, factory):
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    # build the inputs first so only the stored records are measured
+    inputs = [make_record_data(i, start) for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = {data["id"]: factory(data) for data in inputs}
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert len(records) == count
+    return used / count
+
+
+TIMESTAMP_FIELDS = ("triage_time", "registration_time", "last_updated", "transport_time")
+
+
+def as_dict_record(data):
+    # mirrors the old layout: a fresh dict owning its own formatted timestamp strings
+    record = dict(data)
+    for field in TIMESTAMP_FIELDS:
+        record[field] = record[field][:-1] + record[field][-1]
+    return record
+
+
+def measure_cpu(number=100_000):
+    """Microseconds per operation for a dict record and a PatientRecord holding the same data."""
+    data = make_record_data(0, datetime.now())
+    timings = {}
+    variants = (
+        ("dict", as_dict_record(data), dict, lambda: datetime.now().isoformat()),
+        ("PatientRecord", PatientRecord(data), PatientRecord.as_dict, timestamp_now),
+    )
+    for name, record, copy, now in variants:
+        def write():
+            record["last_updated"] = now()
+        operations = {"copy": lambda: copy(record), "write timestamp": write, "read": lambda: record["status"]}
+        for operation, run in operations.items():
+            timings[name, operation] = min(timeit.repeat(run, number=number, repeat=5)) / number * 1e6
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    dict_bytes = measure(args.count, as_dict_record)
+    slotted_bytes = measure(args.count, PatientRecord)
+    print(f"records: {args.count}")
+    print(f"dict records:          {dict_bytes:8.1f} bytes/record")
+    print(f"PatientRecord records: {slotted_bytes:8.1f} bytes/record")
+    print(f"saving:                {100 * (1 - slotted_bytes / dict_bytes):7.1f}%")
+    timings = measure_cpu()
+    for operation in ("copy", "write timestamp", "read"):
+        print(f"{operation + ':':22s} dict {timings['dict', operation]:6.2f} us, "
+              f"PatientRecord {timings['PatientRecord', operation]:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
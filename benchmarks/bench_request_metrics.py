@@ -0,0 +1,51 @@
+"""Benchmark the cost of request instrumentation.
+
+Times process_request for cheap supply and weather requests, whose handlers
+take a few microseconds, against calling the same handlers directly, and with
+the sampling profiler enabled, then prints the agent's metrics snapshot.
+
+Usage:
+    python benchmarks/bench_request_metrics.py [--requests 200000] [--sample-every 1000]
+"""
+import argparse
+import json
+import time
+
+from sar_project.agents.medical_agent import MedicalTeamLeader
+from sar_project.agents.weather_agent import WeatherAgent
+from sar_project.config.logging_config import set_log_level
+
+
+def per_call(run, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        run()
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--sample-every", type=int, default=1_000)
+    args = parser.parse_args()
+
+    set_log_level("WARNING")
+    cases = [
+        (MedicalTeamLeader(), {"supply_request": True, "item": "bandages", "quantity": 0}),
+        (WeatherAgent(), {"get_conditions": True, "location": "north ridge"}),
+    ]
+    for agent, message in cases:
+        request_type = agent.get_request_type(message)
+        handler = agent.request_handlers[request_type]
+        direct = per_call(lambda: handler(agent, message), args.requests)
+        instrumented = per_call(lambda: agent.process_request(message), args.requests)
+        agent.metrics.enable_profiling(sample_every=args.sample_every)
+        profiled = per_call(lambda: agent.process_request(message), args.requests)
+        agent.metrics.disable_profiling()
+        print(f"{request_type:<16} handler {direct * 1e6:6.2f} us   process_request {instrumented * 1e6:6.2f} us   "
+              f"with 1/{args.sample_every} sampled {profiled * 1e6:6.2f} us")
+    print(json.dumps(cases[0][0].metrics.snapshot()["requests"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
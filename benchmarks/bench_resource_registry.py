@@ -0,0 +1,72 @@
+"""Benchmark filtered resource queries and counts as the fleet grows.
+
+Compares the indexed KnowledgeBase resource queries with scanning every
+resource status, for "available drones in sector 4", "available drones within
+2 km" and a per-type count.
+
+Usage:
+    python benchmarks/bench_resource_registry.py [--fleet 1000 10000 100000]
+"""
+import argparse
+import math
+import random
+import time
+
+from sar_project.knowledge.knowledge_base import KnowledgeBase
+
+TYPES = ("drone", "vehicle", "helicopter", "boat", "dog team", "ground team")
+AVAILABILITY = ("available", "deployed", "maintenance")
+
+
+def per_call(run, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fleet", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for n in args.fleet:
+        kb = KnowledgeBase(terrain_cell_size=500)
+        for i in range(n):
+            kb.update_resource_status(f"asset{i}", {
+                "type": rng.choice(TYPES),
+                "availability": rng.choice(AVAILABILITY),
+                "location": f"sector {rng.randrange(50)}",
+                "position": (rng.uniform(0, 50_000), rng.uniform(0, 50_000)),
+            })
+        statuses = dict(kb.resource_status)
+
+        def scan_sector():
+            return [name for name, s in statuses.items()
+                    if s["type"] == "drone" and s["availability"] == "available" and s["location"] == "sector 4"]
+
+        def scan_near():
+            return [name for name, s in statuses.items()
+                    if s["type"] == "drone" and s["availability"] == "available"
+                    and math.hypot(s["position"][0] - 25_000, s["position"][1] - 25_000) <= 2000]
+
+        def scan_count():
+            return sum(1 for s in statuses.values() if s["type"] == "drone")
+
+        cases = [
+            ("drones available in sector 4",
+             lambda: kb.query_resources(type="drone", availability="available", location="sector 4"), scan_sector),
+            ("drones available within 2 km",
+             lambda: kb.query_resources(type="drone", availability="available", near=(25_000, 25_000, 2000)),
+             scan_near),
+            ("count drones", lambda: kb.count_resources(type="drone"), scan_count),
+        ]
+        print(f"fleet of {n:,}")
+        for label, indexed, scan in cases:
+            indexed_time, scan_time = per_call(indexed), per_call(scan)
+            print(f"  {label:<30} indexed {indexed_time * 1e6:9.1f} us   scan {scan_time * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
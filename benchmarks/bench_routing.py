@@ -0,0 +1,77 @@
+"""Benchmark hospital routing over the KnowledgeBase terrain.
+
+Builds a TerrainRouter over a square grid of terrain cells with a few
+hospitals and reports the graph build and per-hospital precomputation time,
+ETA and route lookups (cold and cached), and the cost of applying a terrain
+update, against running Dijkstra for every request.
+
+Usage:
+    python benchmarks/bench_routing.py [--side 300] [--hospitals 3] [--lookups 2000]
+"""
+import argparse
+import random
+import time
+
+from sar_project.knowledge.knowledge_base import KnowledgeBase
+from sar_project.knowledge.routing import TerrainRouter
+
+TERRAIN = ("flat", "flat", "road", "forest", "mountainous", "water")
+
+
+def per_call(run, args):
+    start = time.perf_counter()
+    for arg in args:
+        run(arg)
+    return (time.perf_counter() - start) / len(args)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--side", type=int, default=300, help="grid side, in cells of 100 m")
+    parser.add_argument("--hospitals", type=int, default=3)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    side = args.side
+    kb = KnowledgeBase(terrain_cell_size=100)
+    kb.update_terrain_many(
+        (f"cell {x} {y}", {"terrain": rng.choice(TERRAIN)}, (x * 100.0, y * 100.0))
+        for x in range(side) for y in range(side)
+    )
+
+    start = time.perf_counter()
+    router = TerrainRouter(kb, connect_radius=150)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(args.hospitals):
+        router.add_hospital(f"hospital {i}", f"cell {rng.randrange(side)} {rng.randrange(side)}")
+    precompute = (time.perf_counter() - start) / args.hospitals
+    print(f"{side * side:,} cells: graph built in {build:.2f} s, {precompute:.2f} s per hospital")
+
+    origins = [f"cell {rng.randrange(side)} {rng.randrange(side)}" for _ in range(args.lookups)]
+    positions = [(rng.uniform(0, side * 100), rng.uniform(0, side * 100)) for _ in range(args.lookups)]
+    print(f"  eta from a cell        {per_call(lambda o: router.eta('hospital 0', o), origins) * 1e6:9.1f} us")
+    print(f"  eta from a position    {per_call(lambda p: router.eta('hospital 0', p), positions) * 1e6:9.1f} us")
+    print(f"  nearest hospital       {per_call(router.nearest_hospital, origins) * 1e6:9.1f} us")
+    print(f"  route, cold            {per_call(lambda o: router.route('hospital 0', o), origins) * 1e6:9.1f} us")
+    print(f"  route, cached          {per_call(lambda o: router.route('hospital 0', o), origins) * 1e6:9.1f} us")
+
+    updates = [(f"cell {rng.randrange(side)} {rng.randrange(side)}", rng.choice(TERRAIN)) for _ in range(200)]
+
+    def update(change):
+        kb.update_terrain(change[0], {"terrain": change[1]})
+        router.refresh()
+
+    print(f"  terrain update + repair {per_call(update, updates) * 1e3:8.2f} ms "
+          f"({router.rebuilds} rebuild(s), {router.repairs} tree repairs)")
+
+    cold = TerrainRouter(kb, connect_radius=150)
+    per_request = per_call(lambda o: cold._shortest_path_tree(cold._node_of[o]), origins[:5])
+    print(f"  Dijkstra per request    {per_request * 1e3:8.2f} ms")
+    cold.close()
+    router.close()
+
+
+if __name__ == "__main__":
+    main()
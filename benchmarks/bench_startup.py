@@ -0,0 +1,68 @@
+"""Benchmark agent startup: cold import time and time to the first served request.
+
+Every run starts a fresh interpreter, so nothing is cached between runs. The
+medians are printed, and written as JSON with --json so CI can track them.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--json startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from sar_project.agents.medical_agent import MedicalTeamLeader
+from sar_project.agents.weather_agent import WeatherAgent
+imported = time.perf_counter()
+agent = MedicalTeamLeader()
+agent.process_request({"supply_request": True, "item": "bandages", "quantity": 1})
+WeatherAgent().process_request({"assess_risk": True, "location": "Sector 4"})
+first_request = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "first_request_s": first_request - imported,
+    "total_s": first_request - start,
+    "autogen_imported": "autogen" in sys.modules,
+}))
+"""
+
+
+def probe():
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        check=True, capture_output=True, text=True,
+        env={**os.environ, "LOG_LEVEL": "OFF"}
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.runs)]
+    results = {
+        key: statistics.median(run[key] for run in runs)
+        for key in ("import_s", "first_request_s", "total_s")
+    }
+    results["autogen_imported"] = any(run["autogen_imported"] for run in runs)
+    results["runs"] = args.runs
+
+    print(f"import:             {results['import_s'] * 1000:8.1f} ms")
+    print(f"first request:      {results['first_request_s'] * 1000:8.1f} ms")
+    print(f"import to response: {results['total_s'] * 1000:8.1f} ms")
+    print(f"autogen imported:   {results['autogen_imported']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
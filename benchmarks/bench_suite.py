@@ -0,0 +1,230 @@
+"""Benchmark suite for the hot agent operations, with a stored baseline.
+
+Runs handle_triage, list_patients, manage_supplies, update_patient_record
+and WeatherAgent.assess_weather_risk against state of 10^2 to 10^6 entries
+(patients, inventory items or cached locations). For every operation and
+size it records the throughput, the p50/p95/p99 latency of one call and the
+peak memory traced while building the state and running the calls, and
+writes them to a JSON results file.
+
+With --baseline, the results are compared against a stored results file and
+the script exits with status 1 if any case got slower (lower throughput or
+higher p95 latency) or used more memory than the baseline allows, by more
+than --tolerance. --update-baseline stores the new results as the baseline.
+Baselines are machine-specific: record one on the machine the suite runs on.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 100 1000 10000 100000 1000000]
+        [--cases handle_triage list_patients ...] [--output results.json]
+        [--baseline benchmarks/baseline.json] [--tolerance 0.25] [--latency-floor 10] [--update-baseline]
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from sar_project.agents.medical_agent import MedicalTeamLeader
+from sar_project.agents.weather_agent import WeatherAgent
+from sar_project.agents.weather_provider import StaticWeatherProvider
+from sar_project.agents.weather_stub_server import stub_conditions
+from sar_project.config.logging_config import set_log_level
+
+SEVERITIES = ("high", "medium", "low")
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+class GridWeatherProvider(StaticWeatherProvider):
+    def get_current_conditions(self, location):
+        return stub_conditions(location)
+
+
+def patients(n, rng, prefix="patient"):
+    return [
+        {"id": f"{prefix}{i}", "severity": rng.choice(SEVERITIES), "arrival_time": rng.random()}
+        for i in range(n)
+    ]
+
+
+def agent_with_patients(n, rng):
+    agent = MedicalTeamLeader()
+    agent.handle_triage(patients(n, rng))
+    return agent
+
+
+# Every case builds its state for a size and returns (operation, units per call):
+# operation(i) runs the i-th measured call, units is what one call processes for the throughput.
+
+def case_handle_triage(n, rng):
+    # one call triages a batch of n arriving patients into an agent already holding n patients
+    agent = agent_with_patients(n, rng)
+    batches = [patients(n, rng, prefix=f"arrival{b}-") for b in range(2)]
+    return lambda i: agent.handle_triage(batches[i % 2]), n
+
+
+def case_list_patients(n, rng):
+    # a filtered listing over n patients, 1% of them in transit
+    agent = agent_with_patients(n, rng)
+    for i in range(0, n, 100):
+        agent.update_patient_record(f"patient{i}", {"status": "in transit"})
+    return lambda i: agent.list_patients(status="in transit", severity="high"), 1
+
+
+def case_manage_supplies(n, rng):
+    # supply updates against an inventory of n items
+    agent = MedicalTeamLeader()
+    for i in range(n):
+        agent.inventory_database.set(f"item{i}", 1_000_000_000)
+    items = [f"item{rng.randrange(n)}" for _ in range(4096)]
+    return lambda i: agent.manage_supplies(items[i % 4096], -1), 1
+
+
+def case_update_patient_record(n, rng):
+    # field and severity updates of random patients among n
+    agent = agent_with_patients(n, rng)
+    updates = [
+        (f"patient{rng.randrange(n)}", {"severity": rng.choice(SEVERITIES), "notes": "re-assessed"})
+        for _ in range(4096)
+    ]
+    return lambda i: agent.update_patient_record(*updates[i % 4096]), 1
+
+
+def case_assess_weather_risk(n, rng):
+    # risk assessments of random locations among n cached ones
+    agent = WeatherAgent(cache_size=n, cache_ttl=1e9, provider=GridWeatherProvider())
+    agent.assess_weather_risk_many([f"cell{i}" for i in range(n)])
+    locations = [f"cell{rng.randrange(n)}" for _ in range(4096)]
+    return lambda i: agent.assess_weather_risk(locations[i % 4096]), 1
+
+
+CASES = {
+    "handle_triage": case_handle_triage,
+    "list_patients": case_list_patients,
+    "manage_supplies": case_manage_supplies,
+    "update_patient_record": case_update_patient_record,
+    "assess_weather_risk": case_assess_weather_risk,
+}
+
+
+def measure(case, n, max_calls, budget, warmup=1, min_calls=3):
+    """Latency of up to max_calls calls (at least min_calls, at most budget seconds), after a warm-up."""
+    operation, units = case(n, random.Random(n))
+    for i in range(warmup):
+        operation(i)
+    latencies = []
+    gc.collect()
+    started = time.perf_counter()
+    for i in range(max_calls):
+        start = time.perf_counter_ns()
+        operation(i)
+        latencies.append(time.perf_counter_ns() - start)
+        if len(latencies) >= min_calls and time.perf_counter() - started > budget:
+            break
+    latencies = np.array(latencies) / 1e9
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]).tolist()
+    return {
+        "calls": len(latencies),
+        "throughput": units * len(latencies) / float(latencies.sum()),
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+    }
+
+
+def peak_memory(case, n, calls=3):
+    """Peak traced allocation while building the state for n and running a few calls."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation, _ = case(n, random.Random(n))
+        for i in range(calls):
+            operation(i)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def compare(results, baseline, tolerance, latency_floor=10e-6):
+    """Regressions of results against a baseline, as human-readable strings.
+
+    A p95 latency only counts as a regression if it also grew by more than
+    latency_floor seconds, since microsecond latencies jitter by more than
+    any sensible tolerance.
+    """
+    regressions = []
+    for key, result in results["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {result['throughput']:.1f}/s < baseline {base['throughput']:.1f}/s")
+        if result["p95"] > base["p95"] * (1 + tolerance) and result["p95"] - base["p95"] > latency_floor:
+            regressions.append(f"{key}: p95 {result['p95'] * 1e6:.1f} us > baseline {base['p95'] * 1e6:.1f} us")
+        if "peak_memory" in result and "peak_memory" in base \
+                and result["peak_memory"] > base["peak_memory"] * (1 + tolerance):
+            regressions.append(f"{key}: peak memory {result['peak_memory']:,} B > baseline {base['peak_memory']:,} B")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--max-calls", type=int, default=10_000, help="measured calls per case and size (at least 3)")
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds of measured calls per case and size")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory pass")
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--latency-floor", type=float, default=10.0,
+                        help="microseconds a p95 latency must grow by to count as a regression")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline")
+    args = parser.parse_args()
+
+    set_log_level("WARNING")
+    results = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": {},
+    }
+    print(f"{'case':<24}{'size':>9}{'throughput/s':>15}{'p50 us':>11}{'p95 us':>11}{'p99 us':>11}{'peak MiB':>10}")
+    for name in args.cases:
+        for n in args.sizes:
+            result = measure(CASES[name], n, args.max_calls, args.budget)
+            if not args.no_memory:
+                result["peak_memory"] = peak_memory(CASES[name], n)
+            results["results"][f"{name}/{n}"] = result
+            memory = f"{result['peak_memory'] / 2 ** 20:10.1f}" if "peak_memory" in result else f"{'-':>10}"
+            print(f"{name:<24}{n:>9,}{result['throughput']:>15,.0f}{result['p50'] * 1e6:>11.1f}"
+                  f"{result['p95'] * 1e6:>11.1f}{result['p99'] * 1e6:>11.1f}{memory}")
+            gc.collect()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline updated: {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.latency_floor * 1e-6)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark the cost of logging on the supply hot path.
+
+Compares manage_supplies with the old synchronous print() of every inventory
+change against the queue-backed structured logger, both enabled (INFO) and
+disabled (LOG_LEVEL=OFF). Log output goes to a line-buffered temporary file,
+which like a terminal costs one write per line.
+
+Usage:
+    python benchmarks/bench_supply_logging.py [--calls 200000]
+"""
+import argparse
+import contextlib
+import tempfile
+import time
+
+from sar_project.agents.medical_agent import MedicalTeamLeader
+from sar_project.config.logging_config import configure_logging
+
+
+def run(agent, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        agent.manage_supplies("bandages", 1)
+    return time.perf_counter() - start
+
+
+def run_print_baseline(agent, calls, log_file):
+    # what every supply request used to do: format and write one line synchronously
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log_file):
+        for _ in range(calls):
+            agent.manage_supplies("bandages", 1)
+            print(f"Inventory updated: bandages now has {agent.inventory_database['bandages']} units.")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryFile("w", buffering=1) as log_file:
+        configure_logging("OFF", stream=log_file)
+        agent = MedicalTeamLeader()
+        baseline = run_print_baseline(agent, args.calls, log_file)
+        agent.close()
+
+        results = {"print() baseline": baseline}
+        for level in ("INFO", "OFF"):
+            configure_logging(level, stream=log_file)
+            agent = MedicalTeamLeader()
+            results[f"structured logging, LOG_LEVEL={level}"] = run(agent, args.calls)
+            agent.close()
+        configure_logging("OFF", stream=log_file)
+
+    for label, elapsed in results.items():
+        print(f"{label:<40} {elapsed * 1e6 / args.calls:8.2f} us/call  "
+              f"({args.calls / elapsed:,.0f} calls/s)")
+
+
+if __name__ == "__main__":
+    main()
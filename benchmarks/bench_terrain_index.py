@@ -0,0 +1,74 @@
+"""Benchmark KnowledgeBase spatial terrain queries.
+
+Loads N positioned terrain cells spread over a square region and times
+bounding-box, radius and k-nearest queries against a vectorized full scan of
+the same coordinates.
+
+Usage:
+    python benchmarks/bench_terrain_index.py [--cells 1000000] [--extent 100000] [--queries 200]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from sar_project.knowledge.knowledge_base import KnowledgeBase
+
+
+def per_query(queries, run):
+    start = time.perf_counter()
+    for query in queries:
+        run(*query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cells", type=int, default=1_000_000)
+    parser.add_argument("--extent", type=float, default=100_000, help="Side of the region in meters")
+    parser.add_argument("--cell-size", type=float, default=250)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, args.extent, (args.cells, 2))
+    locations = [f"cell{i}" for i in range(args.cells)]
+    kb = KnowledgeBase(terrain_cell_size=args.cell_size)
+
+    start = time.perf_counter()
+    kb.update_terrain_many(
+        (location, {"obstacles": i % 100 == 0}, position)
+        for i, (location, position) in enumerate(zip(locations, xy.tolist()))
+    )
+    print(f"load {args.cells:,} cells: {time.perf_counter() - start:.2f} s")
+
+    points = rng.uniform(0, args.extent, (args.queries, 2)).tolist()
+    xs, ys = xy[:, 0], xy[:, 1]
+
+    def scan_box(x, y):
+        return np.flatnonzero((xs >= x) & (xs <= x + 2000) & (ys >= y) & (ys <= y + 2000))
+
+    def scan_radius(x, y):
+        return np.flatnonzero(np.hypot(xs - x, ys - y) <= 2000)
+
+    def scan_nearest(x, y):
+        return np.argpartition(np.hypot(xs - x, ys - y), 10)[:10]
+
+    obstacle = lambda data: data["obstacles"]
+    cases = [
+        ("box 2x2 km", lambda x, y: kb.query_terrain_in_box(x, y, x + 2000, y + 2000), scan_box),
+        ("radius 2 km", lambda x, y: kb.query_terrain_within(x, y, 2000), scan_radius),
+        ("10 nearest", lambda x, y: kb.query_nearest_terrain(x, y, k=10), scan_nearest),
+        ("nearest obstacle", lambda x, y: kb.query_nearest_terrain(x, y, where=obstacle), None),
+    ]
+    for label, indexed, scan in cases:
+        indexed_time = per_query(points, indexed)
+        line = f"{label:<18} indexed {indexed_time * 1e6:9.1f} us"
+        if scan is not None:
+            scan_time = per_query(points, scan)
+            line += f"   full scan {scan_time * 1e6:9.1f} us   speedup {scan_time / indexed_time:6.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
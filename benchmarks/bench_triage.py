@@ -0,0 +1,46 @@
+"""Benchmark per-patient triage against the vectorized bulk triage path.
+
+Usage:
+    python benchmarks/bench_triage.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import random
+import time
+
+from sar_project.agents.medical_agent import MedicalTeamLeader
+
+
+def make_patients(n, seed=0):
+    rng = random.Random(seed)
+    severities = ["high", "medium", "low"]
+    return [
+        {"id": f"patient{i}", "severity": rng.choice(severities), "arrival_time": rng.randint(0, n)}
+        for i in range(n)
+    ]
+
+
+def time_triage(patients, bulk):
+    agent = MedicalTeamLeader()
+    if not bulk:
+        agent.bulk_triage_threshold = float("inf")
+    start = time.perf_counter()
+    result = agent.handle_triage(patients)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'patients':>10} {'per-patient (s)':>16} {'bulk (s)':>10} {'speedup':>8}")
+    for n in args.sizes:
+        patients = make_patients(n)
+        per_patient_time, per_patient_result = time_triage(patients, bulk=False)
+        bulk_time, bulk_result = time_triage(patients, bulk=True)
+        assert per_patient_result == bulk_result
+        print(f"{n:>10} {per_patient_time:>16.3f} {bulk_time:>10.3f} {per_patient_time / bulk_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark KnowledgeBase weather history: ingest rate, queries and memory.
+
+Records one sample per minute for every location, then times time-range,
+latest-N and hourly-aggregate queries, and compares the memory held by the
+ring buffers with keeping the same samples as a list of dicts per location.
+
+Usage:
+    python benchmarks/bench_weather_history.py [--locations 200] [--samples 10080] [--capacity 10080]
+"""
+import argparse
+import time
+import tracemalloc
+
+from sar_project.knowledge.knowledge_base import KnowledgeBase
+
+
+def sample(t, i):
+    return {"temperature": 10 + (t + i) % 15, "wind_speed": (t * 7 + i) % 40,
+            "precipitation": (t + i) % 3, "visibility": 1 + (t + 3 * i) % 12}
+
+
+def per_call(n, run):
+    start = time.perf_counter()
+    for _ in range(n):
+        run()
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locations", type=int, default=200)
+    parser.add_argument("--samples", type=int, default=10_080, help="Samples per location, one per minute")
+    parser.add_argument("--capacity", type=int, default=10_080)
+    args = parser.parse_args()
+
+    locations = [f"cell{i}" for i in range(args.locations)]
+    kb = KnowledgeBase(weather_history_capacity=args.capacity)
+    start = time.perf_counter()
+    for t in range(args.samples):
+        for i, location in enumerate(locations):
+            kb.update_weather(location, sample(t, i), timestamp=t * 60.0)
+    elapsed = time.perf_counter() - start
+    ring_memory = sum(history.nbytes for history in kb.weather_history.values())
+    total = args.samples * args.locations
+    print(f"ingest {total:,} samples: {elapsed:.2f} s ({total / elapsed:,.0f} samples/s)")
+
+    tracemalloc.start()
+    plain = {location: [] for location in locations}
+    for t in range(min(args.samples, args.capacity)):
+        for i, location in enumerate(locations):
+            plain[location].append({"timestamp": t * 60.0, **sample(t, i)})
+    list_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del plain
+    print(f"memory: ring buffers {ring_memory / 2**20:.1f} MiB, list of dicts {list_memory / 2**20:.1f} MiB")
+
+    end = (args.samples - 1) * 60.0
+    location = locations[len(locations) // 2]
+    queries = [
+        ("last 6 hours", lambda: kb.query_weather_history(location, start=end - 6 * 3600)),
+        ("latest 60", lambda: kb.query_latest_weather(location, 60)),
+        ("hourly aggregates, 24 h", lambda: kb.query_weather_aggregates(location, 3600, start=end - 24 * 3600)),
+        ("hourly aggregates, all", lambda: kb.query_weather_aggregates(location, 3600)),
+    ]
+    for label, run in queries:
+        print(f"{label:<26} {per_call(1000, run) * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
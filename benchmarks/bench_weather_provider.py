@@ -0,0 +1,78 @@
+"""Benchmark HTTPWeatherProvider throughput and tail latency against the local stub server.
+
+Fetches current conditions for distinct locations at several concurrency
+limits through one pooled provider, and once with a fresh provider (new
+session and connection) per request as an unpooled baseline. All requests
+are submitted at once, so latencies include the wait for a concurrency slot.
+
+Usage:
+    python benchmarks/bench_weather_provider.py [--requests 2000] [--latency 0.005] [--concurrency 1 16 64]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sar_project.agents.weather_provider import HTTPWeatherProvider
+from sar_project.agents.weather_stub_server import StubWeatherServer
+
+
+async def timed(fetch, location, latencies):
+    start = time.perf_counter()
+    await fetch(location)
+    latencies.append(time.perf_counter() - start)
+
+
+async def run_pooled(url, n, concurrency):
+    provider = HTTPWeatherProvider(url, max_connections=concurrency, max_concurrency=concurrency)
+    latencies = []
+    await provider.fetch_current_conditions("warmup")
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(provider.fetch_current_conditions, f"cell{i}", latencies) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    await provider.aclose()
+    return elapsed, latencies
+
+
+async def run_unpooled(url, n, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(location):
+        async with semaphore:
+            provider = HTTPWeatherProvider(url)
+            try:
+                await provider.fetch_current_conditions(location)
+            finally:
+                await provider.aclose()
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(fetch, f"cell{i}", latencies) for i in range(n)))
+    return time.perf_counter() - start, latencies
+
+
+def report(label, n, elapsed, latencies):
+    latencies = sorted(latencies)
+    p50, p95, p99 = (latencies[min(len(latencies) - 1, int(q * len(latencies)))] for q in (0.5, 0.95, 0.99))
+    print(f"{label:<28} {n / elapsed:9,.0f} req/s  p50 {p50 * 1000:6.2f} ms  "
+          f"p95 {p95 * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms  mean {statistics.mean(latencies) * 1000:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    args = parser.parse_args()
+
+    with StubWeatherServer(latency=args.latency) as server:
+        for concurrency in args.concurrency:
+            elapsed, latencies = asyncio.run(run_pooled(server.url, args.requests, concurrency))
+            report(f"pooled, concurrency {concurrency}", args.requests, elapsed, latencies)
+        concurrency = max(args.concurrency)
+        elapsed, latencies = asyncio.run(run_unpooled(server.url, args.requests, concurrency))
+        report(f"unpooled, concurrency {concurrency}", args.requests, elapsed, latencies)
+
+
+if __name__ == "__main__":
+    main()
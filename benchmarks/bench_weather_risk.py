@@ -0,0 +1,53 @@
+"""Benchmark weather risk assessment over many search-grid cells.
+
+Compares calling assess_weather_risk once per cell with one
+assess_weather_risk_many call, with the conditions cache already warm so
+only the risk evaluation is measured.
+
+Usage:
+    python benchmarks/bench_weather_risk.py [--cells 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+import time
+
+from sar_project.agents.weather_agent import WeatherAgent
+from sar_project.agents.weather_provider import StaticWeatherProvider
+from sar_project.agents.weather_stub_server import stub_conditions
+
+
+class GridWeatherProvider(StaticWeatherProvider):
+    def get_current_conditions(self, location):
+        return stub_conditions(location)
+
+
+def best_of(repeat, run):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cells", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n in args.cells:
+        agent = WeatherAgent(cache_size=n, provider=GridWeatherProvider())
+        cells = [f"cell{i}" for i in range(n)]
+        agent.assess_weather_risk_many(cells)
+        for cell in cells:
+            agent.get_weather_forecast(cell, "2h")
+
+        single = best_of(args.repeat, lambda: [agent.assess_weather_risk(cell) for cell in cells])
+        batch = best_of(args.repeat, lambda: agent.assess_weather_risk_many(cells))
+
+        print(f"{n:>8} cells  per-cell {single * 1000:9.1f} ms  batch {batch * 1000:9.1f} ms  "
+              f"speedup {single / batch:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import contextlib
+import threading
+from collections import deque
+
+
+class AgentPool:
+    """Prewarmed pool of agents of one kind, handed out and recycled per field team.
+
+    Agents are created ahead of time by ``prewarm`` (optionally together with
+    their autogen AssistantAgent, the expensive part of an agent), so handing
+    one out at incident start is a deque pop. Released agents are reset to
+    their freshly constructed state and kept for the next caller. All agents
+    built with the default configuration share one read-only llm_config.
+
+    Usage:
+        pool = AgentPool(MedicalTeamLeader, prewarm=20)
+        with pool.lease() as agent:
+            agent.process_request(message)
+    """
+
+    def __init__(self, factory, prewarm=0, max_idle=None, warm_assistant=False):
+        """
+        Args:
+            factory (callable): Creates a new agent, e.g. an agent class or a functools.partial of one.
+            prewarm (int): Number of agents created up front.
+            max_idle (int, optional): Maximum number of idle agents kept; extra released agents are closed.
+            warm_assistant (bool): Also build each agent's AssistantAgent ahead of time.
+        """
+        self.factory = factory
+        self.max_idle = max_idle
+        self.warm_assistant = warm_assistant
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.prewarm(prewarm)
+
+    def _create(self):
+        agent = self.factory()
+        if self.warm_assistant:
+            agent.assistant
+        with self._lock:
+            self.created += 1
+        return agent
+
+    def prewarm(self, count):
+        """Create agents until at least count of them are idle."""
+        with self._lock:
+            missing = count - len(self._idle)
+        agents = [self._create() for _ in range(missing)]
+        with self._lock:
+            self._idle.extend(agents)
+
+    def acquire(self):
+        """Hand out an idle agent, creating a new one when none is left."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._create()
+
+    def release(self, agent):
+        """Reset an agent and return it to the pool."""
+        agent.reset()
+        with self._lock:
+            if self.max_idle is None or len(self._idle) < self.max_idle:
+                self._idle.append(agent)
+                return
+        _close(agent)
+
+    @contextlib.contextmanager
+    def lease(self):
+        """Context manager acquiring an agent and releasing it on exit."""
+        agent = self.acquire()
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    def __len__(self):
+        """Number of idle agents."""
+        return len(self._idle)
+
+    def close(self):
+        """Close every idle agent and empty the pool."""
+        with self._lock:
+            agents, self._idle = list(self._idle), deque()
+        for agent in agents:
+            _close(agent)
+
+
+def _close(agent):
+    # look the method up on the class: a missing attribute on the agent itself
+    # would be delegated to (and build) its AssistantAgent
+    close = getattr(type(agent), "close", None)
+    if close is not None:
+        close(agent)
@@ -1,44 +1,327 @@
-from autogen import AssistantAgent
-from abc import ABC, abstractmethod
-import google.generativeai as genai
+import asyncio
+import functools
+import os
+import threading
+import time
+from types import MappingProxyType
+
+from sar_project.agents.llm_cache import LLMResponseCache, response_key
+from sar_project.agents.request_loop import AgentRequestLoop
+from sar_project.agents.request_metrics import RequestMetrics
+
+
+def synchronized(method):
+    """Run an agent method while holding the agent's state lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._state_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config_list():
+    from dotenv import load_dotenv
+    load_dotenv()
+    return ({
+        "model": "gpt-4",
+        "api_key": os.getenv("GOOGLE_API_KEY"),
+        "deployment_name": os.getenv("DEPLOYMENT_NAME")
+    },)
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_llm_config():
+    """Read-only llm_config shared by every agent using the default config list."""
+    return MappingProxyType({
+        "temperature": 0.7,
+        "request_timeout": 600,
+        "seed": 42,
+        "config_list": tuple(MappingProxyType(config) for config in _load_config_list())
+    })
+
+
+# AssistantAgent methods and attributes reachable on the agent itself (see SARBaseAgent.__getattr__)
+ASSISTANT_ATTRIBUTES = frozenset({
+    "a_generate_reply", "can_execute_function", "chat_messages", "check_termination_and_human_reply",
+    "clear_history", "execute_code_blocks", "execute_function", "function_map", "generate_code_execution_reply",
+    "generate_function_call_reply", "generate_init_message", "generate_oai_reply", "generate_reply",
+    "get_human_input", "max_consecutive_auto_reply", "register_function", "register_reply",
+    "reset_consecutive_auto_reply_counter", "run_code", "stop_reply_at_receive",
+    "update_max_consecutive_auto_reply", "update_system_message", "use_docker",
+})
+
+
+def _as_autogen(agent):
+    """The autogen agent to hand to autogen APIs: a SAR agent's assistant, other agents as they are."""
+    return agent.assistant if isinstance(agent, SARBaseAgent) else agent
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_response_cache():
+    """LLM response cache shared by every agent, if LLM_CACHE_DIR is set."""
+    from sar_project.config import settings
+    if not settings.LLM_CACHE_DIR:
+        return None
+    return LLMResponseCache(settings.LLM_CACHE_DIR, settings.LLM_CACHE_MAX_BYTES, settings.LLM_CACHE_MEMORY_ENTRIES)
+
+
+def _cached_oai_reply(recipient, messages=None, sender=None, config=None):
+    # autogen reply function: answer a conversation seen before from the cache,
+    # otherwise ask the model and cache its answer
+    cache = config
+    if messages is None:
+        messages = recipient._oai_messages[sender]
+    key = response_key(recipient.llm_config, recipient._oai_system_message + messages)
+    reply = cache.get(key)
+    if reply is not None:
+        return True, reply
+    final, reply = recipient.generate_oai_reply(messages, sender)
+    if final and reply is not None:
+        cache.put(key, reply)
+    return final, reply
+
+
+class SARBaseAgent:
+    """Base class of the SAR agents.
+
+    The autogen AssistantAgent behind an agent is only created (and autogen
+    only imported) the first time the agent is used for LLM work, through the
+    ``assistant`` attribute or an AssistantAgent method called on the agent.
+    Agents used purely for record keeping never pay for the import.
+
+    An agent is not itself an autogen ``Agent``: ``isinstance(agent,
+    autogen.Agent)`` is False, and autogen APIs called directly need
+    ``agent.assistant``. The chat methods (initiate_chat, send, receive and
+    their async versions, and last_message) accept SAR agents and autogen agents alike, and the
+    other AssistantAgent methods listed in ASSISTANT_ATTRIBUTES are forwarded
+    to the assistant.
+
+    With a response cache (see enable_response_cache, or set LLM_CACHE_DIR),
+    a conversation the model already answered for the same model and config
+    is answered from the cache without calling the model.
+    """
+
+    # request type flag -> handler(agent, message), filled in by each agent.
+    # When a message carries several flags, the one registered first wins.
+    request_handlers = {}
+
+    # request type -> handler(agent, messages) serving a run of same-type messages at once
+    bulk_request_handlers = {}
 
-class SARBaseAgent(AssistantAgent):
     def __init__(self, name, role, system_message, knowledge_base=None):
-        super().__init__(
-            name=name,
-            system_message=system_message,
-            llm_config={
-                "temperature": 0.7,
-                "request_timeout": 600,
-                "seed": 42,
-                "config_list": self.get_config_list()
-            }
-        )
+        self.name = name
+        self.system_message = system_message
+        if type(self).get_config_list is SARBaseAgent.get_config_list:
+            self.llm_config = _shared_llm_config()
+        else:
+            self.llm_config = MappingProxyType({**_shared_llm_config(), "config_list": tuple(self.get_config_list())})
+        self._assistant = None
+        self.response_cache = _shared_response_cache()
         self.role = role
         self.kb = knowledge_base
         self.mission_status = "standby"
+        # guards the agent's mutable state when requests are served from several threads
+        self._state_lock = threading.RLock()
+        # per-request-type counts, errors and latencies of process_request(s)
+        self.metrics = RequestMetrics()
+
+    @property
+    def assistant(self):
+        """The autogen AssistantAgent doing the agent's LLM work, created on first use."""
+        if self._assistant is None:
+            from autogen import AssistantAgent
+            llm_config = {**self.llm_config, "config_list": [dict(config) for config in self.llm_config["config_list"]]}
+            if self.response_cache is not None:
+                # the response cache replaces autogen's own seed-keyed disk cache
+                llm_config["use_cache"] = False
+            self._assistant = AssistantAgent(name=self.name, system_message=self.system_message, llm_config=llm_config)
+            if self.response_cache is not None:
+                self._register_response_cache()
+        return self._assistant
+
+    def enable_response_cache(self, cache):
+        """Answer repeated LLM conversations from an LLMResponseCache (None disables caching).
+
+        Must be called before the agent's first LLM use.
+        """
+        if self._assistant is not None:
+            raise RuntimeError("enable_response_cache must be called before the assistant is created")
+        self.response_cache = cache
+
+    def _register_response_cache(self):
+        from autogen import Agent
+        # right in front of the model call, after termination, function call and code execution replies
+        replies = [entry["reply_func"] for entry in self._assistant._reply_func_list]
+        position = replies.index(type(self._assistant).generate_oai_reply)
+        self._assistant.register_reply([Agent, None], _cached_oai_reply, position=position, config=self.response_cache)
+
+    def __getattr__(self, attr):
+        # only called for attributes the agent itself lacks: hand the listed AssistantAgent
+        # methods to the lazily built assistant, anything else (e.g. a typo) is a plain AttributeError
+        if attr in ASSISTANT_ATTRIBUTES:
+            return getattr(self.assistant, attr)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {attr!r}")
+
+    def initiate_chat(self, recipient, *args, **kwargs):
+        """Start an autogen chat with recipient, a SAR agent or an autogen agent."""
+        return self.assistant.initiate_chat(_as_autogen(recipient), *args, **kwargs)
+
+    async def a_initiate_chat(self, recipient, *args, **kwargs):
+        """Coroutine version of initiate_chat."""
+        return await self.assistant.a_initiate_chat(_as_autogen(recipient), *args, **kwargs)
+
+    def send(self, message, recipient, *args, **kwargs):
+        """Send an autogen message to recipient, a SAR agent or an autogen agent."""
+        return self.assistant.send(message, _as_autogen(recipient), *args, **kwargs)
+
+    async def a_send(self, message, recipient, *args, **kwargs):
+        """Coroutine version of send."""
+        return await self.assistant.a_send(message, _as_autogen(recipient), *args, **kwargs)
+
+    def receive(self, message, sender, *args, **kwargs):
+        """Receive an autogen message from sender, a SAR agent or an autogen agent."""
+        return self.assistant.receive(message, _as_autogen(sender), *args, **kwargs)
+
+    async def a_receive(self, message, sender, *args, **kwargs):
+        """Coroutine version of receive."""
+        return await self.assistant.a_receive(message, _as_autogen(sender), *args, **kwargs)
+
+    def last_message(self, agent=None):
+        """Last message exchanged with agent, a SAR agent or an autogen agent (see AssistantAgent.last_message)."""
+        return self.assistant.last_message(None if agent is None else _as_autogen(agent))
 
     def get_config_list(self):
-        """Load configuration from environment variables"""
-        import os
-        from dotenv import load_dotenv
-        load_dotenv()
-        return [{
-            "model": "gpt-4",
-            "api_key": os.getenv("GOOGLE_API_KEY"),
-            "deployment_name": os.getenv("DEPLOYMENT_NAME")
-        }]
-
-@abstractmethod
-def process_request(self, message):
-    """Process incoming requests - must be implemented by specific agents"""
-    pass
-
-def update_status(self, status):
-    """Update agent's mission status"""
-    self.mission_status = status
-    return {"status": "updated", "new_status": status}
-
-def get_status(self):
-    """Return current status"""
-    return self.mission_status
\ No newline at end of file
+        """Load configuration from environment variables (read once per process)"""
+        return [dict(config) for config in _load_config_list()]
+
+    def get_request_type(self, message):
+        """Return the registered request type of a message, or None if it has none."""
+        matches = [key for key in message if key in self.request_handlers]
+        if len(matches) > 1:
+            registration_order = list(self.request_handlers)
+            matches.sort(key=registration_order.index)
+        return matches[0] if matches else None
+
+    def process_request(self, message):
+        """Process an incoming request through the agent's request handler table.
+
+        Every request is recorded in the agent's metrics under its type ('unknown'
+        if it has none); results carrying an 'error' key count as errors.
+        """
+        start = time.perf_counter_ns()
+        request_type, result = self._dispatch_request(message)
+        self.metrics.record(
+            request_type or "unknown",
+            time.perf_counter_ns() - start,
+            1 if result.__class__ is dict and "error" in result else 0
+        )
+        return result
+
+    def _dispatch_request(self, message):
+        """Serve a request without recording it in the metrics; returns (request type, result).
+
+        Bulk handlers use this for the messages they serve one by one, since
+        process_requests records the whole run.
+        """
+        request_type = None
+        try:
+            request_type = self.get_request_type(message)
+            if request_type is None:
+                result = {"error": "Unknown request type"}
+            else:
+                sampled = self.metrics.sampler(request_type)
+                if sampled is None:
+                    result = self.request_handlers[request_type](self, message)
+                else:
+                    with sampled:
+                        result = self.request_handlers[request_type](self, message)
+        except Exception as e:
+            result = {"error": str(e)}
+        return request_type, result
+
+    async def aprocess_request(self, message, executor=None):
+        """Coroutine version of process_request.
+
+        The request runs in a worker thread so the event loop stays free while
+        the agent works.
+
+        Args:
+            message (dict): The request message.
+            executor (concurrent.futures.Executor, optional): Executor to run on,
+                defaults to the event loop's default executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.process_request, message)
+
+    def request_loop(self, max_concurrency=8, max_pending=100):
+        """Create an asyncio request loop serving this agent.
+
+        Args:
+            max_concurrency (int): Maximum number of requests processed at the same time.
+            max_pending (int): Maximum number of queued requests before submit() blocks.
+
+        Returns:
+            AgentRequestLoop: Loop to start (or use as an async context manager).
+        """
+        return AgentRequestLoop(self, max_concurrency=max_concurrency, max_pending=max_pending)
+
+    def process_requests(self, messages):
+        """Process a batch of requests in one call.
+
+        Consecutive messages of the same type are handed to the bulk handler for
+        that type when one is registered; everything else goes through
+        process_request. Grouping only consecutive runs keeps the batch's
+        ordering semantics (e.g. add then update of the same patient).
+
+        Args:
+            messages (list): Request messages, as accepted by process_request.
+
+        Returns:
+            list: One result per message, in the same order.
+        """
+        results = []
+        run_type, run = None, []
+        for message in messages:
+            try:
+                request_type = self.get_request_type(message)
+            except Exception:
+                # a malformed message goes through process_request, which turns it into an error result
+                request_type = None
+            if run and request_type != run_type:
+                results.extend(self._process_run(run_type, run))
+                run = []
+            run_type = request_type
+            run.append(message)
+        if run:
+            results.extend(self._process_run(run_type, run))
+        return results
+
+    def _process_run(self, request_type, messages):
+        bulk_handler = self.bulk_request_handlers.get(request_type)
+        if bulk_handler is None or len(messages) == 1:
+            return [self.process_request(message) for message in messages]
+        start = time.perf_counter_ns()
+        results = bulk_handler(self, messages)
+        # a bulk run is recorded as its messages, each taking an equal share of the run
+        errors = sum(1 for result in results if result.__class__ is dict and "error" in result)
+        self.metrics.record(request_type, (time.perf_counter_ns() - start) // len(messages), errors, len(messages))
+        return results
+
+    def reset(self):
+        """Return the agent to standby and clear its LLM conversation history, for reuse.
+
+        Request metrics are kept, so they cover every team the agent served.
+        """
+        self.mission_status = "standby"
+        if self._assistant is not None:
+            self._assistant.reset()
+
+    def update_status(self, status):
+        """Update agent's mission status"""
+        self.mission_status = status
+        return {"status": "updated", "new_status": status}
+
+    def get_status(self):
+        """Return current status"""
+        return self.mission_status
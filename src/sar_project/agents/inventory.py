@@ -0,0 +1,196 @@
+import threading
+import weakref
+from collections import deque
+from collections.abc import Mapping
+
+
+class InventoryLedger(Mapping):
+    """Per-agent supply ledger with atomic, lock-striped updates.
+
+    Each item maps to one of ``stripes`` locks, so updates to the same item are
+    serialized (no lost read-modify-write updates) while updates to different
+    items rarely contend and never wait on one global lock. Reads are plain
+    dict lookups and take no lock.
+
+    Change notifications are queued per stripe under the item's lock and
+    delivered after it is released, by whichever writer of that stripe gets
+    to them first, so ``on_change`` may itself update the ledger without
+    deadlocking and still sees the changes of one item in order.
+    """
+
+    def __init__(self, quantities=None, stripes=16, on_change=None):
+        """
+        Args:
+            quantities (dict, optional): Initial quantity per item.
+            stripes (int): Number of locks the items are spread over.
+            on_change (callable, optional): Called as on_change(item, new_quantity) after every
+                write, once the item's lock is released; calls for one item arrive in write order.
+        """
+        self._quantities = dict(quantities or {})
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._changes = [deque() for _ in range(stripes)]
+        self._notify_locks = [threading.Lock() for _ in range(stripes)]
+        self.on_change = on_change
+
+    def _stripe(self, item):
+        return hash(item) % len(self._locks)
+
+    def _notify(self, stripe):
+        changes, notify_lock = self._changes[stripe], self._notify_locks[stripe]
+        while changes:
+            if not notify_lock.acquire(blocking=False):
+                # another writer is delivering this stripe's changes and will deliver ours too
+                return
+            try:
+                while changes:
+                    self.on_change(*changes.popleft())
+            finally:
+                notify_lock.release()
+
+    def __getitem__(self, item):
+        return self._quantities[item]
+
+    def __iter__(self):
+        return iter(list(self._quantities))
+
+    def __len__(self):
+        return len(self._quantities)
+
+    def get(self, item, default=0):
+        """Return the current quantity of an item."""
+        return self._quantities.get(item, default)
+
+    def set(self, item, quantity):
+        """Overwrite the quantity of an item."""
+        stripe = self._stripe(item)
+        with self._locks[stripe]:
+            self._quantities[item] = quantity
+            if self.on_change is not None:
+                self._changes[stripe].append((item, quantity))
+        if self.on_change is not None:
+            self._notify(stripe)
+
+    def adjust(self, item, delta):
+        """Atomically add delta (which may be negative) to an item's quantity.
+
+        Returns:
+            The new quantity.
+        """
+        stripe = self._stripe(item)
+        with self._locks[stripe]:
+            quantity = self._quantities.get(item, 0) + delta
+            self._quantities[item] = quantity
+            if self.on_change is not None:
+                self._changes[stripe].append((item, quantity))
+        if self.on_change is not None:
+            self._notify(stripe)
+        return quantity
+
+    def increment(self, item, amount=1):
+        """Atomically add amount to an item's quantity and return the new quantity."""
+        return self.adjust(item, amount)
+
+    def decrement(self, item, amount=1):
+        """Atomically remove amount from an item's quantity and return the new quantity."""
+        return self.adjust(item, -amount)
+
+
+class ReorderAggregator:
+    """Coalesces supply reorders per item and places them from a background thread.
+
+    Callers only mark an item as possibly short. Every ``window`` seconds the
+    background thread looks at each marked item once, works out its current
+    shortfall, subtracts what is already on order (in flight), and places at
+    most one consolidated order for the rest. Fifty decrements of the same item
+    within a window therefore produce a single order, and callers never wait
+    on the ordering system.
+
+    The background thread only holds a weak reference to the aggregator, so
+    an agent dropped without close() is still garbage collected; its thread
+    then exits and orders still pending are not placed.
+    """
+
+    def __init__(self, place_order, get_shortfall, window=30.0):
+        """
+        Args:
+            place_order (callable): Called as place_order(item, quantity) to place an order.
+            get_shortfall (callable): Returns how many units of an item are needed right now.
+            window (float): Seconds over which reorder requests are collected.
+        """
+        self.place_order = place_order
+        self.get_shortfall = get_shortfall
+        self.window = window
+        self._pending = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+
+    def mark(self, item):
+        """Mark an item as possibly below its reorder threshold."""
+        with self._lock:
+            self._pending[item] = None
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=_run_aggregator, args=(weakref.ref(self), self._wakeup, self.window),
+                    name="reorder-aggregator", daemon=True
+                )
+                self._thread.start()
+                # wake the thread up to exit as soon as the aggregator is collected
+                weakref.finalize(self, self._wakeup.set)
+
+    def receive(self, item, quantity):
+        """Record supplies that arrived, reducing the quantity still in flight for the item."""
+        with self._lock:
+            if item in self._in_flight:
+                remaining = self._in_flight[item] - quantity
+                if remaining > 0:
+                    self._in_flight[item] = remaining
+                else:
+                    del self._in_flight[item]
+
+    def in_flight(self, item):
+        """Return the quantity of an item ordered but not yet received."""
+        return self._in_flight.get(item, 0)
+
+    def flush(self):
+        """Place the consolidated orders for every marked item now.
+
+        Returns:
+            dict: Quantity ordered per item in this flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                items, self._pending = list(self._pending), {}
+            orders = {}
+            for item in items:
+                with self._lock:
+                    quantity = self.get_shortfall(item) - self._in_flight.get(item, 0)
+                    if quantity <= 0:
+                        continue
+                    self._in_flight[item] = self._in_flight.get(item, 0) + quantity
+                self.place_order(item, quantity)
+                orders[item] = quantity
+            return orders
+
+    def close(self):
+        """Place any pending orders and stop the background thread."""
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+
+def _run_aggregator(aggregator_ref, wakeup, window):
+    # holds the aggregator (and through it the agent) only while flushing
+    while True:
+        wakeup.wait(window)
+        wakeup.clear()
+        aggregator = aggregator_ref()
+        if aggregator is None or aggregator._closed:
+            return
+        aggregator.flush()
+        del aggregator
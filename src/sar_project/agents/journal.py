@@ -0,0 +1,235 @@
+import atexit
+import contextlib
+import gc
+import json
+import os
+import pickle
+import threading
+
+SNAPSHOT_PREFIX = "snapshot-"
+SNAPSHOT_SUFFIX = ".pickle"
+JOURNAL_PREFIX = "journal-"
+JOURNAL_SUFFIX = ".log"
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def check_json(value):
+    """Raise TypeError unless value survives a JSON round trip unchanged.
+
+    Only dicts with string keys, lists, strings, numbers, booleans and None
+    qualify: json.dumps would turn tuples into lists, non-string keys into
+    strings, and fail on (or, with a default, stringify) anything else.
+    """
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            for key in value:
+                if key.__class__ is not str:
+                    raise TypeError(f"Journal values need string keys, got {key!r}")
+            stack.extend(value.values())
+        elif value.__class__ is list:
+            stack.extend(value)
+        elif not isinstance(value, _JSON_SCALARS):
+            raise TypeError(f"Value of type {type(value).__name__} cannot be journaled: {value!r}")
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """Pause the cyclic garbage collector while (un)pickling millions of small objects.
+
+    None of them can be garbage yet, so the generational collections the
+    allocations would trigger are pure overhead.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+class StateJournal:
+    """Append-only write-ahead journal with periodic compacted snapshots.
+
+    Every mutation is appended as one JSON line ``[seq, op, key, value]``.
+    Appends only go to an in-memory buffer; a background thread group-commits
+    the buffer (one write and one fsync per batch) every ``flush_interval``
+    seconds or as soon as ``batch_size`` entries are waiting, so callers never
+    pay per-request fsync latency.
+
+    A snapshot holds the full state up to a sequence number, which is part of
+    its file name. Snapshots are pickled so they load back in one C-speed pass;
+    they should only be read from a directory the agent itself writes to.
+    Writing one starts a new journal file and deletes the files it covers, so
+    cold-start recovery only loads the snapshot and replays the journal tail
+    written after it.
+    """
+
+    def __init__(self, directory, batch_size=1024, flush_interval=0.05, snapshot_every=100_000):
+        """
+        Args:
+            directory (str): Directory holding the snapshot and journal files.
+            batch_size (int): Number of buffered entries that triggers an early flush.
+            flush_interval (float): Maximum seconds an entry stays buffered before it is written.
+            snapshot_every (int): Number of journal entries after which a snapshot is due.
+        """
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._buffer = []
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        snapshots = self._files(SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX)
+        self.snapshot_seq = snapshots[-1][1] if snapshots else 0
+        self._tail = [
+            entry for entry in self._read_journal_entries()
+            if entry[0] > self.snapshot_seq
+        ]
+        self.last_seq = self._tail[-1][0] if self._tail else self.snapshot_seq
+        self.entries_since_snapshot = len(self._tail)
+        self._file = self._open_journal_file(self.last_seq + 1)
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="state-journal-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _files(self, prefix, suffix):
+        """Return (path, sequence number) of every file of one kind, oldest first."""
+        files = []
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(suffix):
+                seq = int(name[len(prefix):-len(suffix)])
+                files.append((os.path.join(self.directory, name), seq))
+        return sorted(files, key=lambda item: item[1])
+
+    def _open_journal_file(self, first_seq):
+        self._file_first_seq = first_seq
+        path = os.path.join(self.directory, f"{JOURNAL_PREFIX}{first_seq:012d}{JOURNAL_SUFFIX}")
+        return open(path, "a", encoding="utf-8")
+
+    def _read_journal_entries(self):
+        for path, _ in self._files(JOURNAL_PREFIX, JOURNAL_SUFFIX):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # torn write at the tail of a journal file from a crash mid-flush
+                        break
+
+    def append(self, op, key, value):
+        """Buffer one mutation for the next group commit.
+
+        Args:
+            op (str): Kind of state being changed (e.g. 'patient', 'inventory').
+            key: Identifier of the changed item.
+            value: New value of the item; must survive a JSON round trip (see check_json).
+
+        Returns:
+            int: Sequence number assigned to the entry.
+
+        Raises:
+            TypeError: If the key or value is not made of JSON types.
+        """
+        check_json([op, key, value])
+        with self._lock:
+            self.last_seq += 1
+            self.entries_since_snapshot += 1
+            self._buffer.append(json.dumps([self.last_seq, op, key, value]))
+            if len(self._buffer) >= self.batch_size:
+                self._wakeup.set()
+            return self.last_seq
+
+    def snapshot_due(self):
+        """Return True once enough entries were journaled since the last snapshot."""
+        return self.entries_since_snapshot >= self.snapshot_every
+
+    def flush(self):
+        """Write and fsync every buffered entry."""
+        with self._write_lock:
+            self._flush_buffer()
+
+    def _flush_buffer(self):
+        # caller holds the write lock
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines or self._file.closed:
+            return
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def write_snapshot(self, state, seq):
+        """Persist a compacted snapshot and drop the files it makes obsolete.
+
+        Args:
+            state (dict): Full picklable state.
+            seq (int): Sequence number of the last entry reflected in the state.
+        """
+        path = os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{seq:012d}{SNAPSHOT_SUFFIX}")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f, _gc_paused():
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        with self._write_lock:
+            self._flush_buffer()
+            with self._lock:
+                self.snapshot_seq = seq
+                self.entries_since_snapshot = self.last_seq - seq
+                next_seq = self.last_seq + 1
+            if next_seq > self._file_first_seq:
+                self._file.close()
+                self._file = self._open_journal_file(next_seq)
+
+            for old_path, old_seq in self._files(SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX):
+                if old_seq < seq:
+                    os.remove(old_path)
+            journals = self._files(JOURNAL_PREFIX, JOURNAL_SUFFIX)
+            for (old_path, _), (_, next_first_seq) in zip(journals, journals[1:]):
+                # every entry of a file is older than the first entry of the next one
+                if next_first_seq <= seq + 1:
+                    os.remove(old_path)
+
+    def recover(self):
+        """Load the latest snapshot and the journal entries written after it.
+
+        Returns:
+            tuple: (state dict or None, list of (op, key, value) entries in order)
+        """
+        state = None
+        snapshots = self._files(SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX)
+        if snapshots:
+            with open(snapshots[-1][0], "rb") as f, _gc_paused():
+                state = pickle.load(f)
+        entries = [(op, key, value) for _, op, key, value in self._tail]
+        self._tail = []
+        return state, entries
+
+    def close(self):
+        """Flush outstanding entries and stop the background flusher."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+        self._file.close()
+        atexit.unregister(self.close)
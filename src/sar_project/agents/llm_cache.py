@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# llm_config fields that do not change what the model answers, left out of cache keys
+_UNKEYED_FIELDS = frozenset({"api_key", "api_base", "api_type", "api_version", "base_url", "deployment_name",
+                             "request_timeout", "timeout", "max_retry_period", "retry_wait_time", "use_cache"})
+_ENTRY_SUFFIX = ".json"
+
+
+def response_key(llm_config, messages):
+    """
+    Cache key of an LLM request: a SHA-256 over the models, the generation
+    config and the messages, in a canonical JSON encoding.
+
+    Credentials, endpoints and timeouts are not part of the key, so the same
+    conversation hits the cache wherever the model is served from.
+
+    Args:
+        llm_config (Mapping): The agent's llm_config, with its 'config_list'.
+        messages (list): Messages sent to the model, system message included.
+
+    Returns:
+        str: Hex digest.
+    """
+    models = [config.get("model") for config in llm_config.get("config_list", ())]
+    config = {key: value for key, value in llm_config.items() if key != "config_list" and key not in _UNKEYED_FIELDS}
+    payload = json.dumps({"models": models, "config": config, "messages": messages},
+                         sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Disk-backed cache of LLM replies with an optional in-memory LRU front.
+
+    Every reply is stored as a small JSON file named by its key, written to a
+    temporary file and renamed into place, so concurrent writers and crashes
+    never leave a torn entry. The entries are kept in least recently used
+    order (file modification times survive restarts); once their total size
+    exceeds ``max_bytes`` the least recently used ones are deleted. Up to
+    ``memory_entries`` replies are also kept in memory, so hot entries skip
+    the file read.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 2 ** 20, memory_entries=1024):
+        """
+        Args:
+            directory (str): Directory of the cache files, created if missing. Existing
+                entries are reused.
+            max_bytes (int): Total size of the entries kept on disk.
+            memory_entries (int): Number of replies kept in memory, 0 disables the memory front.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._sizes = OrderedDict()  # key -> bytes on disk, least recently used first
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(_ENTRY_SUFFIX) and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, entry.name[:-len(_ENTRY_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total += size
+        self._evict()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _ENTRY_SUFFIX)
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def __contains__(self, key):
+        return key in self._sizes
+
+    @property
+    def size(self):
+        """Bytes of the entries on disk."""
+        return self._total
+
+    def get(self, key):
+        """Return the cached reply for a key, or None."""
+        with self._lock:
+            reply = self._memory.get(key)
+            if reply is not None:
+                self._memory.move_to_end(key)
+                self._sizes.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return reply
+            if key not in self._sizes:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    reply = json.load(f)["reply"]
+                os.utime(self._path(key))
+            except (OSError, ValueError, KeyError):
+                # deleted or damaged by another process: treat it as a miss
+                self._forget(key)
+                self.misses += 1
+                return None
+            self._sizes.move_to_end(key)
+            self._remember(key, reply)
+            self.hits += 1
+            return reply
+
+    def put(self, key, reply):
+        """Store the reply for a key, evicting least recently used entries beyond max_bytes."""
+        data = json.dumps({"reply": reply}, sort_keys=True).encode()
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        with self._lock:
+            self._total += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            self._remember(key, reply)
+            self._evict()
+
+    def _remember(self, key, reply):
+        if self.memory_entries:
+            self._memory[key] = reply
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _evict(self):
+        # caller holds the lock (or is still constructing the cache)
+        while self._total > self.max_bytes and self._sizes:
+            key = next(iter(self._sizes))
+            self._forget(key)
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+
+    def _forget(self, key):
+        self._total -= self._sizes.pop(key, 0)
+        self._memory.pop(key, None)
+
+    def clear(self):
+        """Delete every entry."""
+        with self._lock:
+            for key in list(self._sizes):
+                self._forget(key)
+                try:
+                    os.unlink(self._path(key))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        """Hit/miss counters, entry count and size of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._sizes),
+            "bytes": self._total,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,130 @@
+"""Local fake LLM endpoint for tests and offline benchmarks.
+
+Serves an OpenAI-compatible chat completions API (the one autogen's
+AssistantAgent calls) whose reply is derived deterministically from the
+model and the last message, with an optional artificial latency, and counts
+the requests it answered.
+
+Usage:
+    python -m sar_project.agents.llm_stub_server [--port 8081] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import threading
+import time
+import zlib
+
+
+def stub_reply(model, messages):
+    """Deterministic reply of the fake model to a conversation."""
+    last = messages[-1].get("content") or "" if messages else ""
+    return f"[{model}] ack {zlib.crc32(last.encode()):08x}: {last[:80]}"
+
+
+class StubLLMServer:
+    """Fake chat completions endpoint running on its own event loop thread.
+
+    Usage:
+        with StubLLMServer() as server:
+            config_list = [{"model": "gpt-4", "api_key": "test", "api_base": server.api_base}]
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        """
+        Args:
+            host (str): Interface to listen on.
+            port (int): Port to listen on, 0 picks a free one.
+            latency (float): Seconds every response is delayed by.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.requests = 0
+        self._loop = None
+        self._thread = None
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def api_base(self):
+        """Base URL to configure as the model's 'api_base'."""
+        return f"{self.url}/v1"
+
+    async def _chat_completions(self, request):
+        from aiohttp import web
+        self.requests += 1
+        body = await request.json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        model = body.get("model", "unknown")
+        content = stub_reply(model, body.get("messages", []))
+        return web.json_response({
+            "id": f"chatcmpl-stub-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+    async def _start(self):
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._chat_completions)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def start(self):
+        """Start serving in a background thread and return the base URL."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="stub-llm-server", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self.url
+
+    def stop(self):
+        """Stop serving and join the background thread."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.host, args.port, args.latency)
+    server.start()
+    print(f"Stub LLM server listening on {server.api_base}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,29 @@
-from sar_project.agents.base_agent import SARBaseAgent
-from datetime import datetime
+from sar_project.agents.base_agent import SARBaseAgent, synchronized
+from sar_project.agents.inventory import InventoryLedger, ReorderAggregator
+from sar_project.agents.journal import StateJournal, check_json
+from sar_project.agents.patient_record import PatientRecord, timestamp_now
+from sar_project.agents.transport import TRANSPORT_OPTIONS, TransportScheduler
+from sar_project.agents.triage_queue import TriageQueue, SEVERITY_TO_PRIORITY
+from sar_project.config.logging_config import log_event
+import copy
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 class MedicalTeamLeader(SARBaseAgent):
 
-    def __init__(self):
+    # batches at least this large are triaged with the vectorized bulk path
+    bulk_triage_threshold = 1000
+
+    def __init__(self, journal_dir=None, snapshot_every=100_000, reorder_window=30.0):
+        """
+        Args:
+            journal_dir (str, optional): Directory for the durable state journal. When set,
+                state is recovered from it on start-up and every mutation is journaled.
+            snapshot_every (int): Number of journaled mutations between compacted snapshots.
+            reorder_window (float): Seconds over which supply reorders are coalesced per item.
+        """
         super().__init__(
             name="Medical_Team_Leader",
             role="Medical Team Leader",
@@ -14,79 +34,165 @@ class MedicalTeamLeader(SARBaseAgent):
             4. Provide medical care to injured personnel
             5. Manage medical resources and coordinate with local hospitals if needed"""
         )
-        self.patient_records = {}
+        self.reorder_window = reorder_window
+        self.field_subscription = None
+        self.router = None
+        self._init_state()
+
+        self.journal = None
+        if journal_dir is not None:
+            self.journal = StateJournal(journal_dir, snapshot_every=snapshot_every)
+            self._recover_state()
+            self.inventory_database.on_change = lambda item, quantity: self._journal("inventory", item, quantity)
 
-    inventory_database = {
+    default_inventory = {
         "bandages": 100,
         "antiseptic": 50,
         "painkillers": 75
     }
 
-    reorder_thresholds = {
+    default_reorder_thresholds = {
         "bandages": 80,
         "antiseptic": 40,
         "painkillers": 50
     }
     
-    health_data = {
+    default_health_data = {
         "average_stress_level": "moderate",
         "high_risk_members": 2,
         "recommendations": ["mandatory rest for high-risk members", "team debriefing session"]
     }
 
-    def process_request(self, message):
-        """Process medical-related requests"""
-        try:
-            if "triage_request" in message:
-                return self.handle_triage(message["patients"])
-            elif "transport_request" in message:
-                return self.organize_transport(
-                    message["patient_id"], 
-                    message["destination"], 
-                    message["urgency"]
-                )
-            elif "supply_request" in message:
-                return self.manage_supplies(message["item"], message["quantity"])
-            elif "health_monitoring_request" in message:
-                return self.monitor_team_health()
-            elif "field_adaptation_request" in message:
-                return self.adapt_to_field_conditions(message["conditions"])
-            elif "add_patient_request" in message:
-                return self.add_patient(message["patient_data"])
-            elif "update_patient_request" in message:
-                return self.update_patient_record(
-                    message["patient_id"],
-                    message["update_data"]
-                )
-            elif "get_patient_request" in message:
-                return self.get_patient_record(message["patient_id"])
-            elif "list_patients_request" in message:
-                return self.list_patients(message.get("status", None))
-            elif "discharge_patient_request" in message:
-                return self.discharge_patient(
-                    message["patient_id"],
-                    message.get("discharge_notes", "")
-                )
-            else:
-                return {"error": "Unknown request type"}
-        except Exception as e:
-            return {"error": str(e)}
+    # medical request types, dispatched by SARBaseAgent.process_request
+    request_handlers = {
+        "triage_request": lambda agent, message: agent.handle_triage(message["patients"]),
+        "transport_request": lambda agent, message: agent.organize_transport(
+            message["patient_id"],
+            message["destination"],
+            message["urgency"],
+            message.get("position", None)
+        ),
+        "transport_batch_request": lambda agent, message: agent.organize_transport_batch(message["transports"]),
+        "supply_request": lambda agent, message: agent.manage_supplies(message["item"], message["quantity"]),
+        "health_monitoring_request": lambda agent, message: agent.monitor_team_health(),
+        "field_adaptation_request": lambda agent, message: agent.adapt_to_field_conditions(message["conditions"]),
+        "add_patient_request": lambda agent, message: agent.add_patient(message["patient_data"]),
+        "update_patient_request": lambda agent, message: agent.update_patient_record(
+            message["patient_id"],
+            message["update_data"]
+        ),
+        "get_patient_request": lambda agent, message: agent.get_patient_record(message["patient_id"]),
+        "list_patients_request": lambda agent, message: agent.list_patients(
+            message.get("status", None),
+            message.get("severity", None)
+        ),
+        "discharge_patient_request": lambda agent, message: agent.discharge_patient(
+            message["patient_id"],
+            message.get("discharge_notes", "")
+        ),
+        "admit_arrivals_request": lambda agent, message: agent.admit_arrivals(message["patients"]),
+        "next_patient_request": lambda agent, message: agent.next_patient(),
+        "triage_ranking_request": lambda agent, message: agent.get_triage_ranking(),
+        "snapshot_request": lambda agent, message: agent.snapshot(),
+    }
 
+    bulk_request_handlers = {
+        "supply_request": lambda agent, messages: agent._process_supply_requests(messages),
+    }
 
+
+    @synchronized
     def handle_triage(self, patients):
         """Handle triage of incoming patients by sorting them from high to low severity and within the same severity by time of arrival."""
-        severity_to_priority = {"high": 1, "medium": 2, "low": 3}
+        if len(patients) >= self.bulk_triage_threshold:
+            return self.handle_triage_bulk(patients)
+        self._check_journaled([[patient["id"], patient["arrival_time"]] for patient in patients])
+
         # sorting patients by severity and then arrival time, if severities are the same
-        sorted_patients = sorted(patients, key=lambda x: (severity_to_priority[x["severity"]], x["arrival_time"]))
+        sorted_patients = sorted(patients, key=lambda x: (SEVERITY_TO_PRIORITY[x["severity"]], x["arrival_time"]))
         triaged_data = {patient["id"]: i+1 for i, patient in enumerate(sorted_patients)}
         
+        self._record_triage(patients)
+        self.triage_queue.push_many(patients)
+                
+        return triaged_data
+
+    @synchronized
+    def handle_triage_bulk(self, patients):
+        """Triage a large batch of patients in one vectorized pass.
+
+        Severity and arrival time are encoded into NumPy arrays and ranked with a
+        single stable lexsort, and the patient records are upserted in one loop
+        with a shared triage timestamp.
+
+        Args:
+            patients (list): Patient dicts with 'id', 'severity' and 'arrival_time'.
+
+        Returns:
+            dict: Patient IDs mapped to triage priority, same as handle_triage.
+        """
+        entries = [[patient["id"], patient["severity"], patient["arrival_time"]] for patient in patients]
+        self._check_journaled(entries)
+        ids = [patient["id"] for patient in patients]
+        severities = np.array([patient["severity"] for patient in patients])
+        arrival_times = np.array([patient["arrival_time"] for patient in patients])
+
+        priorities = np.zeros(len(patients), dtype=np.int8)
+        for severity, priority in SEVERITY_TO_PRIORITY.items():
+            priorities[severities == severity] = priority
+        if not priorities.all():
+            raise KeyError(severities[priorities == 0][0].item())
+
+        if arrival_times.dtype == object:
+            # mixed arrival time types cannot be lexsorted, fall back to a stable Python sort
+            order = sorted(range(len(patients)), key=lambda i: (priorities[i], arrival_times[i]))
+        else:
+            order = np.lexsort((arrival_times, priorities)).tolist()
+        triaged_data = dict(zip([ids[i] for i in order], range(1, len(patients) + 1)))
+
+        triage_time = timestamp_now()
+        self._upsert_triaged(patients, triage_time)
+        # journaled as one logical entry, replaying it re-applies the batch with the same timestamp
+        self._journal("triage_batch", triage_time, entries)
+
+        return triaged_data
+
+    def _upsert_triaged(self, patients, triage_time):
+        """Create or update the records of a triaged batch with one shared timestamp."""
+        for patient in patients:
+            record = self.patient_records.get(patient["id"])
+            if record is None:
+                self._index_patient(patient["id"], None, None, "triaged", patient["severity"])
+                self.patient_records[patient["id"]] = PatientRecord({
+                    "id": patient["id"],
+                    "severity": patient["severity"],
+                    "arrival_time": patient["arrival_time"],
+                    "triage_time": triage_time,
+                    "status": "triaged",
+                    "registration_time": triage_time
+                })
+            else:
+                self._index_patient(
+                    patient["id"], record.get("status"), record.get("severity"),
+                    "triaged", patient["severity"]
+                )
+                record.update({
+                    "severity": patient["severity"],
+                    "triage_time": triage_time,
+                    "status": "triaged",
+                    "last_updated": triage_time
+                })
+        self.triage_queue.push_many(patients)
+
+    def _record_triage(self, patients):
+        """Create or update the patient records of freshly triaged patients."""
         for patient in patients:
             if patient["id"] not in self.patient_records:
                 self.add_patient({
                     "id": patient["id"],
                     "severity": patient["severity"],
                     "arrival_time": patient["arrival_time"],
-                    "triage_time": datetime.now().isoformat(),
+                    "triage_time": timestamp_now(),
                     "status": "triaged"
                 })
             else:
@@ -94,63 +200,191 @@ class MedicalTeamLeader(SARBaseAgent):
                     patient["id"],
                     {
                         "severity": patient["severity"],
-                        "triage_time": datetime.now().isoformat(),
+                        "triage_time": timestamp_now(),
                         "status": "triaged"
                     }
                 )
-                
-        return triaged_data
 
-    def organize_transport(self, patient_id, destination, urgency):
+    def admit_arrivals(self, patients):
+        """Admit newly arrived patients into the persistent triage queue.
+
+        Unlike handle_triage, the ranking is kept across calls: each arrival is
+        inserted into the queue in O(log n) instead of re-sorting everyone.
+
+        Args:
+            patients (iterable): Patient dicts with 'id', 'severity' and 'arrival_time'.
+                May be a generator, so arrivals can be streamed in as they come.
+
+        Returns:
+            dict: Number of admitted patients, queue length and the next patient to treat.
+        """
+        admitted = 0
+        for patient in patients:
+            # validate severity before touching the records
+            SEVERITY_TO_PRIORITY[patient["severity"]]
+            self._check_journaled([patient["id"], patient["arrival_time"]])
+            # locked per arrival, a streaming source may block between arrivals
+            with self._state_lock:
+                self._record_triage([patient])
+                self.triage_queue.push(patient["id"], patient["severity"], patient["arrival_time"])
+            admitted += 1
+
+        with self._state_lock:
+            return {
+                "status": "success",
+                "admitted": admitted,
+                "queue_length": len(self.triage_queue),
+                "next_patient": self.triage_queue.peek()
+            }
+
+    @synchronized
+    def next_patient(self):
+        """Remove the highest-priority patient from the triage queue.
+
+        Returns:
+            dict: The next patient's record, or a message if the queue is empty.
+        """
+        patient_id = self.triage_queue.pop()
+        if patient_id is None:
+            return {"status": "empty", "message": "No patients waiting for treatment"}
+        self._journal("dequeue", patient_id, None)
+        record = self.patient_records.get(patient_id)
+
+        return {
+            "status": "success",
+            "patient_id": patient_id,
+            "patient_data": record.as_dict() if record is not None else {},
+            "queue_length": len(self.triage_queue)
+        }
+
+    @synchronized
+    def get_triage_ranking(self):
+        """Return the current ranking of every patient waiting in the triage queue.
+
+        Returns:
+            dict: Patient IDs mapped to triage priority, 1 being treated first.
+        """
+        return {
+            "status": "success",
+            "count": len(self.triage_queue),
+            "ranking": self.triage_queue.ranking()
+        }
+
+    @synchronized
+    def organize_transport(self, patient_id, destination, urgency, position=None):
         """Organize transport for a patient based on their condition and urgency.
         
         Args:
             patient_id (str): The identifier for the patient.
             destination (str): The destination hospital or medical facility.
             urgency (str): The urgency level ('high', 'medium', 'low') which affects transport choice.
+            position (tuple, optional): (x, y) pickup position, used for vehicle ETAs.
 
         Returns:
             dict: A dictionary containing the transport status and details.
         """
-        transport_options = {
-            'high': 'helicopter',
-            'medium': 'ambulance',
-            'low': 'non-emergency vehicle'
-        }
+        return self.organize_transport_batch([{
+            "patient_id": patient_id,
+            "destination": destination,
+            "urgency": urgency,
+            "position": position,
+        }])[0]
 
-        if urgency in transport_options:
-            transport_type = transport_options[urgency]
-            if self.check_transport_availability(transport_type):
-                # Update patient record with transport information
-                if patient_id in self.patient_records:
-                    self.update_patient_record(
-                        patient_id,
-                        {
-                            "transport_type": transport_type,
-                            "destination": destination,
-                            "transport_time": datetime.now().isoformat(),
-                            "status": "in transit"
-                        }
-                    )
-                
-                return {
-                    "patient_id": patient_id,
-                    "transport_status": "organized",
-                    "transport_type": transport_type,
-                    "destination": destination
-                }
+    @synchronized
+    def organize_transport_batch(self, transports):
+        """Organize transport for a batch of patients at once.
+
+        With a registered fleet (see register_vehicle) the whole batch is assigned
+        to vehicles in one min-cost matching on urgency-weighted ETA, so in a surge
+        the most urgent patients get the fastest suitable vehicles. Without one,
+        every urgency maps to its transport type as before. With a router (see
+        use_router) that knows the destination hospital, results for requests with
+        a position include the 'destination_eta' in seconds.
+
+        Args:
+            transports (list): Dicts with 'patient_id', 'destination', 'urgency' and
+                optionally an (x, y) pickup 'position'.
+
+        Returns:
+            list: One organize_transport result per request, in request order.
+        """
+        results = [None] * len(transports)
+        valid = []
+        for i, transport in enumerate(transports):
+            if transport["urgency"] in TRANSPORT_OPTIONS:
+                valid.append(i)
             else:
-                return {
+                results[i] = {
+                    "patient_id": transport["patient_id"],
+                    "transport_status": "error",
+                    "error": "Invalid urgency level specified"
+                }
+
+        if len(self.transport_scheduler):
+            assignments, _ = self.transport_scheduler.assign(
+                {
+                    "patient_id": transports[i]["patient_id"],
+                    "urgency": transports[i]["urgency"],
+                    "position": transports[i].get("position"),
+                }
+                for i in valid
+            )
+        else:
+            # no fleet is tracked: every urgency gets its transport type, as long as that type is available
+            assignments = {
+                transports[i]["patient_id"]: {"transport_type": TRANSPORT_OPTIONS[transports[i]["urgency"]]}
+                for i in valid
+                if self.check_transport_availability(TRANSPORT_OPTIONS[transports[i]["urgency"]])
+            }
+
+        transport_time = timestamp_now()
+        for i in valid:
+            patient_id = transports[i]["patient_id"]
+            assignment = assignments.get(patient_id)
+            if assignment is None:
+                results[i] = {
                     "patient_id": patient_id,
                     "transport_status": "unavailable",
-                    "error": f"{transport_type} is not available currently"
+                    "error": f"{TRANSPORT_OPTIONS[transports[i]['urgency']]} is not available currently"
                 }
-        else:
-            return {
+                continue
+            if patient_id in self.patient_records:
+                # Update patient record with transport information
+                update = {
+                    "transport_type": assignment["transport_type"],
+                    "destination": transports[i]["destination"],
+                    "transport_time": transport_time,
+                    "status": "in transit"
+                }
+                if "vehicle_id" in assignment:
+                    update["vehicle_id"] = assignment["vehicle_id"]
+                self.update_patient_record(patient_id, update)
+                self.triage_queue.remove(patient_id)
+            results[i] = {
                 "patient_id": patient_id,
-                "transport_status": "error",
-                "error": "Invalid urgency level specified"
+                "transport_status": "organized",
+                "destination": transports[i]["destination"],
+                **assignment
             }
+            router = self.router
+            if router is not None and transports[i]["destination"] in router.hospitals \
+                    and transports[i].get("position") is not None:
+                results[i]["destination_eta"] = router.eta(transports[i]["destination"], transports[i]["position"])
+        return results
+
+    def use_router(self, router):
+        """Use a TerrainRouter to add the ETA to the destination hospital to transport decisions."""
+        self.router = router
+
+    def register_vehicle(self, vehicle_id, vehicle_type, capacity=1, position=None, speed=15.0, available_at=None):
+        """Add a vehicle to the fleet transport is scheduled on (see TransportScheduler.add_vehicle)."""
+        vehicle = self.transport_scheduler.add_vehicle(vehicle_id, vehicle_type, capacity, position, speed, available_at)
+        return vehicle.to_dict()
+
+    def release_vehicle(self, vehicle_id, position=None, available_at=None):
+        """Mark a vehicle as free again after it delivered its patients."""
+        self.transport_scheduler.release_vehicle(vehicle_id, position, available_at)
+        return self.transport_scheduler.vehicles[vehicle_id].to_dict()
 
     def check_transport_availability(self, transport_type):
         """Check the availability of a transport type.
@@ -161,23 +395,26 @@ class MedicalTeamLeader(SARBaseAgent):
         Returns:
             bool: True if the transport is available, False otherwise.
         """
-        # Placeholder for actual availability check logic
-        # In a real scenario we could query a database or a schedule system
-        # Here, we'll assume all transport types are always available
-        return True
+        if not len(self.transport_scheduler):
+            # no fleet is tracked, so every transport type is assumed to be available
+            return True
+        return self.transport_scheduler.available(transport_type) > 0
 
     
     def manage_supplies(self, item, quantity):
         """Manage medical supplies by updating inventory and reordering if necessary."""
-        current_inventory = self.check_inventory(item)
-        new_inventory = current_inventory + quantity
-        self.update_inventory(item, new_inventory)
+        # atomic read-modify-write, concurrent deltas for the same item are never lost
+        new_inventory = self.inventory_database.adjust(item, quantity)
+        log_event(logger, logging.INFO, "inventory_updated", item=item, quantity=new_inventory)
+        if quantity > 0:
+            self.reorder_aggregator.receive(item, quantity)
 
-        # Check if the inventory level is below the reorder threshold
+        # Check if the inventory level is below the reorder threshold;
+        # the order itself is coalesced and placed in the background
         reorder_threshold = self.get_reorder_threshold(item)
         if new_inventory < reorder_threshold:
-            self.reorder_supplies(item, reorder_threshold - new_inventory)
-            reorder_status = "reorder placed"
+            self.reorder_aggregator.mark(item)
+            reorder_status = "reorder queued"
         else:
             reorder_status = "no reorder needed"
 
@@ -188,14 +425,78 @@ class MedicalTeamLeader(SARBaseAgent):
             "reorder_status": reorder_status
         }
 
+    def manage_supplies_batch(self, item, quantities):
+        """Apply several supply deltas for one item with a single inventory update.
+
+        Each delta gets its own result with the running quantity, as if
+        manage_supplies had been called once per delta, but the inventory is
+        written once and at most one consolidated reorder is queued for the
+        final shortfall.
+
+        Args:
+            item (str): The supply item.
+            quantities (list): Quantity deltas, applied in order.
+
+        Returns:
+            list: One manage_supplies-style result per delta.
+        """
+        reorder_threshold = self.get_reorder_threshold(item)
+        total = sum(quantities)
+        level = self.inventory_database.adjust(item, total)
+        log_event(logger, logging.INFO, "inventory_updated", item=item, quantity=level)
+        received = sum(quantity for quantity in quantities if quantity > 0)
+        if received:
+            self.reorder_aggregator.receive(item, received)
+
+        levels = []
+        running_level = level - total
+        for quantity in quantities:
+            running_level += quantity
+            levels.append(running_level)
+
+        reorder_needed = level < reorder_threshold
+        if reorder_needed:
+            self.reorder_aggregator.mark(item)
+
+        return [
+            {
+                "item": item,
+                "updated_quantity": running_level,
+                "status": "updated",
+                "reorder_status": "reorder queued" if reorder_needed and running_level < reorder_threshold
+                else "no reorder needed"
+            }
+            for running_level in levels
+        ]
+
+    def _process_supply_requests(self, messages):
+        """Serve a run of supply requests, batching the deltas per item."""
+        results = [None] * len(messages)
+        deltas_by_item = {}
+        for i, message in enumerate(messages):
+            if "item" not in message or "quantity" not in message:
+                results[i] = self._dispatch_request(message)[1]
+            else:
+                deltas_by_item.setdefault(message["item"], []).append(i)
+
+        for item, positions in deltas_by_item.items():
+            try:
+                item_results = self.manage_supplies_batch(item, [messages[i]["quantity"] for i in positions])
+            except Exception:
+                # nothing was written, so the messages can safely be retried one by one
+                item_results = [self._dispatch_request(messages[i])[1] for i in positions]
+            for i, result in zip(positions, item_results):
+                results[i] = result
+        return results
+
     def check_inventory(self, item):
         """Check the current inventory level for a specific item."""
         return self.inventory_database.get(item, 0)
 
     def update_inventory(self, item, new_quantity):
         """Update the inventory with the new quantity for a specific item."""
-        self.inventory_database[item] = new_quantity
-        print(f"Inventory updated for {item}: {new_quantity} units")
+        self.inventory_database.set(item, new_quantity)
+        log_event(logger, logging.INFO, "inventory_updated", item=item, quantity=new_quantity)
 
     def get_reorder_threshold(self, item):
         """Retrieve the reorder threshold for a specific item."""
@@ -205,20 +506,23 @@ class MedicalTeamLeader(SARBaseAgent):
         """Place an order for supplies that are below the reorder threshold."""
         # Placeholder, for now 
         # Can be replaced with an order and payment system for getting new supplies
-        print(f"Reorder placed for {item}: {quantity_needed} units")
+        log_event(logger, logging.INFO, "reorder_placed", item=item, quantity=quantity_needed)
 
     def monitor_team_health(self):
         """Monitor and report on the health and stress levels of the SAR team."""
         return self.health_data
 
+    @synchronized
     def update_team_health(self, average_stress_level=None, high_risk_members=None, recommendations=None):
         """Update the health and stress levels of the SAR team based on new data."""
+        self._check_journaled([average_stress_level, high_risk_members, recommendations])
         if average_stress_level is not None:
             self.health_data['average_stress_level'] = average_stress_level
         if high_risk_members is not None:
             self.health_data['high_risk_members'] = high_risk_members
         if recommendations is not None:
             self.health_data['recommendations'] = recommendations
+        self._journal("health", None, self.health_data)
 
         return {"status": "Team health updated", "new_health_data": self.health_data}
 
@@ -243,6 +547,52 @@ class MedicalTeamLeader(SARBaseAgent):
             "adjustments": operational_adjustments
         }
 
+    def watch_field_conditions(self, knowledge_base, locations=None):
+        """Subscribe to the weather and terrain changes of a knowledge base and re-adapt operations when they matter.
+
+        Instead of polling the knowledge base, the agent receives its weather and
+        terrain updates in batches and calls adapt_to_field_conditions for a
+        location only when its weather or terrain label actually changed; the
+        latest adjustments are kept in field_adjustments by location.
+
+        Args:
+            knowledge_base (KnowledgeBase): Knowledge base to watch.
+            locations (iterable, optional): Only watch these locations.
+
+        Returns:
+            Subscription: The change feed subscription.
+        """
+        self.stop_watching_field_conditions()
+        self.field_subscription = knowledge_base.subscribe(
+            topics=("weather", "terrain"), locations=locations, callback=self._on_field_changes
+        )
+        return self.field_subscription
+
+    def stop_watching_field_conditions(self):
+        """Stop receiving field condition changes."""
+        if self.field_subscription is not None:
+            self.field_subscription.close()
+            self.field_subscription = None
+
+    @synchronized
+    def _on_field_changes(self, changes):
+        """Fold a batch of change feed events into field_conditions and re-adapt the locations whose labels changed."""
+        changed = {}
+        for change in changes:
+            # weather updates carry a 'weather' (or 'condition') label, terrain updates a 'terrain' (or 'type') label
+            if change.topic == "weather":
+                label = change.data.get("weather", change.data.get("condition"))
+            else:
+                label = change.data.get("terrain", change.data.get("type"))
+            current = self.field_conditions.setdefault(change.location, {})
+            if label is not None and current.get(change.topic) != label:
+                current[change.topic] = label
+                changed[change.location] = current
+        for location, conditions in changed.items():
+            self.field_adjustments[location] = self.adapt_to_field_conditions(dict(conditions))
+            log_event(logger, logging.INFO, "field_conditions_adapted", location=location,
+                      adjustments=self.field_adjustments[location]["adjustments"])
+
     def update_status(self, status):
         """Update the agent's status"""
         self.status = status
@@ -250,8 +600,10 @@ class MedicalTeamLeader(SARBaseAgent):
 
     def get_status(self):
         """Get the agent's current status"""
-        return getattr(self, "status", "unknown")
+        # looked up in the instance dict: a missing attribute would be delegated to the assistant
+        return vars(self).get("status", "unknown")
             
+    @synchronized
     def add_patient(self, patient_data):
         """Add a new patient to the records.
         
@@ -265,18 +617,22 @@ class MedicalTeamLeader(SARBaseAgent):
             return {"error": "Patient ID is required"}
             
         patient_id = patient_data["id"]
+        self._check_journaled(patient_data)
         
         if "status" not in patient_data:
             patient_data["status"] = "registered"
         if "registration_time" not in patient_data:
-            patient_data["registration_time"] = datetime.now().isoformat()
+            patient_data["registration_time"] = timestamp_now()
             
         if patient_id in self.patient_records:
             return {"error": "Patient already exists", "patient_id": patient_id}
             
-        self.patient_records[patient_id] = patient_data
+        self.patient_records[patient_id] = PatientRecord(patient_data)
+        self._index_patient(patient_id, None, None, patient_data["status"], patient_data.get("severity"))
+        self._journal("patient", patient_id, patient_data)
         return {"status": "success", "message": "Patient added", "patient_id": patient_id}
         
+    @synchronized
     def update_patient_record(self, patient_id, update_data):
         """Update an existing patient record with new information.
         
@@ -289,18 +645,29 @@ class MedicalTeamLeader(SARBaseAgent):
         """
         if patient_id not in self.patient_records:
             return {"error": "Patient not found", "patient_id": patient_id}
+        self._check_journaled(update_data)
             
-        self.patient_records[patient_id].update(update_data)
+        if "severity" in update_data:
+            self.triage_queue.reprioritize(patient_id, update_data["severity"])
+        record = self.patient_records[patient_id]
+        old_status, old_severity = record.get("status"), record.get("severity")
+        record.update(update_data)
+        self._index_patient(patient_id, old_status, old_severity, record.get("status"), record.get("severity"))
+        if record.get("status") != "triaged":
+            # only triaged patients wait for treatment, as journal recovery assumes
+            self.triage_queue.remove(patient_id)
         
-        self.patient_records[patient_id]["last_updated"] = datetime.now().isoformat()
+        record["last_updated"] = timestamp_now()
+        self._journal("patient", patient_id, record)
         
         return {
             "status": "success", 
             "message": "Patient record updated", 
             "patient_id": patient_id,
-            "patient_data": self.patient_records[patient_id]
+            "patient_data": record.as_dict()
         }
         
+    @synchronized
     def get_patient_record(self, patient_id):
         """Retrieve a patient's medical record.
         
@@ -316,35 +683,44 @@ class MedicalTeamLeader(SARBaseAgent):
         return {
             "status": "success",
             "patient_id": patient_id,
-            "patient_data": self.patient_records[patient_id]
+            "patient_data": self.patient_records[patient_id].as_dict()
         }
         
-    def list_patients(self, status=None):
-        """List all patients, optionally filtered by status.
+    @synchronized
+    def list_patients(self, status=None, severity=None):
+        """List all patients, optionally filtered by status and/or severity.
+
+        Filtered listings are served from the status and severity indexes, so
+        they cost O(matches) rather than O(all patients).
         
         Args:
             status (str, optional): Filter patients by this status
+            severity (str, optional): Filter patients by this severity
             
         Returns:
             dict: List of patient IDs and their basic information
         """
-        if status:
-            filtered_patients = {
-                pid: data for pid, data in self.patient_records.items() 
-                if data.get("status") == status
-            }
+        if status and severity:
+            by_status = self._status_index.get(status, {})
+            by_severity = self._severity_index.get(severity, {})
+            smaller, larger = sorted((by_status, by_severity), key=len)
+            patient_ids = [pid for pid in smaller if pid in larger]
+        elif status:
+            patient_ids = self._status_index.get(status, {})
+        elif severity:
+            patient_ids = self._severity_index.get(severity, {})
         else:
-            filtered_patients = self.patient_records
+            patient_ids = self.patient_records
             
-        patient_list = [
-            {
+        patient_list = []
+        for pid in patient_ids:
+            data = self.patient_records[pid]
+            patient_list.append({
                 "id": pid,
                 "status": data.get("status", "unknown"),
                 "severity": data.get("severity", "unknown"),
                 "registration_time": data.get("registration_time", "unknown")
-            }
-            for pid, data in filtered_patients.items()
-        ]
+            })
         
         return {
             "status": "success",
@@ -352,6 +728,7 @@ class MedicalTeamLeader(SARBaseAgent):
             "patients": patient_list
         }
         
+    @synchronized
     def discharge_patient(self, patient_id, discharge_notes=""):
         """Discharge a patient from medical care.
         
@@ -364,15 +741,160 @@ class MedicalTeamLeader(SARBaseAgent):
         """
         if patient_id not in self.patient_records:
             return {"error": "Patient not found", "patient_id": patient_id}
+        self._check_journaled(discharge_notes)
             
-        self.patient_records[patient_id].update({
+        record = self.patient_records[patient_id]
+        self._index_patient(patient_id, record.get("status"), record.get("severity"), "discharged", record.get("severity"))
+        record.update({
             "status": "discharged",
-            "discharge_time": datetime.now().isoformat(),
+            "discharge_time": timestamp_now(),
             "discharge_notes": discharge_notes
         })
+        self._journal("patient", patient_id, record)
+        self.triage_queue.remove(patient_id)
         
         return {
             "status": "success",
             "message": "Patient discharged",
             "patient_id": patient_id
-        }
\ No newline at end of file
+        }
+
+    def _check_journaled(self, value):
+        """Reject values the state journal cannot store faithfully, before any state changes."""
+        if self.journal is not None:
+            check_json(value)
+
+    def _journal(self, op, key, value):
+        """Append a mutation to the state journal, taking a snapshot when one is due.
+
+        A PatientRecord value is only copied to a plain dict when there is a journal to write it to.
+        """
+        if self.journal is None:
+            return
+        if value.__class__ is PatientRecord:
+            value = value.as_dict()
+        self.journal.append(op, key, value)
+        if self.journal.snapshot_due():
+            self.snapshot()
+
+    @synchronized
+    def snapshot(self):
+        """Write a compacted snapshot of the agent state to the journal directory.
+
+        Returns:
+            dict: Status of the operation and the journal sequence number it covers
+        """
+        if self.journal is None:
+            return {"error": "Journaling is not enabled"}
+
+        seq = self.journal.last_seq
+        state = {
+            "patients": self.patient_records,
+            "status_index": self._status_index,
+            "severity_index": self._severity_index,
+            "triage_queue": self.triage_queue,
+            "inventory": dict(self.inventory_database),
+            "health": self.health_data
+        }
+        self.journal.write_snapshot(state, seq)
+        return {"status": "success", "seq": seq, "patient_count": len(self.patient_records)}
+
+    def _recover_state(self):
+        """Rebuild records, inventory and team health from the latest snapshot plus the journal tail."""
+        state, entries = self.journal.recover()
+        if state is not None:
+            self.patient_records = state["patients"]
+            self._status_index = state["status_index"]
+            self._severity_index = state["severity_index"]
+            self.triage_queue = state["triage_queue"]
+            for item, quantity in state["inventory"].items():
+                self.inventory_database.set(item, quantity)
+            self.health_data.update(state["health"])
+
+        for op, key, value in entries:
+            if op == "patient":
+                previous = self.patient_records.get(key, {})
+                self.patient_records[key] = PatientRecord(value)
+                self._index_patient(
+                    key, previous.get("status"), previous.get("severity"),
+                    value.get("status"), value.get("severity")
+                )
+                if value.get("status") != "triaged" or value.get("severity") not in SEVERITY_TO_PRIORITY:
+                    self.triage_queue.remove(key)
+                elif not self.triage_queue.reprioritize(key, value["severity"]) and "arrival_time" in value \
+                        and value.get("triage_time") != previous.get("triage_time"):
+                    # only a new triage queues a patient: later edits of a dequeued patient keep it out
+                    self.triage_queue.push(key, value["severity"], value["arrival_time"])
+            elif op == "dequeue":
+                self.triage_queue.remove(key)
+            elif op == "triage_batch":
+                self._upsert_triaged(
+                    [{"id": pid, "severity": severity, "arrival_time": arrival} for pid, severity, arrival in value],
+                    key
+                )
+            elif op == "inventory":
+                self.inventory_database.set(key, value)
+            elif op == "health":
+                self.health_data.update(value)
+
+    def _init_state(self):
+        """Set up empty patient records and default supplies and team health."""
+        self.patient_records = {}
+        self.triage_queue = TriageQueue()
+        # secondary indexes: status/severity -> {patient_id: None}, kept in sync by every record write
+        self._status_index = {}
+        self._severity_index = {}
+        # every agent owns its supplies and team health, the class-level values are only defaults
+        self.inventory_database = InventoryLedger(self.default_inventory)
+        self.reorder_thresholds = dict(self.default_reorder_thresholds)
+        self.health_data = copy.deepcopy(self.default_health_data)
+        # latest weather/terrain labels and operational adjustments by location, fed by watch_field_conditions
+        self.field_conditions = {}
+        self.field_adjustments = {}
+        self.transport_scheduler = TransportScheduler()
+        self.reorder_aggregator = ReorderAggregator(
+            self.reorder_supplies,
+            lambda item: self.get_reorder_threshold(item) - self.check_inventory(item),
+            window=self.reorder_window
+        )
+
+    @synchronized
+    def reset(self):
+        """Return the agent to its freshly constructed state so it can serve another field team.
+
+        Pending reorders are placed first. Agents with a state journal cannot be
+        reset, since their journal would no longer match their state.
+        """
+        if self.journal is not None:
+            raise ValueError("An agent with a state journal cannot be reset")
+        super().reset()
+        vars(self).pop("status", None)
+        self.stop_watching_field_conditions()
+        self.reorder_aggregator.close()
+        self._init_state()
+
+    def close(self):
+        """Stop watching field conditions, place pending reorders and flush and close the state journal, if any."""
+        self.stop_watching_field_conditions()
+        self.reorder_aggregator.close()
+        if self.journal is not None:
+            self.journal.close()
+
+    def _index_patient(self, patient_id, old_status, old_severity, new_status, new_severity):
+        """Move a patient between the status and severity index buckets."""
+        _move_index_entry(self._status_index, patient_id, old_status, new_status)
+        _move_index_entry(self._severity_index, patient_id, old_severity, new_severity)
+
+
+def _move_index_entry(index, patient_id, old_key, new_key):
+    """Move patient_id from the old_key bucket to the new_key bucket of a secondary index."""
+    if old_key == new_key:
+        return
+    if old_key is not None:
+        bucket = index.get(old_key)
+        if bucket is not None:
+            bucket.pop(patient_id, None)
+            if not bucket:
+                del index[old_key]
+    if new_key is not None:
+        index.setdefault(new_key, {})[patient_id] = None
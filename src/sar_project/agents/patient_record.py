@@ -0,0 +1,245 @@
+import sys
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class _Missing:
+    """Marker for an unset field; pickles by reference so snapshots keep its identity."""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_MISSING"
+
+
+_MISSING = _Missing()
+
+# fields stored in their own slot, everything else goes to the per-record extra dict
+_TIMESTAMP_FIELDS = ("registration_time", "triage_time", "transport_time", "last_updated", "discharge_time")
+_CODE_FIELDS = ("status", "severity", "transport_type", "destination")
+_PLAIN_FIELDS = ("id", "arrival_time")
+_FIELDS = _PLAIN_FIELDS + _CODE_FIELDS + _TIMESTAMP_FIELDS
+_FIELD_SET = frozenset(_FIELDS)
+_TIMESTAMP_SET = frozenset(_TIMESTAMP_FIELDS)
+_CODE_SET = frozenset(_CODE_FIELDS)
+
+
+class _EpochMicros(int):
+    """Timestamp stored as integer microseconds since the (naive) Unix epoch."""
+
+    __slots__ = ()
+
+    def isoformat(self):
+        text = _decoded.get(self)
+        if text is None:
+            text = (_EPOCH + timedelta(microseconds=int(self))).isoformat()
+            _remember(int(self), text)
+        return text
+
+
+_MICROSECOND = timedelta(microseconds=1)
+# recently used timestamps in both directions (text -> micros and micros -> text), so the
+# records written in one batch and read back in its responses convert each timestamp once;
+# both are cleared when full, single dict operations keep them safe to share between threads
+_CACHE_SIZE = 4096
+_encoded = {}
+_decoded = {}
+
+
+def _remember(micros, text):
+    if len(_decoded) >= _CACHE_SIZE:
+        _encoded.clear()
+        _decoded.clear()
+    encoded = _EpochMicros(micros)
+    _encoded[text] = encoded
+    _decoded[encoded] = text
+    return encoded
+
+
+def timestamp_now():
+    """Return the current time as an ISO string that records store without parsing it back.
+
+    Equivalent to datetime.now().isoformat(), but the epoch microseconds are
+    computed from the datetime itself and cached with the string.
+    """
+    now = datetime.now()
+    text = now.isoformat()
+    _remember((now - _EPOCH) // _MICROSECOND, text)
+    return text
+
+
+def _encode_timestamp(value):
+    """Encode an ISO timestamp string as epoch microseconds when it round-trips exactly.
+
+    Values that would not come back unchanged (other types, timezone-aware or
+    non-canonical strings) are stored as given.
+    """
+    if value.__class__ is not str:
+        return value
+    encoded = _encoded.get(value)
+    if encoded is not None:
+        return encoded
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if parsed.tzinfo is not None or parsed.isoformat() != value:
+        return value
+    return _remember((parsed - _EPOCH) // _MICROSECOND, value)
+
+
+def _encode_code(value):
+    return sys.intern(value) if value.__class__ is str else value
+
+
+class PatientRecord(MutableMapping):
+    """Compact, dict-compatible patient record.
+
+    Well-known fields live in __slots__ instead of a per-record dict: status,
+    severity, transport type and destination are interned strings, and ISO
+    timestamps are kept as integer epoch microseconds. Any other field
+    (name, condition, notes, ...) is stored in a small extra dict that is only
+    created when needed. Reading a record gives back exactly the values that
+    were written, so it can be used wherever the old dict records were.
+    """
+
+    __slots__ = _FIELDS + ("extra",)
+
+    def __init__(self, data=None):
+        self.id = self.arrival_time = self.status = self.severity = self.transport_type = self.destination = \
+            self.registration_time = self.triage_time = self.transport_time = self.last_updated = \
+            self.discharge_time = _MISSING
+        self.extra = None
+        if data:
+            for key, value in data.items():
+                self[key] = value
+
+    def get(self, key, default=None):
+        # same as Mapping.get, without raising and catching a KeyError for every unset field
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is _MISSING:
+                return default
+            if value.__class__ is _EpochMicros:
+                return value.isoformat()
+            return value
+        if self.extra is None:
+            return default
+        return self.extra.get(key, default)
+
+    def update(self, other=(), /, **kwargs):
+        # plain dicts, the agent's only argument type, skip the generic MutableMapping.update
+        if other.__class__ is dict and not kwargs:
+            for key, value in other.items():
+                self[key] = value
+        else:
+            super().update(other, **kwargs)
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            if value.__class__ is _EpochMicros:
+                return value.isoformat()
+            return value
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key, value):
+        if key in _TIMESTAMP_SET:
+            value = _encode_timestamp(value)
+        elif key in _CODE_SET:
+            value = _encode_code(value)
+        elif key not in _FIELD_SET:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+            return
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            if getattr(self, key) is _MISSING:
+                raise KeyError(key)
+            setattr(self, key, _MISSING)
+            return
+        if self.extra is None:
+            raise KeyError(key)
+        del self.extra[key]
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key) is not _MISSING
+        return self.extra is not None and key in self.extra
+
+    def __iter__(self):
+        for field in _FIELDS:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        count = sum(1 for field in _FIELDS if getattr(self, field) is not _MISSING)
+        return count + (len(self.extra) if self.extra else 0)
+
+    def __repr__(self):
+        return f"PatientRecord({dict(self)!r})"
+
+    def __reduce__(self):
+        # pickle the raw slot values so snapshots neither decode timestamps nor build a dict per record
+        return _restore_record, ((
+            self.id, self.arrival_time, self.status, self.severity, self.transport_type, self.destination,
+            self.registration_time, self.triage_time, self.transport_time, self.last_updated, self.discharge_time,
+            self.extra
+        ),)
+
+    def as_dict(self):
+        """Return a plain dict copy of the record, as used in agent responses."""
+        # unrolled over the slots in _FIELDS order: this copy is made for every response and journal entry
+        data = {}
+        if self.id is not _MISSING:
+            data["id"] = self.id
+        if self.arrival_time is not _MISSING:
+            data["arrival_time"] = self.arrival_time
+        if self.status is not _MISSING:
+            data["status"] = self.status
+        if self.severity is not _MISSING:
+            data["severity"] = self.severity
+        if self.transport_type is not _MISSING:
+            data["transport_type"] = self.transport_type
+        if self.destination is not _MISSING:
+            data["destination"] = self.destination
+        value = self.registration_time
+        if value is not _MISSING:
+            data["registration_time"] = value.isoformat() if value.__class__ is _EpochMicros else value
+        value = self.triage_time
+        if value is not _MISSING:
+            data["triage_time"] = value.isoformat() if value.__class__ is _EpochMicros else value
+        value = self.transport_time
+        if value is not _MISSING:
+            data["transport_time"] = value.isoformat() if value.__class__ is _EpochMicros else value
+        value = self.last_updated
+        if value is not _MISSING:
+            data["last_updated"] = value.isoformat() if value.__class__ is _EpochMicros else value
+        value = self.discharge_time
+        if value is not _MISSING:
+            data["discharge_time"] = value.isoformat() if value.__class__ is _EpochMicros else value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+def _restore_record(values):
+    # same slot order as PatientRecord.__reduce__
+    record = object.__new__(PatientRecord)
+    (
+        record.id, record.arrival_time, record.status, record.severity, record.transport_type, record.destination,
+        record.registration_time, record.triage_time, record.transport_time, record.last_updated, record.discharge_time,
+        record.extra
+    ) = values
+    return record
@@ -0,0 +1,90 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AgentRequestLoop:
+    """Asyncio request loop for one agent with bounded concurrency and backpressure.
+
+    Submitted messages wait in a bounded queue; ``max_concurrency`` workers take
+    them off the queue and run them through the agent's ``aprocess_request`` on
+    a dedicated thread pool. Once ``max_pending`` messages are waiting,
+    ``submit`` blocks until a worker frees a slot, so a fast producer cannot
+    pile up unbounded work.
+
+    Usage:
+        async with agent.request_loop(max_concurrency=8) as loop:
+            result = await loop.request({"get_conditions": True, "location": "Sector 4"})
+    """
+
+    def __init__(self, agent, max_concurrency=8, max_pending=100):
+        """
+        Args:
+            agent (SARBaseAgent): The agent serving the requests.
+            max_concurrency (int): Maximum number of requests processed at the same time.
+            max_pending (int): Maximum number of requests waiting to be processed.
+        """
+        self.agent = agent
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._queue = None
+        self._workers = []
+        self._executor = None
+
+    async def start(self):
+        """Start the worker tasks. Must be called from a running event loop."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix=f"{self.agent.name}-request"
+        )
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.max_concurrency)]
+
+    async def _worker(self):
+        while True:
+            message, future = await self._queue.get()
+            try:
+                if not future.cancelled():
+                    result = await self.agent.aprocess_request(message, executor=self._executor)
+                    if not future.cancelled():
+                        future.set_result(result)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def submit(self, message):
+        """Queue a message, waiting while the queue is full.
+
+        Returns:
+            asyncio.Future: Resolves to the result of process_request for the message.
+        """
+        if not self._workers:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future))
+        return future
+
+    async def request(self, message):
+        """Queue a message and wait for its result."""
+        return await (await self.submit(message))
+
+    async def stop(self):
+        """Finish every queued request, then stop the workers."""
+        if not self._workers:
+            return
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
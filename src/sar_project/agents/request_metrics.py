@@ -0,0 +1,242 @@
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+
+# latency histogram buckets: bucket i counts latencies below 2**i microseconds (the last one is open-ended)
+HISTOGRAM_BUCKETS = 28
+_BUCKET_BOUNDS = tuple(2 ** i * 1e-6 for i in range(HISTOGRAM_BUCKETS - 1)) + (float("inf"),)
+
+
+class _TypeStats:
+    """Counters and latency histogram of one request type."""
+
+    __slots__ = ("count", "errors", "total_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+
+def _bucket(elapsed_ns):
+    # bit_length of the latency in microseconds is the index of its power-of-two bucket
+    return min((elapsed_ns // 1000).bit_length(), HISTOGRAM_BUCKETS - 1)
+
+
+class RequestMetrics:
+    """Per-request-type counters, error counts and latency histograms.
+
+    Recording a request costs one lock acquisition, a few integer updates and
+    a bit_length to find its power-of-two latency bucket, so it can stay on
+    in production. snapshot() turns the counters into throughput, error
+    rates, mean/max latency and histogram-estimated percentiles per type, and
+    export() renders a snapshot as JSON or in the Prometheus text format.
+
+    An optional sampling profiler runs every ``sample_every``-th request under
+    cProfile (or a custom hook) to show where the dominant request types
+    spend their time.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Args:
+            clock (callable): Time source for the throughput window, in seconds.
+        """
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._started = clock()
+        self._profiler_hook = None
+        self._sample_every = 0
+        self._seen = 0
+        self._profiles = {}
+
+    def record(self, request_type, elapsed_ns, errors=0, count=1):
+        """Record count requests of a type that took elapsed_ns nanoseconds each, errors of which failed."""
+        with self._lock:
+            stats = self._stats.get(request_type)
+            if stats is None:
+                stats = self._stats[request_type] = _TypeStats()
+            stats.count += count
+            stats.errors += errors
+            stats.total_ns += elapsed_ns * count
+            if elapsed_ns > stats.max_ns:
+                stats.max_ns = elapsed_ns
+            stats.buckets[_bucket(elapsed_ns)] += count
+
+    def reset(self):
+        """Forget every recorded request and profile and restart the throughput window."""
+        with self._lock:
+            self._stats = {}
+            self._profiles = {}
+            self._started = self.clock()
+
+    def snapshot(self):
+        """
+        Current metrics per request type.
+
+        Returns:
+            dict: 'uptime' (seconds since the metrics were created or reset), and
+                'requests': per type 'count', 'errors', 'error_rate', 'throughput'
+                (requests per second), 'mean', 'max', 'p50', 'p95', 'p99' (seconds;
+                percentiles are the upper bound of their histogram bucket) and
+                'histogram' as [upper bound in seconds, count] pairs of the
+                non-empty buckets.
+        """
+        with self._lock:
+            uptime = self.clock() - self._started
+            stats = {
+                request_type: (s.count, s.errors, s.total_ns, s.max_ns, list(s.buckets))
+                for request_type, s in self._stats.items()
+            }
+        requests = {}
+        for request_type, (count, errors, total_ns, max_ns, buckets) in stats.items():
+            requests[str(request_type)] = {
+                "count": count,
+                "errors": errors,
+                "error_rate": errors / count if count else 0.0,
+                "throughput": count / uptime if uptime > 0 else 0.0,
+                "mean": total_ns / count / 1e9 if count else 0.0,
+                "max": max_ns / 1e9,
+                "p50": _percentile(buckets, count, 0.50, max_ns),
+                "p95": _percentile(buckets, count, 0.95, max_ns),
+                "p99": _percentile(buckets, count, 0.99, max_ns),
+                "histogram": [[_BUCKET_BOUNDS[i], n] for i, n in enumerate(buckets) if n],
+            }
+        return {"uptime": uptime, "requests": requests}
+
+    def export(self, format="json", prefix="sar_agent", labels=None):
+        """
+        Render a snapshot for a metrics pipeline.
+
+        Args:
+            format (str): 'json', or 'prometheus' for the Prometheus text exposition format.
+            prefix (str): Metric name prefix of the Prometheus format.
+            labels (dict, optional): Extra labels of every Prometheus sample, e.g. {"agent": name}.
+
+        Returns:
+            str: The rendered metrics.
+        """
+        snapshot = self.snapshot()
+        if format == "json":
+            return json.dumps(snapshot, default=str)
+        if format != "prometheus":
+            raise ValueError(f"Unknown metrics export format: {format}")
+
+        extra = "".join(f',{key}="{value}"' for key, value in (labels or {}).items())
+        lines = [
+            f"# TYPE {prefix}_requests_total counter",
+            f"# TYPE {prefix}_request_errors_total counter",
+            f"# TYPE {prefix}_request_seconds histogram",
+        ]
+        for request_type, metrics in snapshot["requests"].items():
+            label = f'request_type="{request_type}"{extra}'
+            lines.append(f"{prefix}_requests_total{{{label}}} {metrics['count']}")
+            lines.append(f"{prefix}_request_errors_total{{{label}}} {metrics['errors']}")
+            cumulative = 0
+            for bound, n in metrics["histogram"]:
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_request_seconds_bucket{{{label},le="{le}"}} {cumulative}')
+            if not metrics["histogram"] or metrics["histogram"][-1][0] != float("inf"):
+                lines.append(f'{prefix}_request_seconds_bucket{{{label},le="+Inf"}} {metrics["count"]}')
+            lines.append(f"{prefix}_request_seconds_sum{{{label}}} {metrics['mean'] * metrics['count']!r}")
+            lines.append(f"{prefix}_request_seconds_count{{{label}}} {metrics['count']}")
+        return "\n".join(lines) + "\n"
+
+    def enable_profiling(self, sample_every=100, hook=None):
+        """
+        Profile every sample_every-th request.
+
+        Args:
+            sample_every (int): Sampling interval, in requests.
+            hook (callable, optional): Called as hook(request_type) for a sampled request; must
+                return a context manager wrapping the request. Defaults to running the request
+                under cProfile and accumulating the statistics per request type (see profile_stats).
+        """
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self._profiler_hook = hook or self._cprofile
+        self._sample_every = sample_every
+        self._seen = 0
+
+    def disable_profiling(self):
+        """Stop sampling requests (collected profiles are kept)."""
+        self._profiler_hook = None
+        self._sample_every = 0
+
+    def sampler(self, request_type):
+        """A context manager for the request if it is sampled, else None."""
+        hook, every = self._profiler_hook, self._sample_every
+        if not every:
+            return None
+        self._seen += 1
+        if self._seen % every:
+            return None
+        return hook(request_type)
+
+    def _cprofile(self, request_type):
+        return _ProfiledRequest(self, request_type)
+
+    def profile_stats(self, request_type, sort="cumulative", limit=20):
+        """
+        Report of the sampled profiles of a request type.
+
+        Returns:
+            str: pstats listing of the top functions, or '' if no request of the type was sampled.
+        """
+        with self._lock:
+            stats = self._profiles.get(request_type)
+            if stats is None:
+                return ""
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+class _ProfiledRequest:
+    """Runs one request under cProfile and adds its statistics to its type's profile."""
+
+    def __init__(self, metrics, request_type):
+        self.metrics = metrics
+        self.request_type = request_type
+        self.profile = cProfile.Profile()
+
+    def __enter__(self):
+        try:
+            self.profile.enable()
+        except ValueError:
+            # another profiler is already active in this thread (e.g. a concurrent sample): skip
+            self.profile = None
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profile is None:
+            return False
+        self.profile.disable()
+        with self.metrics._lock:
+            stats = self.metrics._profiles.get(self.request_type)
+            if stats is None:
+                self.metrics._profiles[self.request_type] = pstats.Stats(self.profile, stream=io.StringIO())
+            else:
+                stats.add(self.profile)
+        return False
+
+
+def _percentile(buckets, count, q, max_ns):
+    """Upper bound of the histogram bucket holding the q-th quantile, capped at the observed maximum."""
+    if not count:
+        return 0.0
+    rank = q * count
+    seen = 0
+    for i, n in enumerate(buckets):
+        seen += n
+        if seen >= rank:
+            return min(_BUCKET_BOUNDS[i], max_ns / 1e9)
+    return max_ns / 1e9
@@ -0,0 +1,318 @@
+import time
+
+import numpy as np
+
+# preferred vehicle type per urgency, the mapping organize_transport has always used
+TRANSPORT_OPTIONS = {
+    "high": "helicopter",
+    "medium": "ambulance",
+    "low": "non-emergency vehicle",
+}
+
+# how urgent a patient a vehicle type is equipped for: 1 is the most critical care
+VEHICLE_CLASS = {"helicopter": 1, "ambulance": 2, "non-emergency vehicle": 3}
+URGENCY_CLASS = {"high": 1, "medium": 2, "low": 3}
+
+# seconds of ETA a minute of waiting costs, per urgency: urgent patients get the fastest vehicles
+URGENCY_WEIGHT = {"high": 4.0, "medium": 2.0, "low": 1.0}
+# cost (in weighted seconds) of every class step between the preferred and the assigned vehicle type
+MISMATCH_COST = 600.0
+# cost of leaving a patient unassigned, so the solver serves as many (and as urgent) patients as it can
+UNSERVED_COST = 24 * 3600.0
+# pairs at or above this cost are infeasible and never assigned
+_INFEASIBLE = 1e15
+
+
+class Vehicle:
+    """A transport vehicle with a capacity, a position and the time it is next free."""
+
+    __slots__ = ("vehicle_id", "vehicle_type", "capacity", "position", "speed", "available_at", "patients")
+
+    def __init__(self, vehicle_id, vehicle_type, capacity=1, position=None, speed=15.0, available_at=0.0):
+        self.vehicle_id = vehicle_id
+        self.vehicle_type = vehicle_type
+        self.capacity = capacity
+        self.position = position
+        self.speed = speed
+        self.available_at = available_at
+        self.patients = []
+
+    @property
+    def free_seats(self):
+        return self.capacity - len(self.patients)
+
+    def to_dict(self):
+        return {
+            "vehicle_id": self.vehicle_id,
+            "vehicle_type": self.vehicle_type,
+            "capacity": self.capacity,
+            "position": self.position,
+            "speed": self.speed,
+            "available_at": self.available_at,
+            "patients": list(self.patients),
+        }
+
+
+class TransportScheduler:
+    """Fleet of individual vehicles and batch assignment of patients to them.
+
+    A batch of transport requests is assigned in one min-cost matching over
+    (patient, free seat) pairs. The cost of a pair is the vehicle's ETA to the
+    patient weighted by urgency, plus a penalty per class step between the
+    vehicle type and the one preferred for the urgency; high-urgency patients
+    are never put in non-emergency vehicles. When the fleet is short, the most
+    urgent patients are served first and the rest are left unassigned. A
+    patient who already holds a seat gives it up before the matching, so a
+    repeated request moves their booking instead of taking a second seat.
+    """
+
+    def __init__(self, clock=time.time):
+        """
+        Args:
+            clock (callable): Current time in seconds, used for vehicle availability.
+        """
+        self.clock = clock
+        self.vehicles = {}
+
+    def __len__(self):
+        return len(self.vehicles)
+
+    def add_vehicle(self, vehicle_id, vehicle_type, capacity=1, position=None, speed=15.0, available_at=None):
+        """Register a vehicle, or replace the vehicle with the same id.
+
+        Args:
+            vehicle_id (str): Identifier of the vehicle.
+            vehicle_type (str): One of VEHICLE_CLASS, e.g. 'helicopter'.
+            capacity (int): Number of patients it carries at once.
+            position (tuple, optional): (x, y) of the vehicle in meters; without one its
+                travel time to a patient is not known and counted as zero.
+            speed (float): Average travel speed in meters per second.
+            available_at (float, optional): Time it becomes free, defaults to now.
+        """
+        if vehicle_type not in VEHICLE_CLASS:
+            raise ValueError(f"Unknown vehicle type: {vehicle_type}")
+        if capacity < 1 or speed <= 0:
+            raise ValueError("Vehicle capacity and speed must be positive")
+        vehicle = Vehicle(vehicle_id, vehicle_type, capacity, position, speed,
+                          self.clock() if available_at is None else available_at)
+        self.vehicles[vehicle_id] = vehicle
+        return vehicle
+
+    def remove_vehicle(self, vehicle_id):
+        """Take a vehicle out of the fleet; returns False if it was not registered."""
+        return self.vehicles.pop(vehicle_id, None) is not None
+
+    def release_vehicle(self, vehicle_id, position=None, available_at=None):
+        """Empty a vehicle after delivering its patients, optionally at a new position and time."""
+        vehicle = self.vehicles[vehicle_id]
+        vehicle.patients = []
+        if position is not None:
+            vehicle.position = position
+        vehicle.available_at = self.clock() if available_at is None else available_at
+
+    def available(self, vehicle_type=None):
+        """Number of vehicles (of a type) with at least one free seat."""
+        return sum(
+            1 for vehicle in self.vehicles.values()
+            if vehicle.free_seats > 0 and (vehicle_type is None or vehicle.vehicle_type == vehicle_type)
+        )
+
+    def eta(self, vehicle, position=None, now=None):
+        """Seconds until the vehicle can reach a position: wait until it is free plus travel time."""
+        now = self.clock() if now is None else now
+        travel = 0.0
+        if position is not None and vehicle.position is not None:
+            travel = float(np.hypot(position[0] - vehicle.position[0], position[1] - vehicle.position[1])) / vehicle.speed
+        return max(0.0, vehicle.available_at - now) + travel
+
+    def _seats(self):
+        """Every free seat as its vehicle, with vehicle attribute arrays per seat."""
+        seats = [vehicle for vehicle in self.vehicles.values() for _ in range(vehicle.free_seats)]
+        positioned = np.array([vehicle.position is not None for vehicle in seats], dtype=bool)
+        xy = np.array([vehicle.position if vehicle.position is not None else (0.0, 0.0) for vehicle in seats],
+                      dtype=float).reshape(len(seats), 2)
+        speed = np.array([vehicle.speed for vehicle in seats], dtype=float)
+        ready = np.array([vehicle.available_at for vehicle in seats], dtype=float)
+        vehicle_class = np.array([VEHICLE_CLASS[vehicle.vehicle_type] for vehicle in seats], dtype=float)
+        return seats, positioned, xy, speed, ready, vehicle_class
+
+    def cost_matrix(self, patients, now=None):
+        """Assignment costs and ETAs of every (patient, free seat) pair.
+
+        Args:
+            patients (list): Dicts with 'urgency' and optionally an (x, y) 'position'.
+
+        Returns:
+            tuple: (seats, cost, eta): the seat vehicles and two (patients, seats) arrays.
+        """
+        now = self.clock() if now is None else now
+        seats, positioned, xy, speed, ready, vehicle_class = self._seats()
+        urgency = [patient["urgency"] for patient in patients]
+        weight = np.array([URGENCY_WEIGHT[u] for u in urgency])[:, None]
+        patient_class = np.array([URGENCY_CLASS[u] for u in urgency], dtype=float)[:, None]
+        has_position = np.array([patient.get("position") is not None for patient in patients], dtype=bool)
+        patient_xy = np.array([patient.get("position") or (0.0, 0.0) for patient in patients],
+                              dtype=float).reshape(len(patients), 2)
+
+        distance = np.hypot(patient_xy[:, None, 0] - xy[None, :, 0], patient_xy[:, None, 1] - xy[None, :, 1])
+        distance *= has_position[:, None] & positioned[None, :]
+        eta = np.maximum(ready - now, 0.0)[None, :] + distance / speed[None, :]
+
+        cost = weight * (eta - UNSERVED_COST) + MISMATCH_COST * np.abs(vehicle_class[None, :] - patient_class)
+        # a vehicle may carry patients at most one class more urgent than it is equipped for,
+        # which keeps high-urgency patients out of non-emergency vehicles
+        cost[vehicle_class[None, :] > patient_class + 1] = _INFEASIBLE
+        return seats, cost, eta
+
+    def _unbook(self, patients):
+        """Free the seats already booked for any of the patients."""
+        patient_ids = {patient["patient_id"] for patient in patients}
+        for vehicle in self.vehicles.values():
+            if not patient_ids.isdisjoint(vehicle.patients):
+                vehicle.patients = [pid for pid in vehicle.patients if pid not in patient_ids]
+
+    def assign(self, patients, now=None):
+        """Assign a batch of patients to free seats in one min-cost matching and book the seats.
+
+        Args:
+            patients (list): Dicts with 'patient_id', 'urgency' (one of URGENCY_WEIGHT)
+                and optionally an (x, y) 'position'. A patient listed more than once
+                is assigned once, using its last entry, and a patient already booked
+                on a vehicle loses that seat first.
+
+        Returns:
+            tuple: (assignments, unassigned): assignments maps patient_id to a dict with
+                'vehicle_id', 'transport_type' and 'eta' (seconds); unassigned lists the
+                ids of the patients no suitable seat was left for.
+        """
+        now = self.clock() if now is None else now
+        patients = _unique_patients(patients)
+        if not patients:
+            return {}, []
+        self._unbook(patients)
+        seats, cost, eta = self.cost_matrix(patients, now)
+        rows, cols = min_cost_assignment(cost) if seats else (np.empty(0, dtype=np.int64),) * 2
+
+        assignments = {}
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            if cost[row, col] >= _INFEASIBLE:
+                continue
+            vehicle = seats[col]
+            patient_id = patients[row]["patient_id"]
+            vehicle.patients.append(patient_id)
+            assignments[patient_id] = {
+                "vehicle_id": vehicle.vehicle_id,
+                "transport_type": vehicle.vehicle_type,
+                "eta": float(eta[row, col]),
+            }
+        unassigned = [patient["patient_id"] for patient in patients if patient["patient_id"] not in assignments]
+        return assignments, unassigned
+
+    def assign_greedy(self, patients, now=None):
+        """Assign patients one at a time, most urgent first, each to its cheapest free seat.
+
+        The per-patient strategy the batch matching replaces, kept as a baseline
+        for benchmarks. Takes and returns the same as assign().
+        """
+        now = self.clock() if now is None else now
+        patients = sorted(_unique_patients(patients), key=lambda patient: URGENCY_CLASS[patient["urgency"]])
+        if not patients:
+            return {}, []
+        self._unbook(patients)
+        seats, cost, eta = self.cost_matrix(patients, now)
+        taken = np.zeros(len(seats), dtype=bool)
+        assignments, unassigned = {}, []
+        for row, patient in enumerate(patients):
+            costs = np.where(taken, np.inf, cost[row]) if len(seats) else cost[row]
+            col = int(np.argmin(costs)) if len(seats) else -1
+            if col < 0 or costs[col] >= _INFEASIBLE:
+                unassigned.append(patient["patient_id"])
+                continue
+            taken[col] = True
+            vehicle = seats[col]
+            vehicle.patients.append(patient["patient_id"])
+            assignments[patient["patient_id"]] = {
+                "vehicle_id": vehicle.vehicle_id,
+                "transport_type": vehicle.vehicle_type,
+                "eta": float(eta[row, col]),
+            }
+        return assignments, unassigned
+
+
+def _unique_patients(patients):
+    """Drop repeated patient ids, keeping the last entry of each, so every patient books one seat."""
+    return list({patient["patient_id"]: patient for patient in patients}.values())
+
+
+def min_cost_assignment(cost):
+    """Solve the rectangular linear assignment problem.
+
+    Shortest augmenting path algorithm (Jonker-Volgenant style, as in
+    Crouse 2016), with the inner Dijkstra step vectorized over columns.
+    Matches min(rows, columns) pairs at minimum total cost. Ties prefer
+    unmatched columns, which keeps augmenting paths short when many columns
+    are identical (e.g. the seats of one vehicle).
+
+    Args:
+        cost (array-like): (rows, columns) cost matrix of finite values.
+
+    Returns:
+        tuple: (rows, columns) index arrays of the matched pairs, sorted by row.
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    u = np.zeros(n)
+    v = np.zeros(m)
+    row4col = np.full(m, -1, dtype=np.int64)
+    col4row = np.full(n, -1, dtype=np.int64)
+
+    for current in range(n):
+        shortest = np.full(m, np.inf)
+        path = np.full(m, -1, dtype=np.int64)
+        scanned = np.zeros(m, dtype=bool)
+        visited_rows = []
+        min_value = 0.0
+        row = current
+        sink = -1
+        while sink < 0:
+            visited_rows.append(row)
+            reduced = min_value + cost[row] - u[row] - v
+            better = ~scanned & (reduced < shortest)
+            path[better] = row
+            shortest[better] = reduced[better]
+            candidates = np.where(scanned, np.inf, shortest)
+            min_value = candidates.min()
+            if min_value == np.inf:
+                raise ValueError("Cost matrix has no feasible assignment")
+            ties = np.flatnonzero(candidates == min_value)
+            free = ties[row4col[ties] < 0]
+            col = int(free[0] if len(free) else ties[0])
+            scanned[col] = True
+            if row4col[col] < 0:
+                sink = col
+            else:
+                row = int(row4col[col])
+
+        # update the duals of the rows and columns on the search tree
+        u[current] += min_value
+        others = np.array(visited_rows[1:], dtype=np.int64)
+        if len(others):
+            u[others] += min_value - shortest[col4row[others]]
+        v[scanned] -= min_value - shortest[scanned]
+
+        # augment along the path back to the current row
+        col = sink
+        while True:
+            row = int(path[col])
+            row4col[col] = row
+            col4row[row], col = col, col4row[row]
+            if row == current:
+                break
+
+    if transposed:
+        order = np.argsort(col4row)
+        return col4row[order], order
+    return np.arange(n), col4row
@@ -0,0 +1,142 @@
+import heapq
+import itertools
+
+SEVERITY_TO_PRIORITY = {"high": 1, "medium": 2, "low": 3}
+
+
+class TriageQueue:
+    """Persistent triage queue ordered by severity, then arrival time.
+
+    Backed by a binary heap with lazy invalidation, so admitting a patient,
+    popping the next patient and re-prioritizing an existing patient are all
+    O(log n). Patients with equal severity and arrival time keep the order in
+    which they were admitted.
+    """
+
+    _REMOVED = object()
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, patient_id):
+        return patient_id in self._entries
+
+    def __getstate__(self):
+        # only live entries are kept: the removal marker does not survive pickling
+        return {"heap": [entry for entry in self._heap if entry[-1] is not self._REMOVED], "entries": self._entries}
+
+    def __setstate__(self, state):
+        # dropping the removed entries leaves holes in the heap order, so it is rebuilt
+        self._heap = state["heap"]
+        heapq.heapify(self._heap)
+        self._entries = state["entries"]
+        self._counter = itertools.count(max((entry[2] for entry in self._entries.values()), default=-1) + 1)
+
+    def _make_entry(self, patient_id, severity, arrival_time):
+        return [SEVERITY_TO_PRIORITY[severity], arrival_time, next(self._counter), patient_id]
+
+    def push(self, patient_id, severity, arrival_time):
+        """Admit a patient, or re-prioritize them if already queued.
+
+        Args:
+            patient_id (str): The identifier for the patient.
+            severity (str): Severity level ('high', 'medium', 'low').
+            arrival_time: Comparable arrival time used to break ties within a severity.
+        """
+        entry = self._make_entry(patient_id, severity, arrival_time)
+        if patient_id in self._entries:
+            self._entries[patient_id][-1] = self._REMOVED
+        self._entries[patient_id] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._compact()
+
+    def _compact(self):
+        """Drop invalidated entries once they outnumber the live ones."""
+        self._heap = [entry for entry in self._heap if entry[-1] is not self._REMOVED]
+        heapq.heapify(self._heap)
+
+    def push_many(self, patients):
+        """Admit a batch of patients in one pass.
+
+        Rebuilds the heap in O(n) when the batch is large compared to the
+        queue, and falls back to individual O(log n) pushes otherwise.
+
+        Args:
+            patients (list): Patient dicts with 'id', 'severity' and 'arrival_time'.
+        """
+        if len(patients) * 4 < len(self._heap):
+            for patient in patients:
+                self.push(patient["id"], patient["severity"], patient["arrival_time"])
+            return
+        for patient in patients:
+            entry = self._make_entry(patient["id"], patient["severity"], patient["arrival_time"])
+            previous = self._entries.get(patient["id"])
+            if previous is not None:
+                previous[-1] = self._REMOVED
+            self._entries[patient["id"]] = entry
+            self._heap.append(entry)
+        heapq.heapify(self._heap)
+
+    def reprioritize(self, patient_id, severity):
+        """Change the severity of a queued patient, keeping their arrival time.
+
+        Returns:
+            bool: True if the patient was queued, False otherwise.
+        """
+        entry = self._entries.get(patient_id)
+        if entry is None:
+            return False
+        self.push(patient_id, severity, entry[1])
+        return True
+
+    def remove(self, patient_id):
+        """Remove a patient from the queue.
+
+        Returns:
+            bool: True if the patient was queued, False otherwise.
+        """
+        entry = self._entries.pop(patient_id, None)
+        if entry is None:
+            return False
+        entry[-1] = self._REMOVED
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._compact()
+        return True
+
+    def _discard_removed(self):
+        while self._heap and self._heap[0][-1] is self._REMOVED:
+            heapq.heappop(self._heap)
+
+    def peek(self):
+        """Return the id of the next patient to treat without removing it, or None."""
+        self._discard_removed()
+        return self._heap[0][-1] if self._heap else None
+
+    def pop(self):
+        """Remove and return the id of the next patient to treat, or None if empty."""
+        self._discard_removed()
+        if not self._heap:
+            return None
+        patient_id = heapq.heappop(self._heap)[-1]
+        del self._entries[patient_id]
+        return patient_id
+
+    def ranking(self):
+        """Return the full ranking of queued patients.
+
+        Returns:
+            dict: Patient IDs mapped to triage priority, 1 being treated first.
+        """
+        ordered = sorted(self._entries.values())
+        return {entry[-1]: i + 1 for i, entry in enumerate(ordered)}
+
+    def clear(self):
+        """Remove every patient from the queue."""
+        self._heap.clear()
+        self._entries.clear()
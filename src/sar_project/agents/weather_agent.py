@@ -1,6 +1,38 @@
 from sar_project.agents.base_agent import SARBaseAgent
+from sar_project.agents.weather_cache import WeatherCache
+from sar_project.agents.weather_provider import StaticWeatherProvider
+import operator
+import numpy as np
+
+# comparison name -> function; the same functions compare scalars and NumPy arrays
+RULE_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
 class WeatherAgent(SARBaseAgent):
-    def __init__(self, name="weather_specialist"):
+
+    # risk rules: (risk, condition field, comparison, threshold), in the order risks are reported
+    default_risk_rules = (
+        ("high_wind", "wind_speed", ">", 30),
+        ("low_visibility", "visibility", "<", 5),
+    )
+
+    def __init__(self, name="weather_specialist", cache_ttl=60.0, cache_size=1024, risk_rules=None,
+                 provider=None):
+        """
+        Args:
+            name (str): Agent name.
+            cache_ttl (float): Seconds fetched conditions and forecasts are reused for.
+            cache_size (int): Maximum number of locations (and forecast durations) kept in each cache.
+            risk_rules (list, optional): (risk, field, comparison, threshold) rules replacing
+                default_risk_rules, e.g. ("heavy_rain", "precipitation", ">=", 10).
+            provider (WeatherProvider, optional): Source of weather data, e.g. an
+                HTTPWeatherProvider. Defaults to fixed placeholder conditions.
+        """
         super().__init__(
             name=name,
             role="Weather Specialist",
@@ -12,60 +44,113 @@ class WeatherAgent(SARBaseAgent):
         )
         self.current_conditions = {}
         self.forecasts = {}
+        self.provider = provider if provider is not None else StaticWeatherProvider()
+        self.conditions_cache = WeatherCache(ttl=cache_ttl, max_entries=cache_size)
+        self.forecast_cache = WeatherCache(ttl=cache_ttl, max_entries=cache_size)
+        self.risk_rules = tuple(risk_rules if risk_rules is not None else self.default_risk_rules)
+        for _, _, comparison, _ in self.risk_rules:
+            if comparison not in RULE_OPERATORS:
+                raise ValueError(f"Unknown risk rule comparison: {comparison}")
+
+    def reset(self):
+        """Forget cached conditions and forecasts so the agent can serve another field team."""
+        super().reset()
+        self.current_conditions = {}
+        self.forecasts = {}
+        self.conditions_cache.clear()
+        self.forecast_cache.clear()
         
-    def process_request(self, message):
-        """Process weather-related requests"""
-        try:
-            # Example processing logic
-            if "get_conditions" in message:
-                return self.get_current_conditions(message["location"])
-            elif "get_forecast" in message:
-                return self.get_weather_forecast(message["location"], message["duration"])
-            elif "assess_risk" in message:
-                return self.assess_weather_risk(message["location"])
-            else:
-                return {"error": "Unknown request type"}
-        except Exception as e:
-            return {"error": str(e)}
+    # weather request types, dispatched by SARBaseAgent.process_request
+    request_handlers = {
+        "get_conditions": lambda agent, message: agent.get_current_conditions(message["location"]),
+        "get_forecast": lambda agent, message: agent.get_weather_forecast(message["location"], message["duration"]),
+        "assess_risk": lambda agent, message: agent.assess_weather_risk(message["location"]),
+        "assess_risk_many": lambda agent, message: agent.assess_weather_risk_many(message["locations"]),
+        "cache_stats": lambda agent, message: agent.cache_stats(),
+    }
 
     def get_current_conditions(self, location):
-        """Get current weather conditions for location"""
-        # Implement weather API call here
-        return {
-            "location": location,
-            "temperature": 22,
-            "wind_speed": 15,
-            "precipitation": 0,
-            "visibility": 10
-        }
+        """Get current weather conditions for location, served from the conditions cache when fresh"""
+        return dict(self.conditions_cache.get_or_fetch(location, lambda: self._fetch_current_conditions(location)))
 
     def get_weather_forecast(self, location, duration):
-        """Get weather forecast for specified duration"""
-        # Implement forecast API call here
-        return {
-            "location": location,
-            "duration": duration,
-            "forecast": [
-                {"time": "now+1h", "conditions": "clear"},
-                {"time": "now+2h", "conditions": "partly_cloudy"}
-            ]
-        }
+        """Get weather forecast for specified duration, served from the forecast cache when fresh"""
+        return dict(self.forecast_cache.get_or_fetch(
+            (location, duration), lambda: self._fetch_weather_forecast(location, duration)
+        ))
+
+    def cache_stats(self):
+        """Return hit/miss metrics of the conditions and forecast caches"""
+        return {"conditions": self.conditions_cache.stats(), "forecast": self.forecast_cache.stats()}
+
+    def _fetch_current_conditions(self, location):
+        """Fetch current weather conditions for location from the provider"""
+        return self.provider.get_current_conditions(location)
+
+    def _fetch_current_conditions_many(self, locations):
+        """Fetch current weather conditions for many locations from the provider in one call"""
+        return self.provider.get_current_conditions_many(locations)
+
+    def _fetch_weather_forecast(self, location, duration):
+        """Fetch weather forecast for specified duration from the provider"""
+        return self.provider.get_weather_forecast(location, duration)
 
     def assess_weather_risk(self, location):
         """Assess weather-related risks for SAR operations"""
         conditions = self.get_current_conditions(location)
         forecast = self.get_weather_forecast(location, "2h")
-        risks = []
-        if conditions["wind_speed"] > 30:
-            risks.append("high_wind")
-        if conditions["visibility"] < 5:
-            risks.append("low_visibility")
+        risks = [
+            risk for risk, field, comparison, threshold in self.risk_rules
+            if RULE_OPERATORS[comparison](conditions[field], threshold)
+        ]
         return {
             "risk_level": len(risks),
             "risks": risks,
             "recommendations": self._generate_recommendations(risks)
         }
 
+    def assess_weather_risk_many(self, locations):
+        """Assess weather-related risks for many locations in one vectorized pass.
+
+        Conditions are loaded into one NumPy array per rule field and every rule
+        is evaluated over all locations at once. Recommendations are generated
+        once per distinct combination of risks rather than once per location.
+
+        Args:
+            locations (list): Locations (e.g. search-grid cells) to assess.
+
+        Returns:
+            list: One dict per location, in order, with location, risk_level, risks and recommendations.
+        """
+        locations = list(locations)
+        if not locations:
+            return []
+        conditions = self.conditions_cache.get_or_fetch_many(locations, self._fetch_current_conditions_many)
+
+        columns = {}
+        for _, field, _, _ in self.risk_rules:
+            if field not in columns:
+                columns[field] = np.fromiter((c[field] for c in conditions), dtype=float, count=len(conditions))
+        # bit i of a location's code is set when rule i flags it
+        codes = np.zeros(len(locations), dtype=np.int64)
+        for bit, (_, field, comparison, threshold) in enumerate(self.risk_rules):
+            codes |= RULE_OPERATORS[comparison](columns[field], threshold).astype(np.int64) << bit
+
+        assessments = {}
+        for code in np.unique(codes).tolist():
+            risks = [rule[0] for bit, rule in enumerate(self.risk_rules) if code >> bit & 1]
+            assessments[code] = (len(risks), risks, self._generate_recommendations(risks))
+        results = []
+        for location, code in zip(locations, codes.tolist()):
+            risk_level, risks, recommendations = assessments[code]
+            results.append({
+                "location": location,
+                "risk_level": risk_level,
+                "risks": list(risks),
+                "recommendations": list(recommendations)
+            })
+        return results
+
     def _generate_recommendations(self, risks):
         """Generate safety recommendations based on risks"""
         recommendations = []
@@ -76,6 +161,10 @@ class WeatherAgent(SARBaseAgent):
                 recommendations.append("Use additional lighting")
         return recommendations
 
+    def close(self):
+        """Release the weather provider's connections"""
+        self.provider.close()
+
     def update_status(self, status):
         """Update the agent's status"""
         self.status = status
@@ -83,4 +172,5 @@ class WeatherAgent(SARBaseAgent):
 
     def get_status(self):
         """Get the agent's current status"""
-        return getattr(self, "status", "unknown")
+        # looked up in the instance dict: a missing attribute would be delegated to the assistant
+        return vars(self).get("status", "unknown")
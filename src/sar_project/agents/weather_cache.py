@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class WeatherCache:
+    """Per-location TTL cache with LRU eviction and single-flight fetches.
+
+    Entries expire ``ttl`` seconds after they were fetched, and once
+    ``max_entries`` locations are cached the least recently used one is
+    evicted. When several threads miss on the same key at once only the first
+    one calls the fetch function; the others wait for and share its result
+    (or its exception), so a burst of requests for one grid cell costs a
+    single remote call.
+    """
+
+    def __init__(self, ttl=60.0, max_entries=1024, clock=time.monotonic):
+        """
+        Args:
+            ttl (float): Seconds a fetched value stays fresh.
+            max_entries (int): Maximum number of cached keys.
+            clock (callable): Returns the current time in seconds, for tests.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._in_flight = {}  # key -> Future of the running fetch
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_or_fetch(self, key, fetch):
+        """Return the cached value of key, calling fetch() to load it when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                future = self._in_flight[key] = Future()
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        future.set_result(value)
+        return value
+
+    def get_or_fetch_many(self, keys, fetch_many):
+        """Return the values of many keys, loading every missing or expired one with a single fetch_many call.
+
+        Fresh entries are all looked up under one lock acquisition. Keys another
+        caller is already fetching are waited for instead of fetched again.
+
+        Args:
+            keys (list): Keys to look up.
+            fetch_many (callable): Called as fetch_many(list_of_keys), returns their values in order.
+
+        Returns:
+            list: Values in the order of keys.
+        """
+        values = [None] * len(keys)
+        waiting = []  # (index, future) of keys fetched elsewhere or earlier in this batch
+        claimed = {}  # key -> future for the keys this call fetches
+        with self._lock:
+            now = self.clock()
+            entries = self._entries
+            for i, key in enumerate(keys):
+                entry = entries.get(key)
+                if entry is not None and entry[0] > now:
+                    entries.move_to_end(key)
+                    values[i] = entry[1]
+                    self.hits += 1
+                    continue
+                if entry is not None:
+                    del entries[key]
+                    self.expirations += 1
+                future = self._in_flight.get(key)
+                if future is None:
+                    self.misses += 1
+                    future = self._in_flight[key] = claimed[key] = Future()
+                else:
+                    self.coalesced += 1
+                waiting.append((i, future))
+
+        if claimed:
+            try:
+                fetched = fetch_many(list(claimed))
+            except BaseException as e:
+                with self._lock:
+                    for key in claimed:
+                        del self._in_flight[key]
+                for future in claimed.values():
+                    future.set_exception(e)
+                raise
+            with self._lock:
+                expires_at = self.clock() + self.ttl
+                for key, value in zip(claimed, fetched):
+                    del self._in_flight[key]
+                    self._entries[key] = (expires_at, value)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            for future, value in zip(claimed.values(), fetched):
+                future.set_result(value)
+
+        for i, future in waiting:
+            values[i] = future.result()
+        return values
+
+    def invalidate(self, key):
+        """Drop the cached value of key, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every cached value and reset the metrics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.coalesced = self.evictions = self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return the hit/miss metrics of the cache.
+
+        Returns:
+            dict: hits, misses, coalesced (requests that shared another request's fetch),
+                evictions, expirations, current size and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,209 @@
+import asyncio
+import random
+import threading
+from abc import ABC, abstractmethod
+
+# responses worth retrying: rate limiting and server-side errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class WeatherProvider(ABC):
+    """Source of weather data used by WeatherAgent."""
+
+    @abstractmethod
+    def get_current_conditions(self, location):
+        """Return current conditions for location: temperature, wind_speed, precipitation, visibility."""
+
+    @abstractmethod
+    def get_weather_forecast(self, location, duration):
+        """Return the forecast for location over duration."""
+
+    def get_current_conditions_many(self, locations):
+        """Return current conditions for every location, in order."""
+        return [self.get_current_conditions(location) for location in locations]
+
+    def close(self):
+        """Release the provider's resources."""
+
+
+class StaticWeatherProvider(WeatherProvider):
+    """Fixed placeholder conditions, used until a real provider is configured."""
+
+    def get_current_conditions(self, location):
+        return {
+            "location": location,
+            "temperature": 22,
+            "wind_speed": 15,
+            "precipitation": 0,
+            "visibility": 10
+        }
+
+    def get_weather_forecast(self, location, duration):
+        return {
+            "location": location,
+            "duration": duration,
+            "forecast": [
+                {"time": "now+1h", "conditions": "clear"},
+                {"time": "now+2h", "conditions": "partly_cloudy"}
+            ]
+        }
+
+
+class WeatherProviderError(Exception):
+    """A weather request failed after all retries."""
+
+
+class HTTPWeatherProvider(WeatherProvider):
+    """Weather provider talking to an HTTP weather service with aiohttp.
+
+    One pooled client session is kept for the provider's lifetime, so
+    connections (up to ``max_connections``) stay alive and are reused across
+    requests. At most ``max_concurrency`` requests are in flight at once, each
+    attempt is bounded by ``timeout`` seconds, and connection errors, timeouts
+    and 429/5xx responses are retried up to ``retries`` times with jittered
+    exponential backoff.
+
+    The service is expected to answer ``GET {base_url}/conditions?location=...``
+    and ``GET {base_url}/forecast?location=...&duration=...`` with JSON.
+
+    The session lives on a private event loop thread, started on first use.
+    The synchronous WeatherProvider methods block on requests submitted to
+    it, and the async methods (``fetch_*``) await them from the caller's
+    event loop. Calls from any thread or from any number of event loops, one
+    after another or at the same time, therefore share one session.
+    """
+
+    def __init__(self, base_url, max_connections=32, max_concurrency=64, timeout=5.0,
+                 retries=3, backoff=0.05, keepalive_timeout=30.0):
+        """
+        Args:
+            base_url (str): Base URL of the weather service.
+            max_connections (int): Size of the connection pool.
+            max_concurrency (int): Maximum number of requests in flight at once.
+            timeout (float): Seconds allowed for one request attempt.
+            retries (int): Number of retries after a failed attempt.
+            backoff (float): Delay before the first retry in seconds, doubled for every further retry.
+            keepalive_timeout (float): Seconds an idle pooled connection is kept open.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.keepalive_timeout = keepalive_timeout
+        self.requests_sent = 0
+        self.retried = 0
+        self._session = None
+        self._semaphore = None
+        self._session_lock = None
+        self._loop = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    async def _get_session(self):
+        if self._session is None:
+            if self._session_lock is None:
+                self._session_lock = asyncio.Lock()
+            async with self._session_lock:
+                if self._session is None:
+                    import aiohttp
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    self._session = aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(
+                            limit=self.max_connections, keepalive_timeout=self.keepalive_timeout
+                        ),
+                        timeout=aiohttp.ClientTimeout(total=self.timeout)
+                    )
+        return self._session
+
+    async def _get_json(self, path, params):
+        import aiohttp
+        session = await self._get_session()
+        url = f"{self.base_url}/{path}"
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self.retried += 1
+                    await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+                self.requests_sent += 1
+                try:
+                    async with session.get(url, params=params) as response:
+                        if response.status in RETRY_STATUSES:
+                            error = f"{url} returned HTTP {response.status}"
+                            continue
+                        if response.status >= 400:
+                            raise WeatherProviderError(f"{url} returned HTTP {response.status}")
+                        return await response.json()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = f"{url} failed: {e!r}"
+            raise WeatherProviderError(f"{error} (after {self.retries + 1} attempts)")
+
+    def _conditions(self, location):
+        return self._get_json("conditions", {"location": location})
+
+    def _forecast(self, location, duration):
+        return self._get_json("forecast", {"location": location, "duration": duration})
+
+    async def _conditions_many(self, locations):
+        return await asyncio.gather(*(self._conditions(location) for location in locations))
+
+    def _submit(self, coroutine):
+        # the session, semaphore and lock are bound to the private loop: every request runs there
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="weather-provider", daemon=True
+                )
+                self._thread.start()
+            return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def _run(self, coroutine):
+        return self._submit(coroutine).result()
+
+    async def _await(self, coroutine):
+        return await asyncio.wrap_future(self._submit(coroutine))
+
+    async def fetch_current_conditions(self, location):
+        """Coroutine fetching current conditions for location."""
+        return await self._await(self._conditions(location))
+
+    async def fetch_weather_forecast(self, location, duration):
+        """Coroutine fetching the forecast for location over duration."""
+        return await self._await(self._forecast(location, duration))
+
+    async def fetch_current_conditions_many(self, locations):
+        """Coroutine fetching current conditions for every location concurrently, in order."""
+        return await self._await(self._conditions_many(list(locations)))
+
+    def get_current_conditions(self, location):
+        return self._run(self._conditions(location))
+
+    def get_weather_forecast(self, location, duration):
+        return self._run(self._forecast(location, duration))
+
+    def get_current_conditions_many(self, locations):
+        return self._run(self._conditions_many(list(locations)))
+
+    async def _close_session(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def aclose(self):
+        """Coroutine closing the pooled session and stopping the private event loop thread."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def close(self):
+        """Close the pooled session and stop the private event loop thread, if running."""
+        with self._thread_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close_session(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+        self._semaphore = None
+        self._session_lock = None
@@ -0,0 +1,140 @@
+"""Local stub weather service for tests and offline benchmarks.
+
+Serves the API HTTPWeatherProvider expects, with deterministic conditions
+derived from the location name, an optional artificial latency and optional
+injected failures.
+
+Usage:
+    python -m sar_project.agents.weather_stub_server [--port 8080] [--latency 0.005]
+"""
+import argparse
+import asyncio
+import threading
+import zlib
+
+
+def stub_conditions(location):
+    """Deterministic conditions for a location."""
+    seed = zlib.crc32(location.encode())
+    return {
+        "location": location,
+        "temperature": seed % 35,
+        "wind_speed": seed % 50,
+        "precipitation": seed % 20,
+        "visibility": seed % 15
+    }
+
+
+def stub_forecast(location, duration):
+    """Deterministic forecast for a location."""
+    seed = zlib.crc32(location.encode())
+    return {
+        "location": location,
+        "duration": duration,
+        "forecast": [
+            {"time": "now+1h", "conditions": ("clear", "partly_cloudy", "rain")[seed % 3]},
+            {"time": "now+2h", "conditions": ("clear", "partly_cloudy", "rain")[seed // 3 % 3]}
+        ]
+    }
+
+
+class StubWeatherServer:
+    """Stub weather service running on its own event loop thread.
+
+    Usage:
+        with StubWeatherServer(latency=0.005) as server:
+            provider = HTTPWeatherProvider(server.url)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_every=0):
+        """
+        Args:
+            host (str): Interface to listen on.
+            port (int): Port to listen on, 0 picks a free one.
+            latency (float): Seconds every response is delayed by.
+            fail_every (int): When set, every fail_every-th request is answered with HTTP 503.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+        self._loop = None
+        self._thread = None
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def _respond(self, body):
+        from aiohttp import web
+        self.requests += 1
+        if self.fail_every and self.requests % self.fail_every == 0:
+            return web.json_response({"error": "unavailable"}, status=503)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response(body)
+
+    async def _conditions(self, request):
+        return await self._respond(stub_conditions(request.query["location"]))
+
+    async def _forecast(self, request):
+        query = request.query
+        return await self._respond(stub_forecast(query["location"], query.get("duration", "2h")))
+
+    async def _start(self):
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_get("/conditions", self._conditions)
+        app.router.add_get("/forecast", self._forecast)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def start(self):
+        """Start serving in a background thread and return the base URL."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="stub-weather-server", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self.url
+
+    def stop(self):
+        """Stop serving and join the background thread."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubWeatherServer(args.host, args.port, args.latency, args.fail_every)
+    print(f"Stub weather server listening on {server.start()}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime
+
+from sar_project.config import settings
+
+# LOG_LEVEL values that turn logging off entirely
+DISABLED_LEVELS = {"OFF", "NONE", "DISABLED"}
+ROOT_LOGGER = "sar_project"
+
+_listener = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats a record as one JSON object: time, level, logger, event and the event's fields."""
+
+    def format(self, record):
+        event = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        event.update(getattr(record, "fields", {}))
+        return json.dumps(event, default=str)
+
+
+class _StderrHandler(logging.StreamHandler):
+    """StreamHandler writing to whatever sys.stderr is at the time of each write."""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread."""
+
+    def prepare(self, record):
+        return record
+
+
+def _parse_level(level):
+    if isinstance(level, str):
+        if level.upper() in DISABLED_LEVELS:
+            return logging.CRITICAL + 1
+        return logging.getLevelName(level.upper())
+    return level
+
+
+def configure_logging(level=None, stream=None):
+    """Route every sar_project logger through a queue to a background writer thread.
+
+    Callers only put the log record on an in-memory queue; formatting and the
+    (possibly slow) stream write happen on the listener thread. The package
+    never calls this itself: applications and command-line entry points opt
+    in. Until then sar_project records propagate to the application's own
+    handlers like any library's.
+
+    Args:
+        level (str or int, optional): Log level, defaults to LOG_LEVEL from settings.
+            'OFF' disables logging entirely.
+        stream (file, optional): Where log lines are written, defaults to stderr.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    output = logging.StreamHandler(stream) if stream is not None else _StderrHandler()
+    output.setFormatter(StructuredFormatter())
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [_QueueHandler(log_queue)]
+    root.propagate = False
+    root.setLevel(_parse_level(level if level is not None else settings.LOG_LEVEL))
+
+
+def set_log_level(level):
+    """Change the sar_project log level at runtime ('OFF' disables logging)."""
+    logging.getLogger(ROOT_LOGGER).setLevel(_parse_level(level))
+
+
+def reset_logging():
+    """Undo configure_logging: stop the writer thread and let sar_project records propagate again."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = []
+    root.propagate = True
+    root.setLevel(logging.NOTSET)
+
+
+def log_event(logger, level, event, **fields):
+    """Log a structured event; costs a single level check when the level is disabled.
+
+    Args:
+        logger (logging.Logger): Logger to use.
+        level (int): Logging level, e.g. logging.INFO.
+        event (str): Event name.
+        **fields: Event fields, included as keys of the JSON log line.
+    """
+    if logger.isEnabledFor(level):
+        # build the record directly: Logger.log would walk the stack to find the caller
+        record = logger.makeRecord(logger.name, level, "(unknown file)", 0, event, (), None)
+        record.fields = fields
+        logger.handle(record)
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
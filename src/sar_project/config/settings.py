@@ -18,6 +18,11 @@ DEFAULT_MODEL = "gpt-4"
 DEFAULT_TEMPERATURE = 0.7
 DEFAULT_TIMEOUT = 600
 
+# LLM response cache shared by the agents: unset disables it
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 256 * 2 ** 20))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", 1024))
+
 # File paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
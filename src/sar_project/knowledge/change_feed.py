@@ -0,0 +1,228 @@
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+
+from sar_project.config.logging_config import log_event
+
+logger = logging.getLogger(__name__)
+
+TERRAIN = "terrain"
+WEATHER = "weather"
+RESOURCE = "resource"
+MISSION_EVENT = "mission_event"
+TOPICS = (TERRAIN, WEATHER, RESOURCE, MISSION_EVENT)
+
+# one change: topic, changed key (location, resource name or event type), its location, new data, feed sequence number
+ChangeEvent = namedtuple("ChangeEvent", ["topic", "key", "location", "data", "seq"])
+
+
+class Subscription:
+    """
+    One subscriber's filtered, bounded queue of change events.
+
+    The queue holds at most ``max_queue`` events; when a slow subscriber lets
+    it fill up, the oldest events are dropped (and counted in ``dropped``)
+    so publishers never block. Events are taken off in batches of up to
+    ``batch_size``, either by polling or, when a callback was given, by the
+    feed's delivery thread calling callback(batch).
+    """
+
+    def __init__(self, feed, topics, locations, max_queue, batch_size, callback):
+        self.feed = feed
+        self.topics = frozenset(topics) if topics is not None else None
+        self.locations = frozenset(locations) if locations is not None else None
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.callback = callback
+        self.dropped = 0
+        self.delivered = 0
+        self._queue = deque()
+        self._ready = threading.Condition(threading.Lock())
+        self._delivering = False
+
+    def _offer(self, event):
+        with self._ready:
+            if len(self._queue) >= self.max_queue:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(event)
+            self._ready.notify()
+
+    def _take(self, max_items):
+        # caller holds the condition lock
+        count = min(len(self._queue), max_items or self.batch_size)
+        batch = [self._queue.popleft() for _ in range(count)]
+        self.delivered += count
+        return batch
+
+    def poll(self, max_items=None):
+        """Return up to max_items (default batch_size) queued events without waiting."""
+        with self._ready:
+            return self._take(max_items)
+
+    def get(self, timeout=None, max_items=None):
+        """Wait up to timeout seconds for events, then return up to max_items (default batch_size) of them."""
+        with self._ready:
+            self._ready.wait_for(lambda: self._queue, timeout)
+            return self._take(max_items)
+
+    def __len__(self):
+        return len(self._queue)
+
+    def close(self):
+        """Stop receiving events."""
+        self.feed.unsubscribe(self)
+
+
+class ChangeFeed:
+    """
+    Publish/subscribe feed of KnowledgeBase changes.
+
+    Subscribers register for topics (terrain, weather, resource,
+    mission_event) and optionally a set of locations; publishing routes a
+    change only to the subscribers of its topic whose location filter
+    matches, so agents are told about relevant changes instead of polling.
+    Subscribers with a callback are served by one delivery thread that hands
+    them their queued events in batches.
+    """
+
+    def __init__(self, batch_interval=0.0):
+        """
+        Args:
+            batch_interval (float): Seconds the delivery thread waits after being woken,
+                so changes arriving close together reach callbacks as one batch.
+        """
+        self.batch_interval = batch_interval
+        self._lock = threading.Lock()
+        self._by_topic = {topic: () for topic in TOPICS}
+        self._subscriptions = ()
+        self._seq = 0
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+
+    def has_subscribers(self, topic):
+        """Return True if anyone subscribed to topic; lets publishers skip building events."""
+        return bool(self._by_topic.get(topic))
+
+    def subscribe(self, topics=None, locations=None, max_queue=1000, batch_size=100, callback=None):
+        """
+        Register a subscriber.
+
+        Args:
+            topics (iterable, optional): Topics to receive, defaults to all of them.
+            locations (iterable, optional): Only changes at these locations are received.
+            max_queue (int): Maximum number of undelivered events kept; older ones are dropped.
+            batch_size (int): Maximum number of events per delivered batch.
+            callback (callable, optional): Called as callback(list_of_events) from the
+                delivery thread. Without one, events are taken with poll() or get().
+
+        Returns:
+            Subscription: The new subscription.
+        """
+        unknown = set(topics or ()) - set(TOPICS)
+        if unknown:
+            raise ValueError(f"Unknown change feed topics: {sorted(unknown)}")
+        subscription = Subscription(self, topics, locations, max_queue, batch_size, callback)
+        with self._lock:
+            # routing tables are replaced, never mutated, so publish() reads them without locking
+            self._subscriptions = self._subscriptions + (subscription,)
+            self._rebuild_routes()
+            if callback is not None and self._thread is None:
+                self._thread = threading.Thread(target=self._deliver_loop, name="change-feed", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscriber."""
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+            self._rebuild_routes()
+
+    def _rebuild_routes(self):
+        self._by_topic = {
+            topic: tuple(s for s in self._subscriptions if s.topics is None or topic in s.topics)
+            for topic in TOPICS
+        }
+
+    def publish(self, topic, key, location, data):
+        """
+        Route one change to the matching subscribers.
+
+        Args:
+            topic (str): One of TOPICS.
+            key: Changed item (location, resource name or event type).
+            location: Location of the change, matched against location filters.
+            data: New data.
+        """
+        subscribers = [
+            s for s in self._by_topic[topic] if s.locations is None or location in s.locations
+        ]
+        if not subscribers:
+            return
+        with self._lock:
+            self._seq += 1
+            event = ChangeEvent(topic, key, location, data, self._seq)
+        wake = False
+        for subscription in subscribers:
+            subscription._offer(event)
+            wake = wake or subscription.callback is not None
+        # setting the event again while the delivery thread is still behind would only add wakeups
+        if wake and not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def _deliver_loop(self):
+        while not self._closed:
+            self._wakeup.wait()
+            if self.batch_interval:
+                time.sleep(self.batch_interval)
+            self._wakeup.clear()
+            self._deliver_pending()
+
+    def _deliver_pending(self):
+        for subscription in self._subscriptions:
+            if subscription.callback is None:
+                continue
+            while True:
+                with subscription._ready:
+                    batch = subscription._take(None)
+                    subscription._delivering = bool(batch)
+                if not batch:
+                    break
+                try:
+                    subscription.callback(batch)
+                except Exception as e:
+                    log_event(logger, logging.ERROR, "change_feed_callback_failed", error=repr(e))
+                finally:
+                    with subscription._ready:
+                        subscription._delivering = False
+                        subscription._ready.notify_all()
+
+    def flush(self, timeout=5.0):
+        """
+        Wait until every callback subscriber has been handed its queued events.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        deadline = time.monotonic() + timeout
+        for subscription in self._subscriptions:
+            if subscription.callback is None:
+                continue
+            with subscription._ready:
+                if not subscription._ready.wait_for(
+                    lambda: not subscription._queue and not subscription._delivering,
+                    max(0.0, deadline - time.monotonic())
+                ):
+                    return False
+        return True
+
+    def close(self):
+        """Stop the delivery thread after delivering what is queued."""
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._deliver_pending()
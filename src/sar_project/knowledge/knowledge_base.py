@@ -1,33 +1,101 @@
+from datetime import datetime
+import time
+
+from sar_project.knowledge.change_feed import MISSION_EVENT, RESOURCE, TERRAIN, WEATHER, ChangeFeed
+from sar_project.knowledge.mission_log import MissionLog, event_type
+from sar_project.knowledge.resource_registry import ResourceRegistry
+from sar_project.knowledge.spatial_index import GridIndex
+from sar_project.knowledge.weather_history import DEFAULT_WEATHER_FIELDS, WeatherRingBuffer
+
+
 class KnowledgeBase:
-    def __init__(self):
+    def __init__(self, terrain_cell_size=100.0, weather_history_capacity=1024, weather_fields=DEFAULT_WEATHER_FIELDS,
+                 mission_log_dir=None, mission_segment_size=10_000, change_batch_interval=0.0):
         """
         Initializes the knowledge base with empty datasets for terrain, weather,
         resources, and mission history.
+
+        Args:
+            terrain_cell_size (float): Grid cell size of the terrain spatial index,
+                in the units of the terrain coordinates (e.g. meters).
+            weather_history_capacity (int): Number of weather samples kept per location.
+            weather_fields (tuple): Numeric weather fields recorded in the history.
+            mission_log_dir (str, optional): Directory the sealed mission log segments are
+                spilled to, defaults to a temporary directory deleted by close(). Events
+                of the unsealed active segment are kept in memory only.
+            mission_segment_size (int): Number of mission events per log segment.
+            change_batch_interval (float): Seconds the change feed waits to gather
+                changes into one batch before calling subscriber callbacks.
         """
         self.terrain_data = {}
+        self.terrain_index = GridIndex(cell_size=terrain_cell_size)
         self.weather_data = {}
-        self.resource_status = {}
-        self.mission_history = []
+        self.weather_history = {}
+        self.weather_history_capacity = weather_history_capacity
+        self.weather_fields = tuple(weather_fields)
+        self.resource_status = ResourceRegistry(cell_size=terrain_cell_size)
+        self.mission_log = MissionLog(mission_log_dir, segment_size=mission_segment_size)
+        self.change_feed = ChangeFeed(batch_interval=change_batch_interval)
 
-    def update_terrain(self, location, data):
+    def update_terrain(self, location, data, position=None):
         """
         Updates terrain data for a specific location.
 
         Args:
             location (str): Name or identifier of the location.
             data (dict): Terrain-related data (e.g., elevation, obstacles).
+            position (tuple, optional): (x, y) coordinates of the location, e.g. meters
+                on a local grid. Locations with a position can be found by the
+                spatial terrain queries.
         """
         self.terrain_data[location] = data
+        if position is not None:
+            self.terrain_index.insert(location, *position)
+        self.change_feed.publish(TERRAIN, location, location, data)
 
-    def update_weather(self, location, conditions):
+    def update_terrain_many(self, cells):
         """
-        Updates weather data for a specific location.
+        Updates terrain data for many positioned locations at once.
+
+        Args:
+            cells (iterable): (location, data, (x, y)) tuples.
+        """
+        locations, positions = [], []
+        for location, data, position in cells:
+            self.terrain_data[location] = data
+            locations.append(location)
+            positions.append(position)
+        self.terrain_index.insert_many(locations, positions)
+        if self.change_feed.has_subscribers(TERRAIN):
+            terrain = self.terrain_data
+            for location in locations:
+                self.change_feed.publish(TERRAIN, location, location, terrain[location])
+
+    def update_weather(self, location, conditions, timestamp=None):
+        """
+        Updates weather data for a specific location and records it in the
+        location's weather history.
 
         Args:
             location (str): Name or identifier of the location.
             conditions (dict): Weather conditions (e.g., temperature, wind speed).
+            timestamp (float or datetime, optional): Time of the observation in epoch
+                seconds. Defaults to the current time. A late observation, older than the
+                location's latest one, only goes into the history.
         """
-        self.weather_data[location] = conditions
+        if timestamp is None:
+            timestamp = time.time()
+        elif isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        timestamp = float(timestamp)
+        history = self.weather_history.get(location)
+        if history is None:
+            history = self.weather_history[location] = WeatherRingBuffer(
+                self.weather_history_capacity, self.weather_fields
+            )
+        if history.append(timestamp, conditions):
+            self.weather_data[location] = conditions
+            self.change_feed.publish(WEATHER, location, location, conditions)
 
     def update_resource_status(self, resource_name, status):
         """
@@ -35,18 +103,46 @@ class KnowledgeBase:
 
         Args:
             resource_name (str): Name of the resource (e.g., drone, vehicle).
-            status (dict): Resource status (e.g., availability, location).
+            status (dict): Resource status (e.g., availability, location). The
+                'type', 'availability' and 'location' fields and an (x, y)
+                'position' are indexed for query_resources.
         """
-        self.resource_status[resource_name] = status
+        self.resource_status.update(resource_name, status)
+        self.change_feed.publish(RESOURCE, resource_name, status.get("location"), status)
 
     def log_mission_event(self, event):
         """
         Logs an event in the mission history.
 
         Args:
-            event (dict): Event details (e.g., timestamp, action, outcome).
+            event (dict): Event details (e.g., timestamp, action, outcome). The
+                'timestamp' and 'type' (or 'action') fields are indexed.
+        """
+        self.mission_log.append(event)
+        if self.change_feed.has_subscribers(MISSION_EVENT):
+            self.change_feed.publish(MISSION_EVENT, event_type(event), event.get("location"), event)
+
+    def subscribe(self, topics=None, locations=None, max_queue=1000, batch_size=100, callback=None):
+        """
+        Subscribes to changes made through the update and log methods, so agents
+        are notified of relevant changes instead of polling the knowledge base.
+
+        Args:
+            topics (iterable, optional): Any of 'terrain', 'weather', 'resource' and
+                'mission_event'; defaults to all of them.
+            locations (iterable, optional): Only changes at these locations are received
+                (a resource's or event's 'location' field).
+            max_queue (int): Maximum number of undelivered changes kept; the oldest
+                are dropped when a subscriber falls behind.
+            batch_size (int): Maximum number of changes delivered at once.
+            callback (callable, optional): Called with each batch of ChangeEvents from
+                the feed's delivery thread; without one, use the subscription's
+                poll() or get().
+
+        Returns:
+            Subscription: The subscription; close() it to stop receiving changes.
         """
-        self.mission_history.append(event)
+        return self.change_feed.subscribe(topics, locations, max_queue, batch_size, callback)
 
     def query_terrain(self, location):
         """
@@ -60,6 +156,55 @@ class KnowledgeBase:
         """
         return self.terrain_data.get(location, {})
 
+    def query_terrain_in_box(self, min_x, min_y, max_x, max_y):
+        """
+        Retrieves terrain data of every positioned location inside a bounding box.
+
+        Args:
+            min_x (float): Western edge of the box.
+            min_y (float): Southern edge of the box.
+            max_x (float): Eastern edge of the box.
+            max_y (float): Northern edge of the box.
+
+        Returns:
+            dict: Terrain data by location.
+        """
+        terrain = self.terrain_data
+        return {location: terrain[location] for location in self.terrain_index.in_box(min_x, min_y, max_x, max_y)}
+
+    def query_terrain_within(self, x, y, radius):
+        """
+        Retrieves the positioned locations within a radius of a point.
+
+        Args:
+            x (float): X coordinate of the point.
+            y (float): Y coordinate of the point.
+            radius (float): Search radius, in the units of the coordinates.
+
+        Returns:
+            list: (location, distance) pairs, nearest first.
+        """
+        return self.terrain_index.within(x, y, radius)
+
+    def query_nearest_terrain(self, x, y, k=1, where=None):
+        """
+        Retrieves the positioned locations nearest to a point.
+
+        Args:
+            x (float): X coordinate of the point.
+            y (float): Y coordinate of the point.
+            k (int): Number of locations to return.
+            where (callable, optional): Only locations whose terrain data satisfies
+                where(data) are returned, e.g. lambda data: data.get("obstacles").
+
+        Returns:
+            list: Up to k (location, distance) pairs, nearest first.
+        """
+        if where is not None:
+            terrain = self.terrain_data
+            return self.terrain_index.nearest(x, y, k, lambda location: where(terrain[location]))
+        return self.terrain_index.nearest(x, y, k)
+
     def query_weather(self, location):
         """
         Retrieves weather data for a specific location.
@@ -72,6 +217,49 @@ class KnowledgeBase:
         """
         return self.weather_data.get(location, {})
 
+    def query_weather_history(self, location, start=None, end=None):
+        """
+        Retrieves the recorded weather samples of a location within a time range.
+
+        Args:
+            location (str): Name or identifier of the location.
+            start (float, optional): Earliest sample time, in epoch seconds.
+            end (float, optional): Latest sample time, in epoch seconds.
+
+        Returns:
+            dict: 'timestamp' and one NumPy array per weather field, or an empty
+                dictionary if the location has no history.
+        """
+        history = self.weather_history.get(location)
+        return history.range(start, end) if history is not None else {}
+
+    def query_latest_weather(self, location, n):
+        """
+        Retrieves the n most recent weather samples of a location, oldest first.
+
+        Returns:
+            dict: Same format as query_weather_history.
+        """
+        history = self.weather_history.get(location)
+        return history.latest(n) if history is not None else {}
+
+    def query_weather_aggregates(self, location, interval, start=None, end=None):
+        """
+        Retrieves min/max/mean weather per time interval for a location.
+
+        Args:
+            location (str): Name or identifier of the location.
+            interval (float): Interval length in seconds (e.g. 3600 for hourly).
+            start (float, optional): Earliest sample time, in epoch seconds.
+            end (float, optional): Latest sample time, in epoch seconds.
+
+        Returns:
+            dict: 'interval_start', 'count' and per-field 'min', 'max' and 'mean'
+                arrays, or an empty dictionary if the location has no history.
+        """
+        history = self.weather_history.get(location)
+        return history.aggregate(interval, start, end) if history is not None else {}
+
     def query_resource_status(self, resource_name):
         """
         Retrieves the status of a resource.
@@ -84,11 +272,70 @@ class KnowledgeBase:
         """
         return self.resource_status.get(resource_name, {})
 
+    def query_resources(self, near=None, **filters):
+        """
+        Retrieves the resources matching field filters, e.g. available drones
+        near a point: query_resources(type="drone", availability="available",
+        near=(x, y, 2000)).
+
+        Args:
+            near (tuple, optional): (x, y, radius); only positioned resources within
+                radius are returned, nearest first.
+            **filters: Values of 'type', 'availability' and/or 'location' to match;
+                a list, tuple or set matches any of its values.
+
+        Returns:
+            dict: Status by resource name.
+        """
+        resources = self.resource_status
+        return {name: resources[name] for name in resources.query(near=near, **filters)}
+
+    def count_resources(self, near=None, **filters):
+        """
+        Counts the resources matching field filters (see query_resources).
+
+        Returns:
+            int: Number of matching resources.
+        """
+        return self.resource_status.count(near=near, **filters)
+
     def get_mission_history(self):
         """
-        Retrieves the complete mission history.
+        Retrieves the complete mission history. Prefer iter_mission_events,
+        which streams events instead of loading the whole history.
 
         Returns:
             list: A list of logged mission events.
         """
-        return self.mission_history
+        return list(self.mission_log)
+
+    def iter_mission_events(self, start=None, end=None, event_types=None):
+        """
+        Streams logged mission events by time range and/or type.
+
+        Args:
+            start (float, optional): Earliest event time, in epoch seconds.
+            end (float, optional): Latest event time, in epoch seconds.
+            event_types (str or iterable, optional): Event type(s) to include.
+
+        Returns:
+            iterator: Matching events in the order they were logged.
+        """
+        return self.mission_log.iter_events(start, end, event_types)
+
+    def count_mission_events(self, start=None, end=None, event_types=None):
+        """
+        Counts logged mission events by time range and/or type without reading them.
+
+        Returns:
+            int: Number of matching events.
+        """
+        return self.mission_log.count(start, end, event_types)
+
+    def close(self):
+        """
+        Stops the change feed and closes the mission log, deleting its
+        temporary segment directory if no mission_log_dir was given.
+        """
+        self.change_feed.close()
+        self.mission_log.close()
@@ -0,0 +1,264 @@
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+SEGMENT_PREFIX = "segment-"
+DATA_SUFFIX = ".events"
+INDEX_SUFFIX = ".index.npy"
+
+# one row per event of a sealed segment: where its JSON is in the data file, its time and type code
+INDEX_DTYPE = np.dtype([("offset", np.int64), ("length", np.int32), ("timestamp", np.float64), ("type", np.int32)])
+
+# datetimes are sealed as {"$datetime": iso string} and decoded back into datetimes
+_DATETIME_TAG = "$datetime"
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    return str(value)
+
+
+def _decode_object(obj):
+    if len(obj) == 1 and _DATETIME_TAG in obj:
+        return datetime.fromisoformat(obj[_DATETIME_TAG])
+    return obj
+
+
+def event_timestamp(event):
+    """
+    Returns the time of an event in epoch seconds, from its 'timestamp' field
+    (epoch seconds, datetime or ISO string) or the current time if it has none.
+    """
+    value = event.get("timestamp")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def event_type(event):
+    """Returns the type of an event: its 'type' field, else its 'action' field."""
+    value = event.get("type", event.get("action"))
+    return None if value is None else str(value)
+
+
+class _SealedSegment:
+    """A full segment spilled to disk: a file of JSON events and a memory-mapped index."""
+
+    def __init__(self, data_path, index_path):
+        self.index = np.load(index_path, mmap_mode="r")
+        with open(data_path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(data_path) else b""
+        timestamps = self.index["timestamp"]
+        self.min_time = float(timestamps.min())
+        self.max_time = float(timestamps.max())
+        self.type_codes = set(np.unique(self.index["type"]).tolist())
+
+    def __len__(self):
+        return len(self.index)
+
+    def positions(self, start, end, type_codes):
+        """Positions of the events matching the filters, in log order."""
+        if start is not None and self.max_time < start or end is not None and self.min_time > end:
+            return ()
+        if type_codes is not None and not (type_codes & self.type_codes):
+            return ()
+        if start is None and end is None and (type_codes is None or self.type_codes <= type_codes):
+            return range(len(self.index))
+        mask = np.ones(len(self.index), dtype=bool)
+        if start is not None:
+            mask &= self.index["timestamp"] >= start
+        if end is not None:
+            mask &= self.index["timestamp"] <= end
+        if type_codes is not None:
+            mask &= np.isin(self.index["type"], list(type_codes))
+        return np.flatnonzero(mask).tolist()
+
+    def event(self, position):
+        row = self.index[position]
+        offset = int(row["offset"])
+        return json.loads(self.data[offset:offset + int(row["length"])], object_hook=_decode_object)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+
+class MissionLog:
+    """
+    Segmented append-only log of mission events.
+
+    New events go to an in-memory active segment. Once it holds
+    ``segment_size`` events it is sealed: the events are written to a data
+    file as JSON and their offsets, times and type codes to an index file,
+    both of which are then memory-mapped, so sealed history stays on disk and
+    is paged in only when read. Every sealed segment knows its time span and
+    the event types it contains, so time-range and type queries skip whole
+    segments and filter the rest with vectorized scans of the mapped index.
+
+    Only sealed segments are durable: the active segment lives in memory
+    and its events are lost when the process exits before it fills up.
+    Events read back from sealed segments are decoded from JSON. Datetimes
+    come back as datetimes, tuples as lists, and other values that are not
+    JSON types as strings.
+
+    Without a ``directory``, sealed segments go to a temporary directory that
+    the log owns and deletes on close() or when it is garbage collected.
+    """
+
+    def __init__(self, directory=None, segment_size=10_000):
+        """
+        Args:
+            directory (str, optional): Directory for the sealed segments. Segments already
+                in it are reopened (events of a segment that was never sealed are not
+                persisted). Defaults to a temporary directory created on the first seal
+                and deleted with the log.
+            segment_size (int): Number of events per segment.
+        """
+        self.directory = directory
+        self.segment_size = segment_size
+        self._temporary = None  # TemporaryDirectory owned by the log, if no directory was given
+        self._lock = threading.Lock()
+        self._type_codes = {}
+        self._sealed = []
+        self._active = []
+        self._active_times = []
+        self._active_types = []
+        if directory is not None and os.path.isdir(directory):
+            self._reopen()
+
+    def _reopen(self):
+        types_path = os.path.join(self.directory, "types.json")
+        if os.path.exists(types_path):
+            with open(types_path, encoding="utf-8") as f:
+                self._type_codes = {type_name: code for code, type_name in enumerate(json.load(f))}
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(INDEX_SUFFIX))
+        for name in names:
+            base = os.path.join(self.directory, name[:-len(INDEX_SUFFIX)])
+            self._sealed.append(_SealedSegment(base + DATA_SUFFIX, base + INDEX_SUFFIX))
+
+    def __len__(self):
+        return sum(len(segment) for segment in self._sealed) + len(self._active)
+
+    def _type_code(self, type_name):
+        code = self._type_codes.get(type_name)
+        if code is None:
+            code = self._type_codes[type_name] = len(self._type_codes)
+        return code
+
+    def append(self, event):
+        """
+        Appends one event, sealing the active segment when it is full.
+
+        Args:
+            event (dict): Event details (e.g., timestamp, type or action, outcome).
+        """
+        with self._lock:
+            self._active.append(event)
+            self._active_times.append(event_timestamp(event))
+            self._active_types.append(self._type_code(event_type(event)))
+            if len(self._active) >= self.segment_size:
+                self._seal()
+
+    def _seal(self):
+        # caller holds the lock
+        if self.directory is None:
+            self._temporary = tempfile.TemporaryDirectory(prefix="sar-mission-log-")
+            self.directory = self._temporary.name
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{SEGMENT_PREFIX}{len(self._sealed):08d}")
+
+        index = np.empty(len(self._active), dtype=INDEX_DTYPE)
+        index["timestamp"] = self._active_times
+        index["type"] = self._active_types
+        encoded = [json.dumps(event, default=_encode_value).encode() for event in self._active]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        index["length"] = lengths
+        # one newline after every event keeps the data file readable as JSON lines
+        index["offset"] = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+        with open(base + DATA_SUFFIX, "wb") as f:
+            f.write(b"\n".join(encoded) + b"\n")
+        with open(base + INDEX_SUFFIX, "wb") as f:
+            np.save(f, index)
+        with open(os.path.join(self.directory, "types.json"), "w", encoding="utf-8") as f:
+            # a list indexed by code, since None is a valid type but not a valid JSON key
+            json.dump(list(self._type_codes), f)
+
+        self._sealed.append(_SealedSegment(base + DATA_SUFFIX, base + INDEX_SUFFIX))
+        self._active, self._active_times, self._active_types = [], [], []
+
+    def _codes_for(self, event_types):
+        """Type codes of the requested event types; None means no type filter."""
+        if event_types is None:
+            return None
+        if isinstance(event_types, str):
+            event_types = [event_types]
+        return {self._type_codes[t] for t in event_types if t in self._type_codes}
+
+    def iter_events(self, start=None, end=None, event_types=None):
+        """
+        Streams events in log order, optionally filtered by time and type.
+
+        Args:
+            start (float, optional): Earliest event time, in epoch seconds.
+            end (float, optional): Latest event time, in epoch seconds.
+            event_types (str or iterable, optional): Event type(s) to include.
+
+        Yields:
+            dict: Matching events, one at a time.
+        """
+        type_codes = self._codes_for(event_types)
+        if type_codes is not None and not type_codes:
+            return
+        with self._lock:
+            sealed = list(self._sealed)
+            active = list(zip(self._active, self._active_times, self._active_types))
+        for segment in sealed:
+            for position in segment.positions(start, end, type_codes):
+                yield segment.event(position)
+        for event, timestamp, code in active:
+            if (start is None or timestamp >= start) and (end is None or timestamp <= end) \
+                    and (type_codes is None or code in type_codes):
+                yield event
+
+    def __iter__(self):
+        return self.iter_events()
+
+    def count(self, start=None, end=None, event_types=None):
+        """Returns the number of events matching the filters, without decoding them."""
+        type_codes = self._codes_for(event_types)
+        if type_codes is not None and not type_codes:
+            return 0
+        with self._lock:
+            sealed = list(self._sealed)
+            active = list(zip(self._active_times, self._active_types))
+        total = sum(len(segment.positions(start, end, type_codes)) for segment in sealed)
+        return total + sum(
+            1 for timestamp, code in active
+            if (start is None or timestamp >= start) and (end is None or timestamp <= end)
+            and (type_codes is None or code in type_codes)
+        )
+
+    def close(self):
+        """Unmaps the sealed segments and deletes the temporary directory the log owns, if any."""
+        with self._lock:
+            for segment in self._sealed:
+                segment.close()
+            self._sealed = []
+            if self._temporary is not None:
+                self._temporary.cleanup()
+                self._temporary = None
+                self.directory = None
@@ -0,0 +1,156 @@
+from collections.abc import Mapping
+from itertools import repeat
+
+from sar_project.knowledge.spatial_index import GridIndex
+
+# status fields with a secondary index: field -> value -> {resource name: None}
+INDEXED_FIELDS = ("type", "availability", "location")
+# index key of a field the status does not have
+_ABSENT = object()
+
+
+class ResourceRegistry(Mapping):
+    """
+    Registry of SAR resources (drones, vehicles, teams) with secondary indexes.
+
+    Behaves as a read-only mapping of resource name to status dict. The
+    ``type``, ``availability`` and ``location`` fields of every status are
+    kept in hash indexes and an optional ``position`` (x, y) in a grid spatial
+    index, so filtered queries only visit the resources in the smallest
+    matching index bucket instead of scanning the whole fleet, and counts for
+    a single field are a bucket size lookup. Statuses must be changed through
+    update() so the indexes stay in sync. The registry remembers the values it
+    indexed, so a status dict read from it, changed in place and passed back
+    to update() is re-indexed too.
+
+    Unhashable field values are indexed in a hashable form: lists as tuples,
+    sets as frozensets and dicts as frozensets of their items, so a location
+    such as ``[x, y]`` is matched by the filter ``location=[(x, y)]``.
+    """
+
+    def __init__(self, cell_size=100.0):
+        """
+        Args:
+            cell_size (float): Grid cell size of the position index.
+        """
+        self._resources = {}
+        self._indexes = {field: {} for field in INDEXED_FIELDS}
+        # name -> index keys of its INDEXED_FIELDS at the last update
+        self._keys = {}
+        self._positions = GridIndex(cell_size=cell_size)
+
+    def __getitem__(self, name):
+        return self._resources[name]
+
+    def __iter__(self):
+        return iter(self._resources)
+
+    def __len__(self):
+        return len(self._resources)
+
+    def update(self, name, status):
+        """
+        Sets the status of a resource, replacing its previous status.
+
+        Args:
+            name (str): Name of the resource.
+            status (dict): Resource status. 'type', 'availability' and 'location'
+                are indexed; 'position' is an (x, y) pair.
+        """
+        keys = tuple(_index_key(status[field]) if field in status else _ABSENT for field in INDEXED_FIELDS)
+        previous = self._keys.get(name, repeat(_ABSENT))
+        for index, old, new in zip(self._indexes.values(), previous, keys):
+            if old is new or old == new:
+                continue
+            if old is not _ABSENT:
+                _discard(index, old, name)
+            if new is not _ABSENT:
+                index.setdefault(new, {})[name] = None
+        position = status.get("position")
+        if position is not None:
+            self._positions.insert(name, *position)
+        else:
+            self._positions.remove(name)
+        self._keys[name] = keys
+        self._resources[name] = status
+
+    def remove(self, name):
+        """Removes a resource; returns False if it was not registered."""
+        if self._resources.pop(name, None) is None:
+            return False
+        for index, key in zip(self._indexes.values(), self._keys.pop(name)):
+            if key is not _ABSENT:
+                _discard(index, key, name)
+        self._positions.remove(name)
+        return True
+
+    def _buckets(self, filters):
+        """One candidate collection per filter, smallest first."""
+        buckets = []
+        for field, wanted in filters.items():
+            if field not in self._indexes:
+                raise KeyError(f"Unknown resource field: {field}")
+            index = self._indexes[field]
+            if isinstance(wanted, (list, tuple, set, frozenset)):
+                found = [index[key] for key in map(_index_key, wanted) if key in index]
+                bucket = found[0] if len(found) == 1 else {name: None for part in found for name in part}
+            else:
+                bucket = index.get(_index_key(wanted), {})
+            buckets.append(bucket)
+        buckets.sort(key=len)
+        return buckets
+
+    def query(self, near=None, **filters):
+        """
+        Returns the names of the resources matching every filter.
+
+        Args:
+            near (tuple, optional): (x, y, radius); only positioned resources within
+                radius are returned, nearest first.
+            **filters: Field values to match (type, availability, location); a list,
+                tuple or set matches any of its values.
+
+        Returns:
+            list: Matching resource names.
+        """
+        buckets = self._buckets(filters)
+        if near is None:
+            if not buckets:
+                return list(self._resources)
+            smallest, rest = buckets[0], buckets[1:]
+            return [name for name in smallest if all(name in bucket for bucket in rest)]
+
+        # the position index narrows a radius search down fastest, the field buckets then filter it
+        return [name for name, _ in self._positions.within(*near) if all(name in bucket for bucket in buckets)]
+
+    def count(self, near=None, **filters):
+        """Returns the number of resources matching the filters (see query)."""
+        if near is None and len(filters) <= 1:
+            buckets = self._buckets(filters)
+            return len(buckets[0]) if buckets else len(self._resources)
+        return len(self.query(near=near, **filters))
+
+
+def _index_key(value):
+    """The value itself if it is hashable, else a hashable equivalent."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        pass
+    if isinstance(value, (list, tuple)):
+        return tuple(_index_key(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_index_key(item) for item in value)
+    if isinstance(value, Mapping):
+        return frozenset((key, _index_key(item)) for key, item in value.items())
+    # other unhashable objects are indexed by their type and repr
+    return (type(value).__name__, repr(value))
+
+
+def _discard(index, value, name):
+    bucket = index.get(value)
+    if bucket is not None:
+        bucket.pop(name, None)
+        if not bucket:
+            del index[value]
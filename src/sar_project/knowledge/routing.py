@@ -0,0 +1,367 @@
+import heapq
+import math
+import threading
+
+import numpy as np
+
+from sar_project.knowledge.change_feed import TERRAIN
+
+# travel cost multiplier by terrain label (the terrain data's 'terrain' or 'type' field)
+DEFAULT_TERRAIN_COSTS = {
+    "road": 0.5,
+    "flat": 1.0,
+    "forest": 2.0,
+    "swamp": 3.0,
+    "mountainous": 3.0,
+    "water": math.inf,
+}
+# extra multiplier for cells with obstacles
+OBSTACLE_COST = 4.0
+
+
+class TerrainRouter:
+    """
+    Travel-time routing over the positioned terrain cells of a KnowledgeBase.
+
+    The terrain is turned into a graph once: every positioned cell is a node,
+    connected to the cells within ``connect_radius``, and an edge takes its
+    length times the mean travel cost of its two cells, divided by ``speed``.
+    A cell's travel cost comes from its 'travel_cost' field, else its terrain
+    label and obstacles; cells that are not 'passable' or are water are
+    removed from the graph.
+
+    For every known hospital a shortest-path tree to it is precomputed, so
+    the ETA from any cell is a lookup and a route is a walk up the tree
+    (cached per hospital). Terrain changes arrive through the knowledge
+    base's change feed and are applied before the next query. When a cell's
+    cost changes, only the trees it affects are repaired: the cell's subtree
+    is recomputed after a cost increase, and improvements are propagated from
+    it after a decrease. Only the cached routes through changed cells are
+    dropped. New cells or moved cells rebuild the graph.
+    """
+
+    def __init__(self, knowledge_base, connect_radius=150.0, speed=15.0, terrain_costs=None, max_cached_routes=10_000):
+        """
+        Args:
+            knowledge_base (KnowledgeBase): Knowledge base with positioned terrain.
+            connect_radius (float): Cells within this distance are connected, e.g. a
+                little over the grid spacing to connect 8 neighbours.
+            speed (float): Travel speed on cost-1 terrain, in coordinate units per second.
+            terrain_costs (dict, optional): Cost multiplier by terrain label,
+                defaults to DEFAULT_TERRAIN_COSTS.
+            max_cached_routes (int): Maximum number of cached routes per hospital.
+        """
+        self.kb = knowledge_base
+        self.connect_radius = connect_radius
+        self.speed = speed
+        self.terrain_costs = DEFAULT_TERRAIN_COSTS if terrain_costs is None else terrain_costs
+        self.max_cached_routes = max_cached_routes
+        self.hospitals = {}  # hospital -> terrain location
+        self.rebuilds = 0
+        self.repairs = 0
+        self.route_hits = 0
+        self.route_misses = 0
+        self._lock = threading.RLock()
+        self._trees = {}  # hospital -> (dist, pred), or None until computed
+        self._routes = {}  # hospital -> {origin node: route tuple}
+        self._changes = knowledge_base.subscribe(topics=[TERRAIN], max_queue=100_000, batch_size=100_000)
+        self._dropped = 0
+        self._build()
+
+    def travel_cost(self, data):
+        """Cost multiplier of a terrain cell; inf for an impassable cell."""
+        if not data.get("passable", True):
+            return math.inf
+        cost = data.get("travel_cost")
+        if cost is None:
+            cost = self.terrain_costs.get(data.get("terrain", data.get("type")), 1.0)
+            if data.get("obstacles"):
+                cost *= OBSTACLE_COST
+        return float(cost)
+
+    def _build(self):
+        """(Re)build the graph from the positioned terrain; every tree is recomputed on its next use."""
+        kb = self.kb
+        index = kb.terrain_index
+        self._nodes = [location for location in kb.terrain_data if location in index]
+        self._node_of = {location: i for i, location in enumerate(self._nodes)}
+        self._positions = [index.position(location) for location in self._nodes]
+        self._cost = [self.travel_cost(kb.terrain_data[location]) for location in self._nodes]
+        self._neighbours = self._connect(np.array(self._positions, dtype=float).reshape(len(self._nodes), 2))
+        self._trees = dict.fromkeys(self.hospitals)
+        self._routes = {hospital: {} for hospital in self.hospitals}
+        self.rebuilds += 1
+
+    def _connect(self, xy):
+        """Neighbour lists of (node, distance) for every node, from one vectorized join over a grid of connect_radius cells."""
+        n = len(xy)
+        if not n:
+            return []
+        radius = self.connect_radius
+        cells = np.floor(xy / radius).astype(np.int64)
+        cells -= cells.min(axis=0) - 1  # one empty cell of margin on each side, so neighbour keys never wrap
+        height = int(cells[:, 1].max()) + 2
+        keys = cells[:, 0] * height + cells[:, 1]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        sources, targets = [], []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                # the points of the cell at offset (dx, dy) from every point's own cell
+                wanted = keys + dx * height + dy
+                lo = np.searchsorted(sorted_keys, wanted, side="left")
+                counts = np.searchsorted(sorted_keys, wanted, side="right") - lo
+                total = int(counts.sum())
+                if not total:
+                    continue
+                starts = np.repeat(lo - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+                sources.append(np.repeat(np.arange(n), counts))
+                targets.append(order[starts + np.arange(total)])
+        sources, targets = np.concatenate(sources), np.concatenate(targets)
+        distances = np.hypot(xy[sources, 0] - xy[targets, 0], xy[sources, 1] - xy[targets, 1])
+        keep = (distances <= radius) & (sources != targets)
+        sources, targets, distances = sources[keep], targets[keep], distances[keep]
+        by_source = np.argsort(sources, kind="stable")
+        bounds = np.searchsorted(sources[by_source], np.arange(n + 1)).tolist()
+        pairs = list(zip(targets[by_source].tolist(), distances[by_source].tolist()))
+        return [pairs[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+    def _weight(self, i, j, distance):
+        return distance * (self._cost[i] + self._cost[j]) / (2 * self.speed)
+
+    def add_hospital(self, name, location):
+        """
+        Registers a hospital at a positioned terrain location and precomputes routes to it.
+
+        Args:
+            name (str): Hospital name, as used as a transport destination.
+            location (str): Terrain location of the hospital.
+        """
+        with self._lock:
+            self.refresh()
+            if location not in self._node_of:
+                raise KeyError(f"Hospital location has no position: {location}")
+            self.hospitals[name] = location
+            self._routes[name] = {}
+            self._trees[name] = self._shortest_path_tree(self._node_of[location])
+
+    def _shortest_path_tree(self, root):
+        """Dijkstra from the root: travel time and next node towards the root for every node."""
+        n = len(self._nodes)
+        dist = [math.inf] * n
+        pred = [-1] * n
+        if self._cost[root] != math.inf:
+            dist[root] = 0.0
+            self._relax(dist, pred, [(0.0, root)])
+        return dist, pred
+
+    def _relax(self, dist, pred, heap, changed=None):
+        """Run Dijkstra from the queued (distance, node) entries, recording the nodes it improves."""
+        cost, neighbours = self._cost, self._neighbours
+        speed2 = 2 * self.speed
+        heapq.heapify(heap)
+        while heap:
+            d, i = heapq.heappop(heap)
+            if d > dist[i]:
+                continue
+            cost_i = cost[i]
+            for j, distance in neighbours[i]:
+                candidate = d + distance * (cost_i + cost[j]) / speed2
+                if candidate < dist[j]:
+                    dist[j] = candidate
+                    pred[j] = i
+                    if changed is not None:
+                        changed.add(j)
+                    heapq.heappush(heap, (candidate, j))
+
+    def refresh(self):
+        """Applies the terrain changes published since the last query."""
+        with self._lock:
+            changes = self._changes.poll()
+            if self._changes.dropped != self._dropped:
+                # changes were lost from the bounded queue: only a rebuild is safe
+                self._dropped = self._changes.dropped
+                self._changes.poll(max_items=self._changes.max_queue)
+                self._build()
+                return
+            if not changes:
+                return
+            latest = {change.key: change.data for change in changes}
+            index = self.kb.terrain_index
+            for location in latest:
+                node = self._node_of.get(location)
+                if node is None and location not in index:
+                    continue  # unpositioned terrain is not routable
+                if node is None or index.position(location) != self._positions[node]:
+                    self._build()
+                    return
+            for location, data in latest.items():
+                node = self._node_of.get(location)
+                if node is not None:
+                    self._update_cost(node, self.travel_cost(data))
+
+    def _update_cost(self, node, cost):
+        old = self._cost[node]
+        if cost == old:
+            return
+        self._cost[node] = cost
+        for hospital, tree in self._trees.items():
+            if tree is None:
+                continue
+            dist, pred = tree
+            changed = set()
+            if self._node_of[self.hospitals[hospital]] == node:
+                # the root itself changed: recompute the whole tree
+                self._trees[hospital] = self._shortest_path_tree(node)
+                self._routes[hospital] = {}
+                continue
+            if cost > old:
+                self._repair_increase(dist, pred, node, changed)
+            else:
+                self._repair_decrease(dist, pred, node, changed)
+            if changed:
+                self.repairs += 1
+                routes = self._routes[hospital]
+                # the origin is checked too: the cached route of an unreachable origin is empty
+                stale = [origin for origin, route in routes.items()
+                         if origin in changed or not changed.isdisjoint(route[0])]
+                for origin in stale:
+                    del routes[origin]
+
+    def _repair_increase(self, dist, pred, node, changed):
+        """Recompute the nodes whose path to the root went through node."""
+        if dist[node] == math.inf:
+            return
+        # the subtree of node: every node whose next hop chain reaches it
+        subtree = [node]
+        members = {node}
+        for i in subtree:
+            for j, _ in self._neighbours[i]:
+                if pred[j] == i and j not in members:
+                    members.add(j)
+                    subtree.append(j)
+        for i in subtree:
+            dist[i] = math.inf
+            pred[i] = -1
+        changed.update(members)
+        # reconnect the subtree from its unaffected neighbours, then let Dijkstra settle it
+        heap = []
+        cost, neighbours = self._cost, self._neighbours
+        for i in subtree:
+            if cost[i] == math.inf:
+                continue
+            for j, distance in neighbours[i]:
+                if j not in members and dist[j] != math.inf:
+                    candidate = dist[j] + self._weight(i, j, distance)
+                    if candidate < dist[i]:
+                        dist[i] = candidate
+                        pred[i] = j
+            if dist[i] != math.inf:
+                heap.append((dist[i], i))
+        self._relax(dist, pred, heap, changed)
+
+    def _repair_decrease(self, dist, pred, node, changed):
+        """Propagate the improvements made possible by a cheaper node."""
+        for j, distance in self._neighbours[node]:
+            candidate = dist[j] + self._weight(node, j, distance)
+            if candidate < dist[node]:
+                dist[node] = candidate
+                pred[node] = j
+                changed.add(node)
+        if dist[node] != math.inf:
+            # the node's own edges got cheaper too, so its neighbours may improve even if it did not
+            self._relax(dist, pred, [(dist[node], node)], changed)
+
+    def _tree(self, hospital):
+        tree = self._trees[hospital]
+        if tree is None:
+            tree = self._trees[hospital] = self._shortest_path_tree(self._node_of[self.hospitals[hospital]])
+        return tree
+
+    def _origin(self, origin):
+        """The graph node an origin (terrain location or (x, y) position) starts from, and the time to reach it."""
+        if isinstance(origin, str):
+            node = self._node_of.get(origin)
+            if node is None:
+                raise KeyError(f"Unknown or unpositioned terrain location: {origin}")
+            return node, 0.0
+        x, y = origin
+        node_of, cost = self._node_of, self._cost
+        nearest = self.kb.terrain_index.nearest(
+            x, y, 1, lambda location: location in node_of and cost[node_of[location]] != math.inf
+        )
+        if not nearest:
+            raise KeyError("No passable terrain near the origin")
+        location, distance = nearest[0]
+        return node_of[location], distance / self.speed
+
+    def eta(self, hospital, origin):
+        """
+        Travel time from an origin to a hospital.
+
+        Args:
+            hospital (str): Name of a registered hospital.
+            origin (str or tuple): Terrain location or (x, y) position; a position
+                starts from the nearest passable cell, reached in a straight line.
+
+        Returns:
+            float: Seconds, or inf if the hospital cannot be reached.
+        """
+        with self._lock:
+            self.refresh()
+            node, leg = self._origin(origin)
+            return self._tree(hospital)[0][node] + leg
+
+    def nearest_hospital(self, origin):
+        """
+        The hospital with the shortest travel time from an origin (see eta).
+
+        Returns:
+            tuple: (hospital, seconds), or (None, inf) if none can be reached.
+        """
+        with self._lock:
+            self.refresh()
+            node, leg = self._origin(origin)
+            best, best_eta = None, math.inf
+            for hospital in self.hospitals:
+                eta = self._tree(hospital)[0][node] + leg
+                if eta < best_eta:
+                    best, best_eta = hospital, eta
+            return best, best_eta
+
+    def route(self, hospital, origin):
+        """
+        Route from an origin to a hospital.
+
+        Returns:
+            dict: 'hospital', 'path' (terrain locations from the origin to the
+                hospital, empty if unreachable) and 'eta' in seconds.
+        """
+        with self._lock:
+            self.refresh()
+            node, leg = self._origin(origin)
+            routes = self._routes[hospital]
+            cached = routes.get(node)
+            if cached is not None:
+                self.route_hits += 1
+                path_nodes, eta = cached
+            else:
+                self.route_misses += 1
+                dist, pred = self._tree(hospital)
+                eta = dist[node]
+                path_nodes = []
+                if eta != math.inf:
+                    i = node
+                    while i != -1:
+                        path_nodes.append(i)
+                        i = pred[i]
+                path_nodes = tuple(path_nodes)
+                if len(routes) >= self.max_cached_routes:
+                    del routes[next(iter(routes))]
+                routes[node] = (path_nodes, eta)
+            nodes = self._nodes
+            return {"hospital": hospital, "path": [nodes[i] for i in path_nodes], "eta": eta + leg}
+
+    def close(self):
+        """Stops following terrain changes."""
+        self._changes.close()
@@ -0,0 +1,237 @@
+import numpy as np
+
+# grid cell coordinates are offset into the unsigned range before being packed into one int64 key
+_CELL_OFFSET = 2 ** 31
+
+
+class GridIndex:
+    """
+    Uniform-grid spatial index over 2D points (e.g. terrain cells in meters).
+
+    Points live in NumPy coordinate arrays. The grid is a sorted array of
+    packed (column, row) cell keys: every grid column is a contiguous key
+    range, so a bounding-box query costs one binary search per column it
+    spans instead of a scan of every point. Points inserted since the last
+    rebuild sit in a small unsorted tail that queries scan with one vectorized
+    comparison; the grid is rebuilt once the tail (or the set of removed
+    points) grows past a fraction of the indexed points, so inserts stay
+    amortized O(log n).
+    """
+
+    def __init__(self, cell_size=100.0, rebuild_fraction=0.125, min_rebuild=4096):
+        """
+        Args:
+            cell_size (float): Side length of a grid cell, in the units of the coordinates.
+            rebuild_fraction (float): The grid is rebuilt once the unindexed tail or the
+                removed points exceed this fraction of the indexed points.
+            min_rebuild (int): Tail size always tolerated before a rebuild.
+        """
+        self.cell_size = float(cell_size)
+        self.rebuild_fraction = rebuild_fraction
+        self.min_rebuild = min_rebuild
+        self._keys = []  # slot -> key
+        self._slots = {}  # key -> slot of its live point
+        self._xy = np.empty((0, 2))
+        self._alive = np.empty(0, dtype=bool)
+        self._size = 0  # slots in use
+        self._indexed = 0  # slots [0, _indexed) are in the sorted grid
+        self._dead = 0
+        self._cell_keys = np.empty(0, dtype=np.int64)
+        self._order = np.empty(0, dtype=np.int64)
+        self._bounds = None  # (min_x, min_y, max_x, max_y) of every point inserted
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed > len(self._alive):
+            capacity = max(needed, 2 * len(self._alive), 1024)
+            xy = np.empty((capacity, 2))
+            xy[:self._size] = self._xy[:self._size]
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:self._size] = self._alive[:self._size]
+            self._xy, self._alive = xy, alive
+
+    def _cell_key(self, x, y):
+        cols = np.floor(np.asarray(x) / self.cell_size).astype(np.int64) + _CELL_OFFSET
+        rows = np.floor(np.asarray(y) / self.cell_size).astype(np.int64) + _CELL_OFFSET
+        return (cols << 32) | rows
+
+    def insert(self, key, x, y):
+        """Add a point, or move it if the key is already indexed."""
+        self.insert_many([key], [(x, y)])
+
+    def insert_many(self, keys, coordinates):
+        """
+        Add or move many points at once.
+
+        Args:
+            keys (list): Point keys.
+            coordinates (array-like): (x, y) of every key, shape (len(keys), 2).
+        """
+        keys = list(keys)
+        coordinates = np.asarray(coordinates, dtype=float).reshape(len(keys), 2)
+        if not keys:
+            return
+        low, high = coordinates.min(axis=0).tolist(), coordinates.max(axis=0).tolist()
+        if self._bounds is not None:
+            low = [min(a, b) for a, b in zip(low, self._bounds[:2])]
+            high = [max(a, b) for a, b in zip(high, self._bounds[2:])]
+        self._bounds = (*low, *high)
+        for key in keys:
+            slot = self._slots.get(key)
+            if slot is not None:
+                self._kill(slot)
+        self._reserve(len(keys))
+        start = self._size
+        self._xy[start:start + len(keys)] = coordinates
+        self._alive[start:start + len(keys)] = True
+        self._slots.update(zip(keys, range(start, start + len(keys))))
+        self._keys.extend(keys)
+        self._size += len(keys)
+        if len(self._slots) < self._size - self._dead:
+            # the same key appeared twice in the batch: only its last slot stays alive
+            for slot in range(start, self._size):
+                if self._slots[self._keys[slot]] != slot and self._alive[slot]:
+                    self._kill(slot)
+        self._maybe_rebuild()
+
+    def remove(self, key):
+        """Remove a point; returns False if the key was not indexed."""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        self._kill(slot)
+        self._maybe_rebuild()
+        return True
+
+    def _kill(self, slot):
+        self._alive[slot] = False
+        self._dead += 1
+
+    def position(self, key):
+        """Return the (x, y) of a key, or None."""
+        slot = self._slots.get(key)
+        return None if slot is None else tuple(self._xy[slot].tolist())
+
+    def _maybe_rebuild(self):
+        limit = max(self.min_rebuild, self.rebuild_fraction * self._indexed)
+        if self._size - self._indexed > limit or self._dead > limit:
+            self.rebuild()
+
+    def rebuild(self):
+        """Compact removed points away and sort every point into the grid."""
+        live = np.flatnonzero(self._alive[:self._size])
+        if len(live) < self._size:
+            self._xy[:len(live)] = self._xy[live]
+            self._keys = [self._keys[slot] for slot in live.tolist()]
+            self._slots = dict(zip(self._keys, range(len(live))))
+            self._alive[:len(live)] = True
+            self._alive[len(live):self._size] = False
+            self._size = len(live)
+            self._dead = 0
+        cell_keys = self._cell_key(self._xy[:self._size, 0], self._xy[:self._size, 1])
+        self._order = np.argsort(cell_keys, kind="stable")
+        self._cell_keys = cell_keys[self._order]
+        self._indexed = self._size
+
+    def _box_slots(self, min_x, min_y, max_x, max_y):
+        """Slots of the live points inside the box (inclusive)."""
+        parts = []
+        if self._indexed:
+            # clamp the box to the bounds of the points, so huge or infinite boxes span few cells
+            low_x, low_y, high_x, high_y = self._bounds
+            first_col, first_row = (int(np.floor(v / self.cell_size)) + _CELL_OFFSET
+                                    for v in (max(min_x, low_x), max(min_y, low_y)))
+            last_col, last_row = (int(np.floor(v / self.cell_size)) + _CELL_OFFSET
+                                  for v in (min(max_x, high_x), min(max_y, high_y)))
+            column_count = last_col - first_col + 1
+            if column_count > self._indexed:
+                # a box wider than the number of points: scanning them all is cheaper
+                parts.append(np.arange(self._indexed))
+            elif column_count > 0 and last_row >= first_row:
+                columns = np.arange(first_col, last_col + 1, dtype=np.int64)
+                lo = np.searchsorted(self._cell_keys, (columns << 32) | first_row, side="left")
+                hi = np.searchsorted(self._cell_keys, (columns << 32) | last_row, side="right")
+                lengths = hi - lo
+                total = int(lengths.sum())
+                if total:
+                    # expand the per-column [lo, hi) ranges into one array of sorted positions
+                    starts = np.repeat(lo - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+                    parts.append(self._order[starts + np.arange(total)])
+        if self._size > self._indexed:
+            parts.append(np.arange(self._indexed, self._size))
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        slots = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        xy = self._xy[slots]
+        inside = (
+            self._alive[slots]
+            & (xy[:, 0] >= min_x) & (xy[:, 0] <= max_x)
+            & (xy[:, 1] >= min_y) & (xy[:, 1] <= max_y)
+        )
+        return slots[inside]
+
+    def in_box(self, min_x, min_y, max_x, max_y):
+        """Return the keys of every point inside the box (inclusive)."""
+        keys = self._keys
+        return [keys[slot] for slot in self._box_slots(min_x, min_y, max_x, max_y).tolist()]
+
+    def _within_slots(self, x, y, radius):
+        slots = self._box_slots(x - radius, y - radius, x + radius, y + radius)
+        distances = np.hypot(self._xy[slots, 0] - x, self._xy[slots, 1] - y)
+        inside = distances <= radius
+        slots, distances = slots[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return slots[order], distances[order]
+
+    def within(self, x, y, radius):
+        """
+        Return the points within radius of (x, y), nearest first.
+
+        Returns:
+            list: (key, distance) pairs.
+        """
+        slots, distances = self._within_slots(x, y, radius)
+        keys = self._keys
+        return [(keys[slot], distance) for slot, distance in zip(slots.tolist(), distances.tolist())]
+
+    def nearest(self, x, y, k=1, where=None):
+        """
+        Return the k points nearest to (x, y).
+
+        The search radius starts at one grid cell and doubles until k matching
+        points are known to be the nearest ones, so only the neighbourhood of
+        (x, y) is examined.
+
+        Args:
+            x (float): Query x coordinate.
+            y (float): Query y coordinate.
+            k (int): Number of points to return.
+            where (callable, optional): Only keys for which where(key) is true are returned.
+
+        Returns:
+            list: Up to k (key, distance) pairs, nearest first.
+        """
+        if not self._slots or k <= 0:
+            return []
+        # no point is farther away than the farthest corner of the bounds of every point ever inserted
+        min_x, min_y, max_x, max_y = self._bounds
+        farthest = float(np.hypot(max(abs(min_x - x), abs(max_x - x)), max(abs(min_y - y), abs(max_y - y))))
+        radius = self.cell_size
+        keys = self._keys
+        while True:
+            slots, distances = self._within_slots(x, y, radius)
+            matches = []
+            for slot, distance in zip(slots.tolist(), distances.tolist()):
+                if where is None or where(keys[slot]):
+                    matches.append((keys[slot], distance))
+                    if len(matches) == k:
+                        return matches
+            if radius >= farthest:
+                return matches
+            radius *= 2
@@ -0,0 +1,220 @@
+import numpy as np
+
+DEFAULT_WEATHER_FIELDS = ("temperature", "wind_speed", "precipitation", "visibility")
+
+
+class WeatherRingBuffer:
+    """
+    Fixed-capacity, NumPy-backed history of timestamped weather samples.
+
+    Timestamps (float seconds) and one float column per weather field live
+    in preallocated arrays used as a ring: once ``capacity`` samples are
+    stored, each new sample overwrites the oldest one. In chronological order
+    the ring is at most two contiguous runs, so time-range and latest-N
+    queries are binary searches returning views into the arrays, and
+    aggregates are computed per run with ``reduceat`` instead of materializing
+    the series. Storage starts small and doubles up to ``capacity``.
+
+    Late samples (older than the latest stored one, e.g. a delayed or replayed
+    sensor reading) are inserted in time order at O(n) cost; when the ring is
+    full, a late sample older than every stored one is dropped and counted in
+    ``dropped``.
+    """
+
+    def __init__(self, capacity=1024, fields=DEFAULT_WEATHER_FIELDS):
+        """
+        Args:
+            capacity (int): Maximum number of samples kept.
+            fields (tuple): Names of the numeric weather fields stored.
+        """
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._columns = {field: i for i, field in enumerate(self.fields)}
+        allocated = min(capacity, 16)
+        self._timestamps = np.empty(allocated)
+        self._values = np.empty((allocated, len(self.fields)))
+        self._start = 0  # position of the oldest sample
+        self._size = 0
+        self._last_timestamp = None
+        self.late = 0  # late samples inserted in time order
+        self.dropped = 0  # late samples older than every stored sample of a full ring
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        """Bytes held by the sample arrays."""
+        return self._timestamps.nbytes + self._values.nbytes
+
+    def append(self, timestamp, conditions):
+        """
+        Store one sample; fields missing from conditions (or not numeric) are stored as NaN.
+
+        Args:
+            timestamp (float): Sample time in seconds.
+            conditions (dict): Weather conditions by field name.
+
+        Returns:
+            bool: True if the sample is the latest one, False for a late sample.
+        """
+        timestamp = float(timestamp)
+        row = [_as_float(conditions.get(field)) for field in self.fields]
+        if self._last_timestamp is not None and timestamp < self._last_timestamp:
+            self._insert_late(timestamp, row)
+            return False
+        self._last_timestamp = timestamp
+        if self._size == len(self._timestamps) < self.capacity:
+            # not wrapped yet, so the samples are contiguous from position 0
+            allocated = min(self.capacity, 2 * self._size)
+            timestamps, values = np.empty(allocated), np.empty((allocated, len(self.fields)))
+            timestamps[:self._size] = self._timestamps
+            values[:self._size] = self._values
+            self._timestamps, self._values = timestamps, values
+        if self._size < self.capacity:
+            position = self._start + self._size
+            self._size += 1
+        else:
+            position = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._timestamps[position] = timestamp
+        self._values[position] = row
+        return True
+
+    def _insert_late(self, timestamp, row):
+        timestamps, values = (np.concatenate(parts) for parts in zip(*self._runs()))
+        index = int(np.searchsorted(timestamps, timestamp, side="right"))
+        if self._size == self.capacity:
+            if index == 0:
+                self.dropped += 1
+                return
+            # the oldest sample makes room for the late one
+            timestamps, values, index = timestamps[1:], values[1:], index - 1
+        timestamps = np.insert(timestamps, index, timestamp)
+        values = np.insert(values, index, row, axis=0)
+        size = len(timestamps)
+        if size > len(self._timestamps):
+            allocated = min(self.capacity, 2 * len(self._timestamps))
+            self._timestamps, self._values = np.empty(allocated), np.empty((allocated, len(self.fields)))
+        self._timestamps[:size] = timestamps
+        self._values[:size] = values
+        self._start, self._size = 0, size
+        self.late += 1
+
+    def _runs(self):
+        """The stored samples as at most two (timestamps, values) views, oldest first."""
+        end = self._start + self._size
+        if end <= len(self._timestamps):
+            return [(self._timestamps[self._start:end], self._values[self._start:end])]
+        wrapped = end - len(self._timestamps)
+        return [
+            (self._timestamps[self._start:], self._values[self._start:]),
+            (self._timestamps[:wrapped], self._values[:wrapped]),
+        ]
+
+    def _select(self, start=None, end=None):
+        """Views of the samples with start <= timestamp <= end, per run."""
+        selected = []
+        for timestamps, values in self._runs():
+            lo = 0 if start is None else np.searchsorted(timestamps, start, side="left")
+            hi = len(timestamps) if end is None else np.searchsorted(timestamps, end, side="right")
+            if hi > lo:
+                selected.append((timestamps[lo:hi], values[lo:hi]))
+        return selected
+
+    def _as_columns(self, selected):
+        if not selected:
+            timestamps, values = np.empty(0), np.empty((0, len(self.fields)))
+        elif len(selected) == 1:
+            timestamps, values = selected[0]
+        else:
+            # the range wraps around the end of the ring: only the selected samples are copied
+            timestamps = np.concatenate([run[0] for run in selected])
+            values = np.concatenate([run[1] for run in selected])
+        columns = {"timestamp": timestamps}
+        for field, i in self._columns.items():
+            columns[field] = values[:, i]
+        return columns
+
+    def range(self, start=None, end=None):
+        """
+        Samples with start <= timestamp <= end (either bound may be omitted).
+
+        Returns:
+            dict: 'timestamp' and one array per field, views into the ring when the range does not wrap.
+        """
+        return self._as_columns(self._select(start, end))
+
+    def latest(self, n):
+        """The n most recent samples, oldest first, in the same format as range()."""
+        n = min(n, self._size)
+        if n <= 0:
+            return self._as_columns([])
+        skip = self._size - n
+        selected = []
+        for timestamps, values in self._runs():
+            if skip >= len(timestamps):
+                skip -= len(timestamps)
+                continue
+            selected.append((timestamps[skip:], values[skip:]))
+            skip = 0
+        return self._as_columns(selected)
+
+    def aggregate(self, interval, start=None, end=None, origin=0.0):
+        """
+        Downsample to min/max/mean per field over fixed time intervals.
+
+        Intervals are aligned to origin (e.g. 0 aligns hourly intervals to the
+        hour) and only intervals containing samples are returned. NaN values
+        are ignored.
+
+        Args:
+            interval (float): Interval length in seconds.
+            start (float, optional): Earliest sample time included.
+            end (float, optional): Latest sample time included.
+            origin (float): Time the interval boundaries are aligned to.
+
+        Returns:
+            dict: 'interval_start' and 'count' arrays, and for every field a dict
+                of 'min', 'max' and 'mean' arrays, one entry per interval.
+        """
+        bins, counts, mins, maxs, sums, valid = [], [], [], [], [], []
+        for timestamps, values in self._select(start, end):
+            bin_ids = np.floor((timestamps - origin) / interval)
+            starts = np.flatnonzero(np.concatenate(([True], bin_ids[1:] != bin_ids[:-1])))
+            present = ~np.isnan(values)
+            bins.append(bin_ids[starts])
+            counts.append(np.diff(np.append(starts, len(timestamps))))
+            mins.append(np.fmin.reduceat(values, starts, axis=0))
+            maxs.append(np.fmax.reduceat(values, starts, axis=0))
+            sums.append(np.add.reduceat(np.where(present, values, 0.0), starts, axis=0))
+            valid.append(np.add.reduceat(present, starts, axis=0, dtype=np.int64))
+        if len(bins) == 2 and bins[0][-1] == bins[1][0]:
+            # the interval straddling the wrap point was reduced in both runs: merge it
+            counts[0][-1] += counts[1][0]
+            mins[0][-1] = np.fmin(mins[0][-1], mins[1][0])
+            maxs[0][-1] = np.fmax(maxs[0][-1], maxs[1][0])
+            sums[0][-1] += sums[1][0]
+            valid[0][-1] += valid[1][0]
+            bins[1], counts[1], mins[1], maxs[1], sums[1], valid[1] = (
+                part[1:] for part in (bins[1], counts[1], mins[1], maxs[1], sums[1], valid[1])
+            )
+
+        width = len(self.fields)
+        bins = np.concatenate(bins) if bins else np.empty(0)
+        counts = np.concatenate(counts) if counts else np.empty(0, dtype=np.int64)
+        mins, maxs, sums, valid = (
+            np.concatenate(part) if part else np.empty((0, width)) for part in (mins, maxs, sums, valid)
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(valid > 0, sums / valid, np.nan)
+        result = {"interval_start": origin + bins * interval, "count": counts}
+        for field, i in self._columns.items():
+            result[field] = {"min": mins[:, i], "max": maxs[:, i], "mean": means[:, i]}
+        return result
+
+
+def _as_float(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return np.nan
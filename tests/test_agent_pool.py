@@ -0,0 +1,57 @@
+import pytest
+from sar_project.agents.agent_pool import AgentPool
+from sar_project.agents.medical_agent import MedicalTeamLeader
+from sar_project.agents.weather_agent import WeatherAgent
+
+
+class TestAgentPool:
+    @pytest.fixture
+    def pool(self):
+        pool = AgentPool(MedicalTeamLeader, prewarm=3)
+        yield pool
+        pool.close()
+
+    def test_prewarms_agents(self, pool):
+        assert len(pool) == 3
+        assert pool.created == 3
+
+    def test_recycled_agent_is_reset(self, pool):
+        agent = pool.acquire()
+        agent.add_patient({"id": "patient1", "severity": "high"})
+        agent.manage_supplies("bandages", -5)
+        agent.update_status("deployed")
+        pool.release(agent)
+
+        assert pool.acquire() is agent
+        assert agent.patient_records == {}
+        assert agent.list_patients()["count"] == 0
+        assert agent.check_inventory("bandages") == 100
+        assert agent.get_status() == "unknown"
+
+    def test_acquire_creates_agents_when_empty(self, pool):
+        agents = [pool.acquire() for _ in range(5)]
+        assert len(set(map(id, agents))) == 5
+        assert pool.created == 5
+        for agent in agents:
+            pool.release(agent)
+        assert len(pool) == 5
+
+    def test_max_idle(self):
+        pool = AgentPool(WeatherAgent, max_idle=1)
+        with pool.lease() as first, pool.lease() as second:
+            assert first is not second
+        assert len(pool) == 1
+
+    def test_agents_share_llm_config(self, pool):
+        first, second = pool.acquire(), pool.acquire()
+        assert first.llm_config is second.llm_config
+        with pytest.raises(TypeError):
+            first.llm_config["temperature"] = 0.1
+
+    def test_journaled_agent_cannot_be_reset(self, tmp_path):
+        agent = MedicalTeamLeader(journal_dir=str(tmp_path))
+        try:
+            with pytest.raises(ValueError):
+                agent.reset()
+        finally:
+            agent.close()
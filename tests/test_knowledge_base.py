@@ -0,0 +1,352 @@
+import math
+from datetime import datetime
+import random
+import pytest
+from sar_project.knowledge.knowledge_base import KnowledgeBase
+from sar_project.knowledge.routing import TerrainRouter
+
+
+class TestTerrainSpatialQueries:
+    @pytest.fixture
+    def kb(self):
+        kb = KnowledgeBase(terrain_cell_size=50)
+        rng = random.Random(7)
+        kb.update_terrain_many(
+            (f"cell{i}", {"elevation": i, "obstacles": i % 10 == 0}, (rng.uniform(0, 5000), rng.uniform(0, 5000)))
+            for i in range(3000)
+        )
+        return kb
+
+    def brute_force(self, kb, x, y):
+        return {
+            location: math.hypot(px - x, py - y)
+            for location in kb.terrain_data
+            for px, py in [kb.terrain_index.position(location)]
+        }
+
+    def test_box_query(self, kb):
+        expected = {
+            location for location in kb.terrain_data
+            if 1000 <= kb.terrain_index.position(location)[0] <= 2000
+            and 500 <= kb.terrain_index.position(location)[1] <= 800
+        }
+        result = kb.query_terrain_in_box(1000, 500, 2000, 800)
+        assert set(result) == expected
+        assert all(result[location] is kb.terrain_data[location] for location in result)
+
+    def test_huge_and_infinite_boxes(self, kb):
+        kb.terrain_index.rebuild()
+        assert set(kb.query_terrain_in_box(-1e12, -1e12, 1e12, 1e12)) == set(kb.terrain_data)
+        assert set(kb.query_terrain_in_box(-math.inf, -math.inf, math.inf, math.inf)) == set(kb.terrain_data)
+        expected = {location for location in kb.terrain_data if kb.terrain_index.position(location)[0] >= 2500}
+        assert set(kb.query_terrain_in_box(2500, -math.inf, 1e12, math.inf)) == expected
+        assert kb.query_terrain_in_box(1e11, 1e11, 1e12, 1e12) == {}
+
+    def test_radius_query(self, kb):
+        distances = self.brute_force(kb, 2500, 2500)
+        result = kb.query_terrain_within(2500, 2500, 400)
+        assert [location for location, _ in result] == sorted(
+            (location for location, d in distances.items() if d <= 400), key=distances.get
+        )
+
+    def test_nearest_with_filter(self, kb):
+        distances = self.brute_force(kb, 100, 4900)
+        obstacles = sorted((d, location) for location, d in distances.items() if kb.terrain_data[location]["obstacles"])
+        result = kb.query_nearest_terrain(100, 4900, k=3, where=lambda data: data["obstacles"])
+        assert [location for location, _ in result] == [location for _, location in obstacles[:3]]
+
+    def test_moved_and_unpositioned_locations(self, kb):
+        kb.update_terrain("cell1", {"elevation": 5}, position=(-10000, -10000))
+        kb.update_terrain("base camp", {"elevation": 300})
+        assert kb.query_nearest_terrain(-9000, -9000) == [("cell1", pytest.approx(math.hypot(1000, 1000)))]
+        assert "cell1" not in kb.query_terrain_in_box(0, 0, 5000, 5000)
+        assert kb.query_terrain("base camp") == {"elevation": 300}
+        assert len(kb.terrain_index) == 3000
+
+
+class TestWeatherHistory:
+    @pytest.fixture
+    def kb(self):
+        kb = KnowledgeBase(weather_history_capacity=100)
+        for t in range(250):
+            kb.update_weather("Sector 4", {"temperature": t, "wind_speed": t % 7, "visibility": "poor"}, timestamp=t)
+        return kb
+
+    def test_keeps_latest_samples_only(self, kb):
+        assert kb.query_weather("Sector 4")["temperature"] == 249
+        history = kb.query_weather_history("Sector 4")
+        assert history["timestamp"].tolist() == list(range(150, 250))
+        assert history["temperature"].tolist() == list(range(150, 250))
+
+    def test_range_and_latest(self, kb):
+        history = kb.query_weather_history("Sector 4", start=195, end=205)
+        assert history["timestamp"].tolist() == list(range(195, 206))
+        assert kb.query_latest_weather("Sector 4", 3)["wind_speed"].tolist() == [247 % 7, 248 % 7, 249 % 7]
+        assert kb.query_weather_history("Sector 4", end=100)["timestamp"].size == 0
+        assert kb.query_weather_history("unknown") == {}
+
+    def test_aggregates(self, kb):
+        aggregates = kb.query_weather_aggregates("Sector 4", interval=30, start=160)
+        assert aggregates["interval_start"].tolist() == [150, 180, 210, 240]
+        assert aggregates["count"].tolist() == [20, 30, 30, 10]
+        assert aggregates["temperature"]["min"].tolist() == [160, 180, 210, 240]
+        assert aggregates["temperature"]["max"].tolist() == [179, 209, 239, 249]
+        assert aggregates["temperature"]["mean"].tolist() == [169.5, 194.5, 224.5, 244.5]
+        # non-numeric and missing fields are recorded as NaN and have no mean
+        assert all(value != value for value in aggregates["visibility"]["mean"].tolist())
+
+    def test_late_samples_are_inserted_in_order(self, kb):
+        kb.update_weather("Sector 4", {"temperature": -1}, timestamp=200.5)
+        history = kb.query_weather_history("Sector 4")
+        assert history["timestamp"].tolist() == list(range(151, 201)) + [200.5] + list(range(201, 250))
+        assert history["temperature"][50] == -1
+        assert kb.query_weather("Sector 4")["temperature"] == 249
+
+        # older than every sample of the full ring: dropped and counted
+        kb.update_weather("Sector 4", {"temperature": -2}, timestamp=10)
+        ring = kb.weather_history["Sector 4"]
+        assert (ring.late, ring.dropped, len(ring)) == (1, 1, 100)
+        assert kb.query_latest_weather("Sector 4", 1)["timestamp"].tolist() == [249]
+
+        kb.update_weather("Sector 5", {"temperature": 5}, timestamp=5)
+        kb.update_weather("Sector 5", {"temperature": 3}, timestamp=3)
+        kb.update_weather("Sector 5", {"temperature": 4}, timestamp=4)
+        assert kb.query_weather_history("Sector 5")["temperature"].tolist() == [3, 4, 5]
+        assert kb.query_weather("Sector 5") == {"temperature": 5}
+
+
+class TestMissionLog:
+    @pytest.fixture
+    def kb(self, tmp_path):
+        kb = KnowledgeBase(mission_log_dir=str(tmp_path), mission_segment_size=100)
+        for t in range(1050):
+            kb.log_mission_event({"timestamp": t, "type": ("search", "rescue", "supply")[t % 3], "team": t % 4})
+        yield kb
+        kb.mission_log.close()
+
+    def test_sealed_segments_are_spilled(self, kb, tmp_path):
+        assert len(kb.mission_log) == 1050
+        assert len(list(tmp_path.glob("segment-*.events"))) == 10
+        assert [event["timestamp"] for event in kb.get_mission_history()] == list(range(1050))
+
+    def test_streams_by_time_and_type(self, kb):
+        events = list(kb.iter_mission_events(start=95, end=1010, event_types="rescue"))
+        assert [event["timestamp"] for event in events] == [t for t in range(95, 1011) if t % 3 == 1]
+        assert kb.count_mission_events(start=95, end=1010, event_types=["rescue", "supply"]) == \
+            sum(1 for t in range(95, 1011) if t % 3)
+        assert list(kb.iter_mission_events(event_types="unknown")) == []
+
+    def test_reopens_sealed_segments(self, kb, tmp_path):
+        kb.mission_log.close()
+        reopened = KnowledgeBase(mission_log_dir=str(tmp_path), mission_segment_size=100)
+        assert len(reopened.mission_log) == 1000
+        assert reopened.count_mission_events(event_types="search") == 334
+        reopened.mission_log.close()
+
+    def test_iso_timestamps_and_action_types(self, tmp_path):
+        kb = KnowledgeBase(mission_log_dir=str(tmp_path), mission_segment_size=2)
+        kb.log_mission_event({"timestamp": "2024-05-01T10:00:00", "action": "deploy"})
+        kb.log_mission_event({"timestamp": "2024-05-01T12:00:00", "action": "recall"})
+        kb.log_mission_event({"timestamp": "2024-05-01T14:00:00", "action": "deploy"})
+        start = datetime(2024, 5, 1, 11).timestamp()
+        assert [e["timestamp"] for e in kb.iter_mission_events(start=start, event_types="deploy")] == \
+            ["2024-05-01T14:00:00"]
+        kb.mission_log.close()
+
+
+    def test_temporary_segment_directory_is_removed(self):
+        import gc
+        import os
+        kb = KnowledgeBase(mission_segment_size=10)
+        for t in range(25):
+            kb.log_mission_event({"timestamp": t, "type": "search"})
+        directory = kb.mission_log.directory
+        assert len(os.listdir(directory)) == 5  # two sealed segments and the type table
+        kb.close()
+        assert not os.path.exists(directory)
+
+        kb = KnowledgeBase(mission_segment_size=10)
+        for t in range(10):
+            kb.log_mission_event({"timestamp": t, "type": "search"})
+        directory = kb.mission_log.directory
+        del kb
+        gc.collect()
+        assert not os.path.exists(directory)
+
+    def test_datetimes_survive_sealing(self, tmp_path):
+        kb = KnowledgeBase(mission_log_dir=str(tmp_path), mission_segment_size=1)
+        when = datetime(2024, 5, 1, 10, 30)
+        kb.log_mission_event({"timestamp": when, "action": "deploy", "zone": (1, 2)})
+        assert kb.get_mission_history() == [{"timestamp": when, "action": "deploy", "zone": [1, 2]}]
+        kb.close()
+
+
+class TestResourceRegistry:
+    @pytest.fixture
+    def kb(self):
+        kb = KnowledgeBase()
+        for i in range(300):
+            kb.update_resource_status(f"asset{i}", {
+                "type": ("drone", "vehicle", "helicopter")[i % 3],
+                "availability": "available" if i % 2 else "deployed",
+                "location": f"sector {i % 10}",
+                "position": (i * 10.0, 0.0),
+            })
+        return kb
+
+    def test_filtered_queries_and_counts(self, kb):
+        result = kb.query_resources(type="drone", availability="available", location="sector 4")
+        expected = {f"asset{i}" for i in range(300) if i % 3 == 0 and i % 2 and i % 10 == 4}
+        assert set(result) == expected
+        assert kb.count_resources(type="drone") == 100
+        assert kb.count_resources(type=["drone", "helicopter"], availability="available") == \
+            sum(1 for i in range(300) if i % 3 != 1 and i % 2)
+        assert kb.count_resources(type="submarine") == 0
+
+    def test_near_query(self, kb):
+        result = list(kb.query_resources(type="drone", near=(1000, 0, 100)))
+        assert result == [f"asset{i}" for i in (99, 102, 96, 105, 93, 108, 90)]
+        assert kb.count_resources(near=(1000, 0, 100)) == 21
+
+    def test_status_updates_move_index_entries(self, kb):
+        kb.update_resource_status("asset1", {"type": "drone", "availability": "maintenance"})
+        assert "asset1" in kb.query_resources(availability="maintenance")
+        assert "asset1" not in kb.query_resources(availability="available")
+        assert "asset1" not in kb.query_resources(near=(10, 0, 1))
+        assert kb.query_resource_status("asset1") == {"type": "drone", "availability": "maintenance"}
+        assert kb.count_resources() == 300
+
+    def test_unhashable_field_values(self, kb):
+        kb.update_resource_status("asset1", {"type": "drone", "location": [120, 45]})
+        kb.update_resource_status("asset2", {"type": "drone", "location": {"grid": [1, 2]}})
+        assert list(kb.query_resources(location=[(120, 45)])) == ["asset1"]
+        assert list(kb.query_resources(location={"grid": [1, 2]})) == ["asset2"]
+        assert kb.query_resource_status("asset1")["location"] == [120, 45]
+        kb.update_resource_status("asset1", {"type": "drone", "location": "sector 1"})
+        assert list(kb.query_resources(location=[(120, 45)])) == []
+        assert kb.count_resources(location="sector 1") == 30
+
+    def test_status_changed_in_place_is_reindexed(self, kb):
+        status = kb.query_resource_status("asset1")
+        status["availability"] = "busy"
+        del status["position"]
+        kb.update_resource_status("asset1", status)
+        assert "asset1" not in kb.query_resources(availability="available")
+        assert list(kb.query_resources(availability="busy")) == ["asset1"]
+        assert kb.count_resources(availability="busy") == 1
+        assert "asset1" not in kb.query_resources(near=(10.0, 0.0, 1.0))
+        kb.resource_status.remove("asset1")
+        assert kb.count_resources(availability="busy") == 0
+
+
+class TestChangeFeed:
+    def test_routes_changes_by_topic_and_location(self):
+        kb = KnowledgeBase()
+        weather = kb.subscribe(topics=["weather"], locations=["north ridge"])
+        everything = kb.subscribe()
+        kb.update_weather("north ridge", {"wind_speed": 40})
+        kb.update_weather("valley", {"wind_speed": 5})
+        kb.update_terrain("north ridge", {"terrain": "mountainous"})
+        kb.update_resource_status("drone1", {"availability": "available", "location": "valley"})
+        kb.log_mission_event({"type": "search", "location": "valley"})
+
+        changes = weather.poll()
+        assert [(c.topic, c.location, c.data) for c in changes] == [("weather", "north ridge", {"wind_speed": 40})]
+        assert [(c.topic, c.key) for c in everything.poll()] == [
+            ("weather", "north ridge"), ("weather", "valley"), ("terrain", "north ridge"),
+            ("resource", "drone1"), ("mission_event", "search"),
+        ]
+        assert weather.poll() == []
+
+        weather.close()
+        kb.update_weather("north ridge", {"wind_speed": 10})
+        assert len(weather) == 0
+        with pytest.raises(ValueError):
+            kb.subscribe(topics=["tides"])
+
+    def test_bounded_queue_drops_oldest_and_batches(self):
+        kb = KnowledgeBase()
+        subscription = kb.subscribe(topics=["terrain"], max_queue=5, batch_size=2)
+        kb.update_terrain_many((f"cell{i}", {"elevation": i}, (i, 0)) for i in range(8))
+        assert subscription.dropped == 3
+        assert [c.key for c in subscription.get(timeout=0)] == ["cell3", "cell4"]
+        assert [c.key for c in subscription.poll(max_items=10)] == ["cell5", "cell6", "cell7"]
+
+    def test_callbacks_receive_batches(self):
+        kb = KnowledgeBase()
+        batches = []
+        kb.subscribe(topics=["resource"], callback=batches.append)
+        for i in range(50):
+            kb.update_resource_status(f"asset{i}", {"availability": "available"})
+        assert kb.change_feed.flush()
+        assert [c.key for batch in batches for c in batch] == [f"asset{i}" for i in range(50)]
+        kb.change_feed.close()
+
+
+class TestTerrainRouter:
+    @pytest.fixture
+    def kb(self):
+        kb = KnowledgeBase(terrain_cell_size=100)
+        rng = random.Random(11)
+        kb.update_terrain_many(
+            (f"cell {x} {y}", {"terrain": rng.choice(["flat", "road", "forest"])}, (x * 100.0, y * 100.0))
+            for x in range(20) for y in range(20)
+        )
+        return kb
+
+    def fresh_etas(self, kb, origins):
+        router = TerrainRouter(kb)
+        router.add_hospital("north", "cell 0 19")
+        router.add_hospital("south", "cell 19 0")
+        etas = {(h, o): router.eta(h, o) for h in ("north", "south") for o in origins}
+        router.close()
+        return etas
+
+    def test_routes_follow_cheapest_terrain(self):
+        kb = KnowledgeBase(terrain_cell_size=100)
+        kb.update_terrain_many(
+            (f"cell {x} {y}", {"terrain": "road" if y == 1 else "forest"}, (x * 100.0, y * 100.0))
+            for x in range(5) for y in range(3)
+        )
+        router = TerrainRouter(kb, connect_radius=100, speed=10)
+        router.add_hospital("field hospital", "cell 4 0")
+        route = router.route("field hospital", "cell 0 0")
+        assert route["path"] == ["cell 0 0", "cell 0 1", "cell 1 1", "cell 2 1", "cell 3 1", "cell 4 1", "cell 4 0"]
+        assert route["eta"] == pytest.approx(2 * 12.5 + 4 * 5)
+        assert router.eta("field hospital", (-30.0, 0.0)) == pytest.approx(3 + 45)
+        assert router.nearest_hospital("cell 2 2") == ("field hospital", pytest.approx(router.eta("field hospital", "cell 2 2")))
+
+    def test_terrain_updates_repair_trees_and_routes(self, kb):
+        router = TerrainRouter(kb)
+        router.add_hospital("north", "cell 0 19")
+        router.add_hospital("south", "cell 19 0")
+        origins = [f"cell {x} {y}" for x in range(0, 20, 3) for y in range(0, 20, 4)]
+        for origin in origins:
+            router.route("north", origin)
+
+        rng = random.Random(5)
+        for _ in range(30):
+            kb.update_terrain(f"cell {rng.randrange(20)} {rng.randrange(20)}",
+                              {"terrain": rng.choice(["flat", "road", "forest", "water"])})
+        expected = self.fresh_etas(kb, origins)
+        for (hospital, origin), eta in expected.items():
+            assert router.eta(hospital, origin) == pytest.approx(eta)
+            assert router.route(hospital, origin)["eta"] == pytest.approx(eta)
+        assert router.rebuilds == 1 and router.repairs > 0
+
+        kb.update_terrain("new cell", {"terrain": "road"}, position=(2000.0, 2000.0))
+        assert router.eta("north", "new cell") > 0
+        assert router.rebuilds == 2
+        router.close()
+
+    def test_impassable_terrain(self, kb):
+        router = TerrainRouter(kb)
+        router.add_hospital("north", "cell 0 19")
+        for y in range(20):
+            kb.update_terrain(f"cell 10 {y}", {"terrain": "water"})
+        assert router.eta("north", "cell 15 5") == math.inf
+        assert router.route("north", "cell 15 5")["path"] == []
+        kb.update_terrain("cell 10 7", {"terrain": "flat", "obstacles": True})
+        assert router.eta("north", "cell 15 5") < math.inf
+        assert "cell 10 7" in router.route("north", "cell 15 5")["path"]
+        router.close()
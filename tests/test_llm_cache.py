@@ -0,0 +1,115 @@
+import os
+import pytest
+from sar_project.agents.base_agent import SARBaseAgent
+from sar_project.agents.llm_cache import LLMResponseCache, response_key
+from sar_project.agents.llm_stub_server import StubLLMServer, stub_reply
+
+
+@pytest.fixture
+def server():
+    with StubLLMServer() as server:
+        yield server
+
+
+def stub_agent(server, name="stub_agent", model="gpt-4"):
+    class StubAgent(SARBaseAgent):
+        def get_config_list(self):
+            return [{"model": model, "api_key": "test", "api_base": server.api_base}]
+    return StubAgent(name=name, role="Tester", system_message="You answer tersely.")
+
+
+def ask(agent, content):
+    return agent.generate_reply(messages=[{"role": "user", "content": content}])
+
+
+class TestResponseKey:
+    def test_depends_on_model_config_and_messages(self):
+        config = {"temperature": 0.7, "seed": 42, "config_list": [{"model": "gpt-4", "api_key": "a"}]}
+        messages = [{"role": "user", "content": "Status of sector 4?"}]
+        key = response_key(config, messages)
+        assert key == response_key(dict(config), [dict(m) for m in messages])
+        assert key != response_key({**config, "config_list": [{"model": "gpt-3.5-turbo"}]}, messages)
+        assert key != response_key({**config, "temperature": 0.0}, messages)
+        assert key != response_key(config, [{"role": "user", "content": "Status of sector 5?"}])
+
+    def test_ignores_credentials_endpoints_and_timeouts(self):
+        config = {"temperature": 0.7, "config_list": [{"model": "gpt-4", "api_key": "a"}]}
+        other = {"temperature": 0.7, "request_timeout": 5, "use_cache": False,
+                 "config_list": [{"model": "gpt-4", "api_key": "b", "api_base": "http://localhost/v1"}]}
+        assert response_key(config, []) == response_key(other, [])
+
+
+class TestLLMResponseCache:
+    def test_round_trip_and_persistence(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path))
+        assert cache.get("k1") is None
+        cache.put("k1", "reply one")
+        assert cache.get("k1") == "reply one"
+        assert cache.stats()["memory_hits"] == 1
+
+        reopened = LLMResponseCache(str(tmp_path), memory_entries=0)
+        assert len(reopened) == 1 and reopened.get("k1") == "reply one"
+        stats = reopened.stats()
+        assert (stats["hits"], stats["memory_hits"], stats["misses"]) == (1, 0, 0)
+
+    def test_evicts_least_recently_used_beyond_max_bytes(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path), max_bytes=1000, memory_entries=2)
+        for i in range(5):
+            cache.put(f"k{i}", "x" * 200)
+            cache.get("k0")  # keep k0 recently used
+        assert cache.size <= 1000
+        assert cache.get("k0") is not None and "k1" not in cache
+        assert cache.stats()["evictions"] >= 1
+        assert len(os.listdir(tmp_path)) == len(cache)
+
+        # a smaller budget on reopen evicts the oldest files on disk
+        assert len(LLMResponseCache(str(tmp_path), max_bytes=500)) == 2
+
+    def test_clear(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path))
+        cache.put("k1", {"content": "reply"})
+        cache.clear()
+        assert len(cache) == 0 and cache.get("k1") is None and os.listdir(tmp_path) == []
+
+
+class TestAgentResponseCache:
+    def test_repeated_conversation_is_served_from_cache(self, server, tmp_path):
+        agent = stub_agent(server)
+        agent.enable_response_cache(LLMResponseCache(str(tmp_path)))
+
+        first = ask(agent, "Patient count in sector 4?")
+        assert first == stub_reply("gpt-4", [{"content": "Patient count in sector 4?"}])
+        assert ask(agent, "Patient count in sector 4?") == first
+        assert server.requests == 1
+        ask(agent, "Patient count in sector 5?")
+        assert server.requests == 2
+
+        # another agent (or process) with the same model and config reuses the disk entries
+        other = stub_agent(server, name="other_agent")
+        other.enable_response_cache(LLMResponseCache(str(tmp_path)))
+        assert ask(other, "Patient count in sector 4?") == first
+        assert server.requests == 2
+
+    def test_different_model_misses(self, server, tmp_path):
+        cache = LLMResponseCache(str(tmp_path))
+        agent = stub_agent(server)
+        agent.enable_response_cache(cache)
+        ask(agent, "Supplies left?")
+        other = stub_agent(server, model="gpt-3.5-turbo")
+        other.enable_response_cache(cache)
+        assert ask(other, "Supplies left?").startswith("[gpt-3.5-turbo]")
+        assert server.requests == 2
+
+    def test_without_cache_every_call_reaches_the_model(self, server):
+        agent = stub_agent(server)
+        agent.llm_config = {**agent.llm_config, "use_cache": False}
+        assert agent.response_cache is None
+        ask(agent, "Triage status?")
+        ask(agent, "Triage status?")
+        assert server.requests == 2
+
+    def test_enable_after_first_use_is_rejected(self, server, tmp_path):
+        agent = stub_agent(server)
+        agent.assistant
+        with pytest.raises(RuntimeError):
+            agent.enable_response_cache(LLMResponseCache(str(tmp_path)))
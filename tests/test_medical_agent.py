@@ -1,4 +1,6 @@
 import pytest
+import asyncio
+import threading
 from datetime import datetime
 from sar_project.agents.medical_agent import MedicalTeamLeader
 
@@ -87,7 +89,7 @@ class TestMedicalTeamLeader:
     def test_inventory_check(self, agent):
         current_inventory = agent.check_inventory("bandages")
         assert isinstance(current_inventory, int)
-        assert current_inventory == 120  # previous test adjusts inventory to 120
+        assert current_inventory == 100  # each agent owns its inventory, other tests don't leak into it
 
     def test_inventory_update(self, agent):
         agent.update_inventory("antiseptic", 40)
@@ -240,4 +242,523 @@ class TestMedicalTeamLeader:
             "discharge_notes": "Fully recovered"
         }
         response = agent.process_request(discharge_request)
-        assert response["status"] == "success"
\ No newline at end of file
+        assert response["status"] == "success"
+
+    # Tests for the persistent triage queue
+
+    def test_admit_arrivals_keeps_ranking_across_calls(self, agent):
+        agent.admit_arrivals([
+            {"id": "patient1", "severity": "low", "arrival_time": 1},
+            {"id": "patient2", "severity": "medium", "arrival_time": 2}
+        ])
+        response = agent.admit_arrivals(iter([
+            {"id": "patient3", "severity": "high", "arrival_time": 3},
+            {"id": "patient4", "severity": "medium", "arrival_time": 1}
+        ]))
+        assert response["admitted"] == 2
+        assert response["queue_length"] == 4
+        assert response["next_patient"] == "patient3"
+
+        ranking = agent.get_triage_ranking()["ranking"]
+        assert ranking == {"patient3": 1, "patient4": 2, "patient2": 3, "patient1": 4}
+        assert agent.patient_records["patient4"]["status"] == "triaged"
+
+    def test_next_patient_and_reprioritize(self, agent):
+        agent.process_request({
+            "admit_arrivals_request": True,
+            "patients": [
+                {"id": "patient1", "severity": "medium", "arrival_time": 1},
+                {"id": "patient2", "severity": "low", "arrival_time": 2}
+            ]
+        })
+        agent.update_patient_record("patient2", {"severity": "high"})
+
+        response = agent.process_request({"next_patient_request": True})
+        assert response["patient_id"] == "patient2"
+        assert response["queue_length"] == 1
+
+        agent.discharge_patient("patient1")
+        response = agent.next_patient()
+        assert response["status"] == "empty"
+
+    def test_transported_patient_leaves_triage_queue(self, agent):
+        agent.handle_triage([{"id": "patient1", "severity": "high", "arrival_time": 1}])
+        assert "patient1" in agent.triage_queue
+        agent.organize_transport("patient1", "Hospital A", "high")
+        assert "patient1" not in agent.triage_queue
+
+    # Tests for the vectorized bulk triage path
+
+    def test_bulk_triage_matches_per_patient_triage(self, agent):
+        patients = [
+            {"id": f"patient{i}", "severity": ["low", "high", "medium"][i % 3], "arrival_time": (i * 7) % 5}
+            for i in range(30)
+        ]
+        expected = agent.handle_triage(patients)
+
+        bulk_agent = MedicalTeamLeader()
+        response = bulk_agent.handle_triage_bulk(patients)
+        assert response == expected
+        assert len(bulk_agent.patient_records) == 30
+        assert bulk_agent.patient_records["patient1"]["status"] == "triaged"
+        assert bulk_agent.get_triage_ranking()["ranking"] == expected
+
+    def test_bulk_triage_updates_existing_records(self, agent):
+        agent.add_patient({"id": "patient1", "severity": "low"})
+        agent.handle_triage_bulk([{"id": "patient1", "severity": "high", "arrival_time": "2024-01-01T10:00"}])
+        assert agent.patient_records["patient1"]["severity"] == "high"
+        assert agent.patient_records["patient1"]["status"] == "triaged"
+        assert "last_updated" in agent.patient_records["patient1"]
+
+    def test_bulk_triage_unknown_severity(self, agent):
+        agent.bulk_triage_threshold = 1
+        response = agent.process_request({
+            "triage_request": True,
+            "patients": [{"id": "patient1", "severity": "critical", "arrival_time": 1}]
+        })
+        assert response == {"error": "'critical'"}
+        assert len(agent.patient_records) == 0
+
+    # Tests for the status and severity indexes
+
+    def test_list_patients_indexes_follow_record_changes(self, agent):
+        agent.handle_triage([
+            {"id": "patient1", "severity": "high", "arrival_time": 1},
+            {"id": "patient2", "severity": "low", "arrival_time": 2}
+        ])
+        agent.add_patient({"id": "patient3", "severity": "high"})
+        agent.organize_transport("patient1", "Hospital A", "high")
+        agent.update_patient_record("patient2", {"severity": "high"})
+        agent.discharge_patient("patient3")
+
+        assert [p["id"] for p in agent.list_patients("in transit")["patients"]] == ["patient1"]
+        assert [p["id"] for p in agent.list_patients("triaged")["patients"]] == ["patient2"]
+        assert agent.list_patients("registered")["count"] == 0
+        assert agent.list_patients(severity="high")["count"] == 3
+        assert agent.list_patients("discharged", "high")["patients"][0]["id"] == "patient3"
+
+        response = agent.process_request({"list_patients_request": True, "severity": "low"})
+        assert response["count"] == 0
+
+    def test_records_are_compact_but_responses_are_plain_dicts(self, agent, sample_patient):
+        agent.add_patient(sample_patient)
+        agent.handle_triage([{"id": "patient1", "severity": "high", "arrival_time": 1}])
+        assert not hasattr(agent.patient_records["patient1"], "__dict__")
+
+        response = agent.get_patient_record("test_patient")
+        assert type(response["patient_data"]) is dict
+        assert response["patient_data"] == dict(sample_patient)
+
+        response = agent.update_patient_record("patient1", {"notes": "stable"})
+        assert type(response["patient_data"]) is dict
+        assert response["patient_data"]["notes"] == "stable"
+        assert response["patient_data"]["status"] == "triaged"
+
+    # Tests for the durable state journal
+
+    def test_journal_recovers_state_after_restart(self, tmp_path):
+        agent = MedicalTeamLeader(journal_dir=str(tmp_path))
+        agent.handle_triage([
+            {"id": "patient1", "severity": "high", "arrival_time": 1},
+            {"id": "patient2", "severity": "low", "arrival_time": 2}
+        ])
+        agent.process_request({"add_patient_request": True, "patient_data": {"id": "patient3", "name": "John Doe"}})
+        agent.organize_transport("patient1", "Hospital A", "high")
+        agent.discharge_patient("patient3", "Recovered")
+        agent.manage_supplies("antiseptic", -5)
+        agent.update_team_health(high_risk_members=4)
+        agent.close()
+
+        recovered = MedicalTeamLeader(journal_dir=str(tmp_path))
+        assert recovered.get_patient_record("patient1")["patient_data"] == agent.get_patient_record("patient1")["patient_data"]
+        assert recovered.patient_records["patient3"]["discharge_notes"] == "Recovered"
+        assert recovered.check_inventory("antiseptic") == agent.check_inventory("antiseptic")
+        assert recovered.monitor_team_health()["high_risk_members"] == 4
+        assert recovered.list_patients("in transit")["count"] == 1
+        assert recovered.get_triage_ranking()["ranking"] == {"patient2": 1}
+        recovered.close()
+
+    def test_journal_keeps_dequeued_patients_out_of_the_queue(self, tmp_path):
+        agent = MedicalTeamLeader(journal_dir=str(tmp_path))
+        agent.handle_triage([
+            {"id": "patient1", "severity": "high", "arrival_time": 1},
+            {"id": "patient2", "severity": "low", "arrival_time": 2}
+        ])
+        agent.handle_triage_bulk([{"id": "patient3", "severity": "medium", "arrival_time": 3}])
+        assert agent.next_patient()["patient_id"] == "patient1"
+        assert agent.next_patient()["patient_id"] == "patient3"
+        agent.update_patient_record("patient1", {"notes": "treated"})
+        agent.close()
+
+        recovered = MedicalTeamLeader(journal_dir=str(tmp_path))
+        assert recovered.get_triage_ranking()["ranking"] == {"patient2": 1}
+        recovered.close()
+
+    def test_journal_recovers_the_live_queue(self, tmp_path):
+        agent = MedicalTeamLeader(journal_dir=str(tmp_path))
+        agent.handle_triage([
+            {"id": "patient1", "severity": "high", "arrival_time": 1},
+            {"id": "patient2", "severity": "low", "arrival_time": 2},
+            {"id": "patient3", "severity": "medium", "arrival_time": 3}
+        ])
+        agent.update_patient_record("patient1", {"status": "in treatment"})
+        agent.update_patient_record("patient3", {"severity": "low"})
+        assert agent.get_triage_ranking()["ranking"] == {"patient2": 1, "patient3": 2}
+        agent.close()
+
+        recovered = MedicalTeamLeader(journal_dir=str(tmp_path))
+        assert recovered.get_triage_ranking() == agent.get_triage_ranking()
+        assert recovered.list_patients("in treatment") == agent.list_patients("in treatment")
+        recovered.close()
+
+    def test_journal_snapshot_keeps_queue_order(self, tmp_path):
+        agent = MedicalTeamLeader(journal_dir=str(tmp_path))
+        severities = ["high", "medium", "low"]
+        agent.handle_triage_bulk([
+            {"id": f"patient{i}", "severity": severities[i * 7 % 3], "arrival_time": (i * 37) % 80}
+            for i in range(80)
+        ])
+        for i in range(0, 80, 3):
+            agent.discharge_patient(f"patient{i}")
+        agent.snapshot()
+        agent.close()
+
+        recovered = MedicalTeamLeader(journal_dir=str(tmp_path))
+        ranking = recovered.get_triage_ranking()["ranking"]
+        popped = [recovered.next_patient()["patient_id"] for _ in range(len(ranking))]
+        assert popped == sorted(ranking, key=ranking.get)
+        recovered.close()
+
+    def test_journal_rejects_values_json_cannot_store(self, tmp_path):
+        agent = MedicalTeamLeader(journal_dir=str(tmp_path))
+        agent.add_patient({"id": "patient1", "severity": "low"})
+        with pytest.raises(TypeError):
+            agent.add_patient({"id": "patient2", "position": (10, 20)})
+        with pytest.raises(TypeError):
+            agent.update_patient_record("patient1", {"seen_at": datetime(2024, 5, 1)})
+        with pytest.raises(TypeError):
+            agent.handle_triage([{"id": "patient3", "severity": "high", "arrival_time": datetime(2024, 5, 1)}])
+        assert set(agent.patient_records) == {"patient1"}
+        assert "seen_at" not in agent.patient_records["patient1"]
+        assert agent.get_triage_ranking()["ranking"] == {}
+        agent.close()
+
+    def test_journal_snapshot_compacts_journal(self, tmp_path):
+        agent = MedicalTeamLeader(journal_dir=str(tmp_path), snapshot_every=5)
+        for i in range(12):
+            agent.add_patient({"id": f"patient{i}", "severity": "medium"})
+        agent.update_patient_record("patient0", {"severity": "high"})
+        agent.close()
+
+        files = sorted(path.name for path in tmp_path.iterdir())
+        assert [name for name in files if name.startswith("snapshot-")] == ["snapshot-000000000010.pickle"]
+        assert len([name for name in files if name.startswith("journal-")]) == 1
+
+        recovered = MedicalTeamLeader(journal_dir=str(tmp_path), snapshot_every=5)
+        assert len(recovered.patient_records) == 12
+        assert recovered.patient_records["patient0"]["severity"] == "high"
+        assert recovered.list_patients(severity="medium")["count"] == 11
+        recovered.close()
+
+    # Tests for table-driven dispatch and the batch API
+
+    def test_process_request_unknown_type(self, agent):
+        assert agent.process_request({"unknown_request": True}) == {"error": "Unknown request type"}
+        assert agent.process_request({"transport_request": True}) == {"error": "'patient_id'"}
+
+    def test_process_request_first_registered_type_wins(self, agent):
+        response = agent.process_request({
+            "list_patients_request": True,
+            "triage_request": True,
+            "patients": [{"id": "patient1", "severity": "low", "arrival_time": 1}]
+        })
+        assert response == {"patient1": 1}
+
+    def test_process_requests_keeps_order_and_batches_supplies(self, agent, sample_patient):
+        start = agent.check_inventory("painkillers")
+        threshold = agent.get_reorder_threshold("painkillers")
+        results = agent.process_requests([
+            {"add_patient_request": True, "patient_data": sample_patient},
+            {"supply_request": True, "item": "painkillers", "quantity": -5},
+            {"supply_request": True, "item": "gauze", "quantity": 20},
+            {"supply_request": True, "item": "painkillers", "quantity": -(start - threshold)},
+            {"supply_request": True, "item": "painkillers", "quantity": "bad"},
+            {"update_patient_request": True, "patient_id": "test_patient", "update_data": {"severity": "high"}},
+            {"unknown_request": True}
+        ])
+        assert len(results) == 7
+        assert results[0]["status"] == "success"
+        assert results[1]["updated_quantity"] == start - 5
+        assert results[1]["reorder_status"] == "no reorder needed"
+        assert results[2]["updated_quantity"] == 20
+        assert results[3]["updated_quantity"] == threshold - 5
+        assert results[3]["reorder_status"] == "reorder queued"
+        # a bad delta makes its item fall back to one-by-one processing
+        assert "error" in results[4]
+        assert agent.check_inventory("painkillers") == threshold - 5
+        assert results[5]["patient_data"]["severity"] == "high"
+        assert results[6] == {"error": "Unknown request type"}
+
+    def test_process_requests_reports_malformed_messages(self, agent):
+        supply = {"supply_request": True, "item": "bandages", "quantity": -1}
+        results = agent.process_requests([supply, supply, None, 42, supply, {"unknown_request": True}])
+        assert len(results) == 6
+        assert [results[i]["updated_quantity"] for i in (0, 1, 4)] == [99, 98, 97]
+        assert results[2] == agent.process_request(None) and "error" in results[2]
+        assert results[3] == agent.process_request(42) and "error" in results[3]
+        assert results[5] == {"error": "Unknown request type"}
+
+    # Tests for the asyncio request interface
+
+    def test_aprocess_request(self, agent, sample_patient):
+        response = asyncio.run(agent.aprocess_request({"add_patient_request": True, "patient_data": sample_patient}))
+        assert response["status"] == "success"
+        assert "test_patient" in agent.patient_records
+
+    def test_request_loop_handles_concurrent_mixed_requests(self, agent):
+        start = agent.check_inventory("antiseptic")
+
+        async def run():
+            async with agent.request_loop(max_concurrency=4, max_pending=2) as loop:
+                futures = []
+                for i in range(40):
+                    futures.append(await loop.submit({"add_patient_request": True, "patient_data": {"id": f"patient{i}"}}))
+                    futures.append(await loop.submit({"supply_request": True, "item": "antiseptic", "quantity": 1}))
+                    assert loop._queue.qsize() <= 2
+                return await asyncio.gather(*futures)
+
+        results = asyncio.run(run())
+        assert len(results) == 80
+        assert all(result["status"] in ("success", "updated") for result in results)
+        assert agent.list_patients("registered")["count"] == 40
+        assert agent.check_inventory("antiseptic") == start + 40
+
+
+    # Tests for the per-instance inventory ledger
+
+    def test_inventory_is_per_instance(self, agent):
+        other = MedicalTeamLeader()
+        agent.manage_supplies("bandages", -30)
+        agent.update_team_health(high_risk_members=7)
+        assert other.check_inventory("bandages") == 100
+        assert other.monitor_team_health()["high_risk_members"] == 2
+
+    def test_concurrent_supply_updates_are_not_lost(self, agent):
+        def field_team(item, delta):
+            for _ in range(500):
+                agent.manage_supplies(item, delta)
+
+        threads = [
+            threading.Thread(target=field_team, args=(item, delta))
+            for item in ("bandages", "antiseptic", "splints")
+            for delta in (1, 1, -1, 2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert agent.check_inventory("bandages") == 100 + 500 * 3
+        assert agent.check_inventory("antiseptic") == 50 + 500 * 3
+        assert agent.check_inventory("splints") == 500 * 3
+
+    # Tests for coalesced reorders
+
+    def test_reorders_are_coalesced_per_item(self, agent):
+        orders = []
+        agent.reorder_aggregator.place_order = lambda item, quantity: orders.append((item, quantity))
+
+        for _ in range(50):
+            response = agent.manage_supplies("bandages", -1)
+        assert response["reorder_status"] == "reorder queued"
+        agent.manage_supplies("antiseptic", -20)
+        agent.manage_supplies("painkillers", -1)
+        assert orders == []
+
+        assert agent.reorder_aggregator.flush() == {"bandages": 30, "antiseptic": 10}
+        assert sorted(orders) == [("antiseptic", 10), ("bandages", 30)]
+
+        # already in flight: a further drop only orders the difference
+        agent.manage_supplies("bandages", -5)
+        assert agent.reorder_aggregator.flush() == {"bandages": 5}
+        # delivery reduces what is in flight
+        agent.manage_supplies("bandages", 20)
+        assert agent.reorder_aggregator.in_flight("bandages") == 15
+        assert agent.reorder_aggregator.flush() == {}
+
+    def test_reorders_are_placed_in_the_background(self):
+        agent = MedicalTeamLeader(reorder_window=0.01)
+        placed = threading.Event()
+        agent.reorder_aggregator.place_order = lambda item, quantity: placed.set()
+        agent.manage_supplies("painkillers", -40)
+        assert placed.wait(5)
+        agent.close()
+
+    def test_unclosed_agent_is_collected_and_its_reorder_thread_stops(self):
+        import gc
+        import weakref
+        agent = MedicalTeamLeader(reorder_window=60)
+        agent.manage_supplies("painkillers", -40)
+        thread = agent.reorder_aggregator._thread
+        assert thread.is_alive()
+        agent_ref = weakref.ref(agent)
+        del agent
+        gc.collect()
+        assert agent_ref() is None
+        thread.join(5)
+        assert not thread.is_alive()
+
+    def test_inventory_change_callback_can_update_the_ledger(self):
+        from sar_project.agents.inventory import InventoryLedger
+        changes = []
+
+        def on_change(item, quantity):
+            changes.append((item, quantity))
+            if item == "bandages" and quantity < 0:
+                ledger.set("bandages", 0)  # re-enters the ledger on the same stripe
+
+        ledger = InventoryLedger({"bandages": 1}, stripes=1, on_change=on_change)
+        ledger.adjust("bandages", -2)
+        assert changes == [("bandages", -1), ("bandages", 0)]
+        assert ledger.get("bandages") == 0
+
+    def test_supply_events_are_logged_as_json(self, agent):
+        import io
+        import json
+        from sar_project.config import logging_config
+        stream = io.StringIO()
+        logging_config.configure_logging("INFO", stream=stream)
+        try:
+            agent.update_inventory("splints", 7)
+            logging_config._listener.stop()
+            event = json.loads(stream.getvalue().splitlines()[-1])
+            assert event["event"] == "inventory_updated"
+            assert event["item"] == "splints" and event["quantity"] == 7
+
+            stream.truncate(0)
+            logging_config.configure_logging("OFF", stream=stream)
+            agent.update_inventory("splints", 8)
+            logging_config._listener.stop()
+            assert stream.getvalue() == ""
+        finally:
+            logging_config.reset_logging()
+
+    def test_importing_does_not_configure_logging(self, agent, caplog):
+        import logging
+        assert logging.getLogger("sar_project").handlers == []
+        with caplog.at_level(logging.INFO, logger="sar_project"):
+            agent.update_inventory("splints", 7)
+        assert [record.getMessage() for record in caplog.records] == ["inventory_updated"]
+        assert caplog.records[0].fields == {"item": "splints", "quantity": 7}
+
+    def test_import_does_not_load_llm_dependencies(self):
+        import subprocess
+        import sys
+        code = (
+            "import sys\n"
+            "from sar_project.agents.medical_agent import MedicalTeamLeader\n"
+            "agent = MedicalTeamLeader()\n"
+            "agent.process_request({'supply_request': True, 'item': 'bandages', 'quantity': 1})\n"
+            "agent.get_status()\n"
+            "print('autogen' in sys.modules, 'google.generativeai' in sys.modules)\n"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        assert output.split() == ["False", "False"]
+
+    def test_only_listed_assistant_attributes_are_delegated(self, agent):
+        with pytest.raises(AttributeError):
+            agent.genrate_reply
+        assert agent._assistant is None
+
+        other = MedicalTeamLeader()
+        agent.send("Status of patient1?", other, request_reply=False)
+        assert other.chat_messages[agent.assistant][-1]["content"] == "Status of patient1?"
+        assert agent.last_message(other)["content"] == "Status of patient1?"
+
+    def test_config_list_is_cached_per_process(self, agent):
+        from sar_project.agents import base_agent
+        assert base_agent._load_config_list.cache_info().currsize == 1
+        config_list = agent.get_config_list()
+        config_list[0]["model"] = "changed"
+        assert MedicalTeamLeader().llm_config["config_list"][0]["model"] == "gpt-4"
+
+    def test_adapts_to_field_condition_changes_from_knowledge_base(self, agent):
+        from sar_project.knowledge.knowledge_base import KnowledgeBase
+        kb = KnowledgeBase()
+        agent.watch_field_conditions(kb, locations=["north ridge"])
+        calls = []
+        adapt = agent.adapt_to_field_conditions
+        agent.adapt_to_field_conditions = lambda conditions: calls.append(conditions) or adapt(conditions)
+
+        kb.update_weather("north ridge", {"weather": "stormy", "wind_speed": 45})
+        kb.update_weather("valley", {"weather": "clear"})
+        assert kb.change_feed.flush()
+        assert agent.field_adjustments["north ridge"]["adjustments"] == \
+            "Limit aerial operations, increase ground unit readiness"
+
+        # same label, new readings: nothing relevant changed
+        kb.update_weather("north ridge", {"weather": "stormy", "wind_speed": 50})
+        kb.update_terrain("north ridge", {"terrain": "mountainous"})
+        kb.update_weather("north ridge", {"weather": "clear"})
+        assert kb.change_feed.flush()
+        assert calls[0] == {"weather": "stormy"}
+        assert calls[-1] == {"weather": "clear", "terrain": "mountainous"}
+        assert "valley" not in agent.field_adjustments
+        assert agent.field_adjustments["north ridge"]["adjustments"] == \
+            "Deploy mountain rescue teams, use specialized gear"
+
+        agent.close()
+        kb.update_weather("north ridge", {"weather": "stormy"})
+        assert kb.change_feed.flush()
+        assert agent.field_conditions["north ridge"]["weather"] == "clear"
+
+    def test_transport_batch_uses_registered_fleet(self, agent):
+        for i in range(3):
+            agent.add_patient({"id": f"patient{i}", "severity": "high"})
+        agent.register_vehicle("heli1", "helicopter", position=(0, 0), speed=50.0, available_at=0)
+        agent.register_vehicle("amb1", "ambulance", capacity=1, position=(0, 0), speed=10.0, available_at=0)
+        assert agent.check_transport_availability("helicopter")
+        assert not agent.check_transport_availability("non-emergency vehicle")
+
+        results = agent.process_request({
+            "transport_batch_request": True,
+            "transports": [
+                {"patient_id": f"patient{i}", "destination": "Hospital A", "urgency": "high", "position": (1000, 0)}
+                for i in range(3)
+            ] + [{"patient_id": "patient9", "destination": "Hospital A", "urgency": "urgent"}]
+        })
+        statuses = [result["transport_status"] for result in results]
+        assert sorted(statuses[:3]) == ["organized", "organized", "unavailable"]
+        assert statuses[3] == "error"
+        organized = [result for result in results if result["transport_status"] == "organized"]
+        assert {result["vehicle_id"] for result in organized} == {"heli1", "amb1"}
+        record = agent.get_patient_record(organized[0]["patient_id"])["patient_data"]
+        assert record["status"] == "in transit"
+        assert record["vehicle_id"] == organized[0]["vehicle_id"]
+
+        agent.release_vehicle("amb1")
+        result = agent.organize_transport("patient2", "Hospital A", "medium")
+        assert result["transport_status"] == "organized" and result["vehicle_id"] == "amb1"
+
+    def test_repeated_transport_request_keeps_one_seat(self, agent):
+        agent.register_vehicle("h0", "helicopter", position=(0, 0), available_at=0)
+        agent.register_vehicle("h1", "helicopter", position=(0, 0), available_at=0)
+        agent.organize_transport("p1", "Hospital A", "high", position=(0, 0))
+        result = agent.organize_transport("p1", "Hospital B", "high", position=(0, 0))
+        assert result["transport_status"] == "organized"
+        booked = {vid: v.patients for vid, v in agent.transport_scheduler.vehicles.items()}
+        assert sorted(booked.values()) == [[], ["p1"]]
+        assert agent.check_transport_availability("helicopter")
+
+    def test_transport_includes_eta_to_destination_hospital(self, agent):
+        from sar_project.knowledge.knowledge_base import KnowledgeBase
+        from sar_project.knowledge.routing import TerrainRouter
+        kb = KnowledgeBase()
+        kb.update_terrain_many((f"cell {x}", {"terrain": "flat"}, (x * 100.0, 0.0)) for x in range(10))
+        router = TerrainRouter(kb, speed=10)
+        router.add_hospital("Hospital A", "cell 9")
+        agent.use_router(router)
+        result = agent.organize_transport("patient1", "Hospital A", "high", position=(0.0, 0.0))
+        assert result["destination_eta"] == pytest.approx(90.0)
+        assert "destination_eta" not in agent.organize_transport("patient1", "Clinic B", "high", position=(0.0, 0.0))
+        router.close()
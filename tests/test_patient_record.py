@@ -0,0 +1,54 @@
+import pytest
+from datetime import datetime
+from sar_project.agents.patient_record import PatientRecord, timestamp_now
+
+
+class TestPatientRecord:
+    @pytest.fixture
+    def record_data(self):
+        return {
+            "id": "patient1",
+            "severity": "high",
+            "status": "triaged",
+            "arrival_time": 3,
+            "triage_time": datetime(2024, 5, 1, 10, 30, 0, 125).isoformat(),
+            "registration_time": "2024-05-01T10:00",
+            "name": "John Doe"
+        }
+
+    def test_round_trips_values(self, record_data):
+        record = PatientRecord(record_data)
+        assert record == record_data
+        assert record.as_dict() == record_data
+        assert len(record) == len(record_data)
+        assert record["triage_time"] == "2024-05-01T10:30:00.000125"
+        # non-canonical timestamps are kept as given
+        assert record["registration_time"] == "2024-05-01T10:00"
+
+    def test_timestamps_are_stored_as_integers(self, record_data):
+        record = PatientRecord(record_data)
+        assert isinstance(record.triage_time, int)
+        assert record.extra == {"name": "John Doe"}
+        assert not hasattr(record, "__dict__")
+
+    def test_mutable_mapping_behaviour(self, record_data):
+        record = PatientRecord(record_data)
+        record.update({"status": "in transit", "notes": "stable"})
+        assert record.get("status") == "in transit"
+        assert record.get("transport_time", "unknown") == "unknown"
+        assert record.get("condition", "unknown") == "unknown"
+        record.update([("severity", "low")], destination="Hospital A")
+        assert (record["severity"], record["destination"]) == ("low", "Hospital A")
+        assert "notes" in record
+        del record["notes"]
+        with pytest.raises(KeyError):
+            record["notes"]
+        with pytest.raises(KeyError):
+            del record["discharge_time"]
+
+    def test_timestamps_survive_cache_eviction(self):
+        stamps = [timestamp_now()] + [datetime(2024, 5, 1, 10, 0, 0, i).isoformat() for i in range(10_000)]
+        records = [PatientRecord({"last_updated": stamp}) for stamp in stamps]
+        assert all(isinstance(record.last_updated, int) for record in records)
+        assert [record["last_updated"] for record in records] == stamps
+        assert stamps[0] == datetime.fromisoformat(stamps[0]).isoformat()
@@ -0,0 +1,97 @@
+import json
+import pytest
+from sar_project.agents.medical_agent import MedicalTeamLeader
+from sar_project.agents.request_metrics import RequestMetrics
+from sar_project.agents.weather_agent import WeatherAgent
+
+
+class TestRequestMetrics:
+    def test_counts_histogram_and_percentiles(self):
+        now = [0.0]
+        metrics = RequestMetrics(clock=lambda: now[0])
+        for _ in range(90):
+            metrics.record("fast", 3_000)  # 3 us
+        for _ in range(10):
+            metrics.record("fast", 900_000, errors=1)  # 0.9 ms
+        metrics.record("bulk", 50_000, errors=2, count=8)
+        now[0] = 10.0
+
+        snapshot = metrics.snapshot()
+        fast = snapshot["requests"]["fast"]
+        assert snapshot["uptime"] == 10.0
+        assert (fast["count"], fast["errors"], fast["error_rate"], fast["throughput"]) == (100, 10, 0.1, 10.0)
+        assert fast["p50"] == pytest.approx(4e-6) and fast["p99"] == pytest.approx(9e-4)
+        assert fast["max"] == pytest.approx(9e-4)
+        assert fast["mean"] == pytest.approx((90 * 3e-6 + 10 * 9e-4) / 100)
+        assert fast["histogram"] == [[pytest.approx(4e-6), 90], [pytest.approx(1.024e-3), 10]]
+        assert snapshot["requests"]["bulk"]["count"] == 8
+
+        metrics.reset()
+        assert metrics.snapshot()["requests"] == {}
+
+    def test_prometheus_export(self):
+        metrics = RequestMetrics()
+        metrics.record("supply_request", 3_000)
+        metrics.record("supply_request", 5_000, errors=1)
+        text = metrics.export("prometheus", labels={"agent": "medic"})
+        assert 'sar_agent_requests_total{request_type="supply_request",agent="medic"} 2' in text
+        assert 'sar_agent_request_errors_total{request_type="supply_request",agent="medic"} 1' in text
+        assert 'sar_agent_request_seconds_bucket{request_type="supply_request",agent="medic",le="+Inf"} 2' in text
+        assert json.loads(metrics.export())["requests"]["supply_request"]["count"] == 2
+        with pytest.raises(ValueError):
+            metrics.export("xml")
+
+
+class TestAgentInstrumentation:
+    def test_process_request_records_types_and_errors(self):
+        agent = MedicalTeamLeader()
+        agent.process_request({"supply_request": True, "item": "bandages", "quantity": -1})
+        agent.process_request({"supply_request": True, "item": "bandages"})
+        agent.process_request({"no_such_request": True})
+        agent.process_requests([{"supply_request": True, "item": "bandages", "quantity": -1}] * 5)
+
+        requests = agent.metrics.snapshot()["requests"]
+        assert requests["supply_request"]["count"] == 7
+        assert requests["supply_request"]["errors"] == 1
+        assert (requests["unknown"]["count"], requests["unknown"]["errors"]) == (1, 1)
+
+        agent.reset()
+        assert agent.metrics.snapshot()["requests"]["supply_request"]["count"] == 7
+
+    def test_mixed_bulk_run_is_recorded_once(self):
+        agent = MedicalTeamLeader()
+        agent.process_requests([
+            {"supply_request": True, "item": "bandages", "quantity": -1},
+            {"supply_request": True, "item": "bandages"},
+            {"supply_request": True, "quantity": -1},
+        ])
+        supply = agent.metrics.snapshot()["requests"]["supply_request"]
+        assert (supply["count"], supply["errors"]) == (3, 2)
+
+    def test_sampling_profiler(self):
+        agent = WeatherAgent()
+        agent.metrics.enable_profiling(sample_every=2)
+        for _ in range(6):
+            agent.process_request({"assess_risk": True, "location": "north ridge"})
+        assert "assess_weather_risk" in agent.metrics.profile_stats("assess_risk")
+        assert agent.metrics.profile_stats("get_forecast") == ""
+
+        sampled = []
+
+        class Hook:
+            def __init__(self, request_type):
+                sampled.append(request_type)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+        agent.metrics.enable_profiling(sample_every=3, hook=Hook)
+        for _ in range(6):
+            agent.process_request({"get_conditions": True, "location": "north ridge"})
+        assert sampled == ["get_conditions", "get_conditions"]
+        agent.metrics.disable_profiling()
+        agent.process_request({"get_conditions": True, "location": "north ridge"})
+        assert len(sampled) == 2
@@ -0,0 +1,81 @@
+import itertools
+import numpy as np
+import pytest
+from sar_project.agents.transport import TransportScheduler, min_cost_assignment
+
+
+class TestMinCostAssignment:
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(3)
+        for _ in range(200):
+            rows, cols = (int(v) for v in rng.integers(1, 6, 2))
+            cost = rng.integers(0, 9, (rows, cols)).astype(float)
+            matched_rows, matched_cols = min_cost_assignment(cost)
+            assert len(set(matched_rows.tolist())) == len(set(matched_cols.tolist())) == min(rows, cols)
+            if rows <= cols:
+                best = min(cost[range(rows), list(p)].sum() for p in itertools.permutations(range(cols), rows))
+            else:
+                best = min(cost[list(p), range(cols)].sum() for p in itertools.permutations(range(rows), cols))
+            assert cost[matched_rows, matched_cols].sum() == pytest.approx(best)
+
+
+class TestTransportScheduler:
+    @pytest.fixture
+    def scheduler(self):
+        scheduler = TransportScheduler(clock=lambda: 0.0)
+        scheduler.add_vehicle("heli", "helicopter", position=(0, 0), speed=60.0)
+        scheduler.add_vehicle("amb", "ambulance", capacity=2, position=(1000, 0), speed=10.0)
+        scheduler.add_vehicle("van", "non-emergency vehicle", capacity=4, position=(0, 0), speed=10.0)
+        return scheduler
+
+    def test_batch_beats_greedy_order(self):
+        # greedily the first patient takes the only nearby ambulance, stranding the second one
+        scheduler = TransportScheduler(clock=lambda: 0.0)
+        scheduler.add_vehicle("near", "ambulance", position=(0, 0), speed=10.0)
+        scheduler.add_vehicle("far", "ambulance", position=(10_000, 0), speed=10.0)
+        patients = [
+            {"patient_id": "a", "urgency": "medium", "position": (5_000, 0)},
+            {"patient_id": "b", "urgency": "medium", "position": (0, 0)},
+        ]
+        assignments, unassigned = scheduler.assign(patients)
+        assert unassigned == []
+        assert assignments["a"]["vehicle_id"] == "far" and assignments["b"]["vehicle_id"] == "near"
+        assert assignments["b"]["eta"] == 0.0 and assignments["a"]["eta"] == pytest.approx(500.0)
+
+    def test_capacity_and_urgency_when_fleet_is_short(self, scheduler):
+        patients = [{"patient_id": f"low{i}", "urgency": "low", "position": (0, 0)} for i in range(6)]
+        patients += [{"patient_id": f"high{i}", "urgency": "high", "position": (0, 0)} for i in range(3)]
+        assignments, unassigned = scheduler.assign(patients)
+        # 7 seats: every high-urgency patient is served, none in the van
+        assert len(assignments) == 7 and len(unassigned) == 2
+        assert {assignments[f"high{i}"]["transport_type"] for i in range(3)} <= {"helicopter", "ambulance"}
+        assert all(pid.startswith("low") for pid in unassigned)
+        assert scheduler.available() == 0 and scheduler.available("helicopter") == 0
+
+        scheduler.release_vehicle("heli", position=(0, 0), available_at=120.0)
+        assignments, _ = scheduler.assign([{"patient_id": "high3", "urgency": "high", "position": (600, 0)}])
+        assert assignments["high3"] == {"vehicle_id": "heli", "transport_type": "helicopter", "eta": 130.0}
+
+    def test_repeated_patient_books_one_seat(self, scheduler):
+        patients = [
+            {"patient_id": "a", "urgency": "low", "position": (0, 0)},
+            {"patient_id": "a", "urgency": "high", "position": (0, 0)},
+        ]
+        for assign in (scheduler.assign, scheduler.assign_greedy):
+            assignments, unassigned = assign(patients)
+            assert unassigned == [] and list(assignments) == ["a"]
+            assert assignments["a"]["transport_type"] in {"helicopter", "ambulance"}
+            assert sum(len(vehicle.patients) for vehicle in scheduler.vehicles.values()) == 1
+            scheduler.release_vehicle(assignments["a"]["vehicle_id"])
+
+    def test_repeated_request_moves_the_booking(self, scheduler):
+        for assign in (scheduler.assign, scheduler.assign_greedy):
+            first, _ = assign([{"patient_id": "a", "urgency": "high", "position": (0, 0)}])
+            second, _ = assign([{"patient_id": "a", "urgency": "low", "position": (0, 0)}])
+            assert (first["a"]["vehicle_id"], second["a"]["vehicle_id"]) == ("heli", "van")
+            assert [vehicle.patients for vehicle in scheduler.vehicles.values()] == [[], [], ["a"]]
+            scheduler.release_vehicle("van")
+
+    def test_rejects_unknown_vehicle_types(self, scheduler):
+        with pytest.raises(ValueError):
+            scheduler.add_vehicle("boat1", "boat")
@@ -0,0 +1,35 @@
+import pytest
+from sar_project.agents.weather_agent import WeatherAgent
+from sar_project.agents.weather_provider import StaticWeatherProvider
+
+
+class VaryingWeatherProvider(StaticWeatherProvider):
+    def get_current_conditions(self, location):
+        index = int(location[4:])
+        return {"location": location, "temperature": 10, "wind_speed": index * 10,
+                "precipitation": index, "visibility": 12 - index * 3}
+
+
+class TestBatchRiskAssessment:
+    def test_matches_single_assessment(self):
+        agent = WeatherAgent(provider=VaryingWeatherProvider())
+        locations = [f"cell{i}" for i in range(5)]
+        results = agent.assess_weather_risk_many(locations)
+        assert [r["location"] for r in results] == locations
+        for location, result in zip(locations, results):
+            single = agent.assess_weather_risk(location)
+            assert result["risk_level"] == single["risk_level"]
+            assert result["risks"] == single["risks"]
+            assert result["recommendations"] == single["recommendations"]
+        assert results[4]["risks"] == ["high_wind", "low_visibility"]
+
+    def test_configurable_rules(self):
+        agent = WeatherAgent(provider=VaryingWeatherProvider(),
+                             risk_rules=[("high_wind", "wind_speed", ">=", 20), ("heavy_rain", "precipitation", ">", 2)])
+        results = agent.process_request({"assess_risk_many": True, "locations": ["cell1", "cell2", "cell3"]})
+        assert [r["risks"] for r in results] == [[], ["high_wind"], ["high_wind", "heavy_rain"]]
+        assert results[2]["recommendations"] == ["Secure loose equipment"]
+
+    def test_unknown_comparison_is_rejected(self):
+        with pytest.raises(ValueError):
+            WeatherAgent(risk_rules=[("high_wind", "wind_speed", "~", 30)])
@@ -0,0 +1,95 @@
+import threading
+import time
+import pytest
+from sar_project.agents.weather_agent import WeatherAgent
+from sar_project.agents.weather_cache import WeatherCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestWeatherCache:
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = WeatherCache(ttl=10, clock=clock)
+        calls = []
+        fetch = lambda: calls.append(1) or len(calls)
+
+        assert cache.get_or_fetch("cell1", fetch) == 1
+        clock.now = 9
+        assert cache.get_or_fetch("cell1", fetch) == 1
+        clock.now = 10
+        assert cache.get_or_fetch("cell1", fetch) == 2
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 2, 1)
+
+    def test_lru_eviction(self):
+        cache = WeatherCache(max_entries=2)
+        cache.get_or_fetch("a", lambda: "a")
+        cache.get_or_fetch("b", lambda: "b")
+        cache.get_or_fetch("a", lambda: "a")  # b is now least recently used
+        cache.get_or_fetch("c", lambda: "c")
+        assert cache.get_or_fetch("a", lambda: "refetched") == "a"
+        assert cache.get_or_fetch("b", lambda: "refetched") == "refetched"
+        assert cache.stats()["evictions"] == 2
+
+    def test_concurrent_misses_share_one_fetch(self):
+        cache = WeatherCache()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"wind_speed": 12}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("cell1", slow_fetch)))
+                   for _ in range(8)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while cache.stats()["coalesced"] < 7 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert len(results) == 8 and all(result is results[0] for result in results)
+
+    def test_failed_fetch_is_not_cached(self):
+        cache = WeatherCache()
+
+        def failing_fetch():
+            raise ConnectionError("provider down")
+
+        with pytest.raises(ConnectionError):
+            cache.get_or_fetch("cell1", failing_fetch)
+        assert cache.get_or_fetch("cell1", lambda: "ok") == "ok"
+
+    def test_get_or_fetch_many(self):
+        cache = WeatherCache()
+        cache.get_or_fetch("a", lambda: "cached")
+        fetched = []
+        fetch_many = lambda keys: fetched.append(keys) or [key.upper() for key in keys]
+        assert cache.get_or_fetch_many(["a", "b", "c", "b"], fetch_many) == ["cached", "B", "C", "B"]
+        assert fetched == [["b", "c"]]
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 3, 1)
+
+    def test_weather_agent_reuses_fetched_conditions(self):
+        agent = WeatherAgent()
+        for _ in range(3):
+            agent.assess_weather_risk("Sector 4")
+        stats = agent.process_request({"cache_stats": True})
+        assert stats["conditions"]["misses"] == 1 and stats["conditions"]["hits"] == 2
+        assert stats["forecast"]["misses"] == 1 and stats["forecast"]["hits"] == 2
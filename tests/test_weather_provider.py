@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from sar_project.agents.weather_agent import WeatherAgent
+from sar_project.agents.weather_provider import HTTPWeatherProvider, WeatherProviderError
+from sar_project.agents.weather_stub_server import StubWeatherServer, stub_conditions
+
+
+@pytest.fixture
+def server():
+    with StubWeatherServer() as server:
+        yield server
+
+
+class TestHTTPWeatherProvider:
+    def test_fetches_conditions_and_forecast(self, server):
+        provider = HTTPWeatherProvider(server.url)
+        try:
+            assert provider.get_current_conditions("Sector 4") == stub_conditions("Sector 4")
+            forecast = provider.get_weather_forecast("Sector 4", "6h")
+            assert forecast["duration"] == "6h" and len(forecast["forecast"]) == 2
+        finally:
+            provider.close()
+
+    def test_retries_failed_requests(self):
+        with StubWeatherServer(fail_every=2) as server:
+            provider = HTTPWeatherProvider(server.url, max_concurrency=1, backoff=0.001)
+            try:
+                results = provider.get_current_conditions_many([f"cell{i}" for i in range(20)])
+            finally:
+                provider.close()
+        assert results == [stub_conditions(f"cell{i}") for i in range(20)]
+        assert provider.retried > 0
+
+    def test_gives_up_after_retries(self):
+        with StubWeatherServer(fail_every=1) as server:
+            provider = HTTPWeatherProvider(server.url, retries=2, backoff=0.001)
+            try:
+                with pytest.raises(WeatherProviderError):
+                    provider.get_current_conditions("Sector 4")
+            finally:
+                provider.close()
+        assert provider.requests_sent == 3
+
+    def test_times_out_slow_responses(self):
+        with StubWeatherServer(latency=0.5) as server:
+            provider = HTTPWeatherProvider(server.url, timeout=0.05, retries=0)
+            try:
+                with pytest.raises(WeatherProviderError):
+                    provider.get_current_conditions("Sector 4")
+            finally:
+                provider.close()
+
+    def test_async_fetch_from_caller_loop(self, server):
+        async def fetch():
+            provider = HTTPWeatherProvider(server.url, max_concurrency=4)
+            try:
+                return await provider.fetch_current_conditions_many(["a", "b", "c"])
+            finally:
+                await provider.aclose()
+
+        assert asyncio.run(fetch()) == [stub_conditions(location) for location in "abc"]
+
+    def test_async_fetch_from_two_loops_in_a_row(self, server):
+        provider = HTTPWeatherProvider(server.url)
+        try:
+            assert asyncio.run(provider.fetch_current_conditions("a")) == stub_conditions("a")
+            assert asyncio.run(provider.fetch_current_conditions("b")) == stub_conditions("b")
+            assert provider.get_current_conditions("c") == stub_conditions("c")
+        finally:
+            provider.close()
+
+    def test_weather_agent_uses_provider(self, server):
+        agent = WeatherAgent(provider=HTTPWeatherProvider(server.url))
+        try:
+            cells = [f"cell{i}" for i in range(10)]
+            results = agent.assess_weather_risk_many(cells)
+            assert [r["risk_level"] for r in results] == [agent.assess_weather_risk(cell)["risk_level"] for cell in cells]
+            # conditions are fetched once per cell and then served from the cache
+            assert server.requests == 20
+            assert agent.cache_stats()["conditions"]["hits"] == 10
+        finally:
+            agent.close()